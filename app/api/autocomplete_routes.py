@@ -0,0 +1,28 @@
+from flask import request, jsonify
+from app.services.autocomplete_service import autocomplete, EXERCISES, FOODS
+
+
+def register_autocomplete_routes(app):
+    def _suggest(kind):
+        user_id = request.args.get("user_id", type=int)
+        prefix = request.args.get("q", "")
+        limit = request.args.get("limit", 10, type=int)
+        
+        if not user_id:
+            return jsonify({"error": "user_id is required as a query parameter"}), 400
+        
+        suggestions = autocomplete.suggest(kind, user_id, prefix, min(max(limit, 1), 25))
+        
+        return jsonify({
+            "suggestions": suggestions
+        }), 200
+
+    @app.route("/api/autocomplete/exercises", methods=["GET"])
+    def autocomplete_exercises():
+        """Suggest the user's own past exercise names for a typed prefix."""
+        return _suggest(EXERCISES)
+
+    @app.route("/api/autocomplete/foods", methods=["GET"])
+    def autocomplete_foods():
+        """Suggest the user's own past food descriptions for a typed prefix."""
+        return _suggest(FOODS)
@@ -0,0 +1,103 @@
+from flask import request, jsonify
+from app.db import db_helper
+
+
+# Most sub-requests accepted in one batch
+MAX_BATCH_REQUESTS = 25
+
+BATCH_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
+
+# Paths a batch cannot contain: nested batches, never-ending event streams and
+# exports/imports, which stream files too large to buffer in a batch response
+STREAMING_PREFIXES = ("/api/batch/", "/api/events/", "/api/export/", "/api/import/")
+
+# Paths that wait on the language model; a transactional batch would hold the write lock meanwhile
+MODEL_PATHS = {"/api/calories/chat", "/api/food/chat", "/api/tdee/chat"}
+
+
+class BatchRollback(Exception):
+    """Raised to roll back a transactional batch after a failed sub-request."""
+
+
+def register_batch_routes(app):
+    def dispatch(method, path, body):
+        """Run one sub-request through the URL map and return (status, body)."""
+        with app.test_request_context(path, method=method, json=body):
+            response = app.full_dispatch_request()
+        payload = response.get_json(silent=True)
+        if payload is None:
+            payload = response.get_data(as_text=True)
+        return response.status_code, payload
+
+    @app.route("/api/batch", methods=["POST"])
+    def batch():
+        """
+        Run an ordered list of API calls in one round trip.
+
+        Body: {"requests": [{"method", "path", "body"}], "transaction": false}.
+        Sub-requests share one DB connection; with "transaction": true they
+        also share one transaction, and the first sub-request answering with
+        a 4xx/5xx rolls back everything before it. Chat calls cannot be part
+        of a transaction, since the write lock would be held while the model
+        answers.
+        """
+        data = request.get_json() or {}
+
+        sub_requests = data.get("requests")
+        atomic = bool(data.get("transaction", False))
+
+        if not isinstance(sub_requests, list) or not sub_requests:
+            return jsonify({"error": "requests must be a non-empty list"}), 400
+
+        if len(sub_requests) > MAX_BATCH_REQUESTS:
+            return jsonify({"error": f"At most {MAX_BATCH_REQUESTS} requests per batch"}), 400
+
+        # Validate every sub-request before running any of them
+        calls = []
+        for index, sub in enumerate(sub_requests):
+            if not isinstance(sub, dict):
+                return jsonify({"error": f"Request {index} must be an object"}), 400
+
+            method = str(sub.get("method", "GET")).upper()
+            path = sub.get("path")
+
+            if method not in BATCH_METHODS:
+                return jsonify({"error": f"Request {index} has an unsupported method"}), 400
+
+            if not isinstance(path, str) or not path.startswith("/api/"):
+                return jsonify({"error": f"Request {index} path must start with /api/"}), 400
+
+            route_path = path.split("?", 1)[0].rstrip("/")
+            if (route_path + "/").startswith(STREAMING_PREFIXES):
+                return jsonify({"error": f"Request {index} cannot be a batch, event stream, export or import"}), 400
+
+            if atomic and route_path in MODEL_PATHS:
+                return jsonify({"error": f"Request {index} calls the chat model and cannot run in a transaction"}), 400
+
+            calls.append((method, path, sub.get("body")))
+
+        responses = []
+        try:
+            with db_helper.shared_connection():
+                if atomic:
+                    with db_helper.transaction():
+                        for method, path, body in calls:
+                            status, payload = dispatch(method, path, body)
+                            responses.append({"status": status, "body": payload})
+                            if status >= 400:
+                                raise BatchRollback()
+                else:
+                    for method, path, body in calls:
+                        status, payload = dispatch(method, path, body)
+                        responses.append({"status": status, "body": payload})
+        except BatchRollback:
+            failed = responses[-1]
+            return jsonify({
+                "error": f"Request {len(responses) - 1} failed; the transaction was rolled back",
+                "failed_index": len(responses) - 1,
+                "responses": responses
+            }), failed["status"]
+
+        return jsonify({
+            "responses": responses
+        }), 200
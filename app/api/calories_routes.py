@@ -2,9 +2,18 @@ from flask import request, jsonify
 from app.services.calorie_tracker import Calorie_manager
 from app.services.food_chatbot_client import process_food_entry
 from app.services.tdee_service import TdeeService
+from app.services.chat_session_service import ChatSessionService, CALORIES_CHAT
 from app.db import db_helper
 from app.models.user import User
+from app.models.calorie_entry import CalorieLog
 from datetime import datetime
+from app.api.etag import versioned
+from app.services.validators import clean_calorie_item
+from app.services.version_service import CALORIES, TDEE
+
+
+# Largest meal accepted by /api/calories/logs/batch
+MAX_BATCH_ITEMS = 50
 
 
 def register_calories_routes(app):
@@ -16,11 +25,15 @@ def register_calories_routes(app):
             
             message = data.get("message")
             username = data.get("username")
-            chat_history = data.get("history", [])
+            session_id = data.get("session_id")
+            last_seen_id = data.get("last_seen_id")
             
             if not message or not username:
                 return jsonify({"error": "message and username are required"}), 400
             
+            if last_seen_id is not None and not isinstance(last_seen_id, int):
+                return jsonify({"error": "last_seen_id must be an integer"}), 400
+            
             # Get user from database
             user_row = db_helper.fetch_one(
                 "SELECT * FROM users WHERE username = ?",
@@ -31,17 +44,31 @@ def register_calories_routes(app):
             
             user = User.from_row(user_row)
             
-            # Use frontend chat history (simplified - no DB chat storage for calories)
-            final_history = chat_history if chat_history else []
+            # Continue the client's session (or start one) and build the prompt from it
+            session = ChatSessionService.get_or_create_session(user.id, CALORIES_CHAT, session_id)
+            missed_messages = []
+            if last_seen_id is not None and session.id == session_id:
+                missed_messages = ChatSessionService.get_messages_after(session.id, last_seen_id)
+            final_history = ChatSessionService.to_prompt_history(
+                ChatSessionService.get_recent_messages(session.id)
+            )
             
             # Call AI chatbot to process food entry
             reply_text, nutrition_result = process_food_entry(
+                user_id=user.id,
                 message=message,
                 chat_history=final_history
             )
             
+            saved_messages = ChatSessionService.save_turn(session, message, reply_text)
+            
             # Prepare response
-            response_data = {"reply": reply_text}
+            response_data = {
+                "reply": reply_text,
+                "session_id": session.id,
+                "messages": [msg.to_dict() for msg in saved_messages],
+                "missed_messages": [msg.to_dict() for msg in missed_messages]
+            }
             
             # If AI returned nutrition data, save to calorie_logs and return it
             if nutrition_result:
@@ -126,7 +153,149 @@ def register_calories_routes(app):
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    @app.route("/api/calories/logs/batch", methods=["POST"])
+    def add_calorie_logs_batch():
+        """Add several calorie log entries (e.g. a whole meal) in one request."""
+        data = request.get_json() or {}
+        
+        username = data.get("username")
+        entry_date = data.get("entry_date") or CalorieLog.today_iso()
+        items = data.get("items")
+        
+        if not username:
+            return jsonify({"error": "username is required"}), 400
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "items must be a non-empty list"}), 400
+        if len(items) > MAX_BATCH_ITEMS:
+            return jsonify({"error": f"At most {MAX_BATCH_ITEMS} items per batch"}), 400
+        
+        # Validate every item before writing anything
+        clean_items = []
+        for idx, item in enumerate(items):
+            try:
+                clean_items.append(clean_calorie_item(item, entry_date))
+            except ValueError as e:
+                return jsonify({"error": f"Item {idx + 1}: {e}"}), 400
+        
+        # Get user from database
+        user_row = db_helper.fetch_one(
+            "SELECT * FROM users WHERE username = ?",
+            (username,)
+        )
+        if not user_row:
+            return jsonify({"error": "User not found"}), 404
+        
+        user = User.from_row(user_row)
+        
+        try:
+            with db_helper.transaction():
+                logs = Calorie_manager.add_logs(user.id, clean_items, entry_date)
+                dates = sorted({log.entry_date for log in logs})
+                totals = [Calorie_manager.get_day_totals(user.id, day) for day in dates]
+            
+            return jsonify({
+                "message": f"Added {len(logs)} calorie logs",
+                "logs": [log.to_dict() for log in logs],
+                "totals": totals
+            }), 201
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/calories/recent/<int:user_id>", methods=["GET"])
+    def get_recent_foods(user_id):
+        """Get a user's recent (or most frequent) foods for one-tap re-logging."""
+        sort = request.args.get("sort", "recent")
+        limit = request.args.get("limit", 20, type=int)
+        
+        if sort not in ("recent", "frequent"):
+            return jsonify({"error": "sort must be 'recent' or 'frequent'"}), 400
+        
+        try:
+            foods = Calorie_manager.get_recent_foods(user_id, sort, min(max(limit, 1), 50))
+            return jsonify({"foods": foods}), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/calories/quick-log", methods=["POST"])
+    def quick_log_calories():
+        """Re-log a known food by its recent-foods id without calling the AI."""
+        data = request.get_json() or {}
+        
+        username = data.get("username")
+        item_id = data.get("item_id")
+        entry_date = data.get("entry_date")
+        
+        if not username or not item_id:
+            return jsonify({"error": "username and item_id are required"}), 400
+        
+        # Get user from database
+        user_row = db_helper.fetch_one(
+            "SELECT * FROM users WHERE username = ?",
+            (username,)
+        )
+        if not user_row:
+            return jsonify({"error": "User not found"}), 404
+        
+        user = User.from_row(user_row)
+        
+        try:
+            log_entry = Calorie_manager.quick_log(
+                user_id=user.id,
+                item_id=item_id,
+                entry_date=entry_date
+            )
+            
+            if not log_entry:
+                return jsonify({"error": "Food not found"}), 404
+            
+            return jsonify({
+                "message": "Calorie log added successfully",
+                "log": log_entry.to_dict()
+            }), 201
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/calories/copy-day", methods=["POST"])
+    def copy_day_calories():
+        """Copy every active log from one date to another (default today)."""
+        data = request.get_json() or {}
+        
+        username = data.get("username")
+        source_date = data.get("source_date")
+        target_date = data.get("target_date") or CalorieLog.today_iso()
+        
+        if not username or not source_date:
+            return jsonify({"error": "username and source_date are required"}), 400
+        
+        # Get user from database
+        user_row = db_helper.fetch_one(
+            "SELECT * FROM users WHERE username = ?",
+            (username,)
+        )
+        if not user_row:
+            return jsonify({"error": "User not found"}), 404
+        
+        user = User.from_row(user_row)
+        
+        try:
+            # Copy and re-total on one connection
+            with db_helper.transaction():
+                logs = Calorie_manager.copy_day(user.id, source_date, target_date)
+                totals = Calorie_manager.get_day_totals(user.id, target_date)
+            
+            if not logs:
+                return jsonify({"error": "No logs found for source_date"}), 404
+            
+            return jsonify({
+                "message": f"Copied {len(logs)} logs",
+                "logs": [log.to_dict() for log in logs],
+                "totals": totals
+            }), 201
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
     @app.route("/api/calories/logs/<int:user_id>", methods=["GET"])
+    @versioned(CALORIES)
     def get_calorie_logs(user_id):
         """Get calorie logs for a user, optionally filtered by date."""
         entry_date = request.args.get("date")  # Optional date parameter
@@ -144,6 +313,7 @@ def register_calories_routes(app):
             return jsonify({"error": str(e)}), 500
 
     @app.route("/api/calories/logs/<int:user_id>/today", methods=["GET"])
+    @versioned(CALORIES, TDEE)
     def get_today_logs(user_id):
         """Get today's calorie logs for a user, including total calories, goal calories, and surplus."""
         try:
@@ -192,20 +362,38 @@ def register_calories_routes(app):
         """Update a calorie log entry."""
         data = request.get_json() or {}
         
+        user_id = data.get("user_id")
         description = data.get("description")
         calories = data.get("calories")
         protein_g = data.get("protein_g")
         carbs_g = data.get("carbs_g")
         fat_g = data.get("fat_g")
         
+        if not user_id:
+            return jsonify({"error": "user_id is required"}), 400
+        
+        try:
+            user_id = int(user_id)
+        except (ValueError, TypeError):
+            return jsonify({"error": "Invalid user_id format"}), 400
+        
+        try:
+            calories, protein_g, carbs_g, fat_g = (
+                float(value) if value is not None else None
+                for value in (calories, protein_g, carbs_g, fat_g)
+            )
+        except (ValueError, TypeError):
+            return jsonify({"error": "calories, protein_g, carbs_g and fat_g must be numbers"}), 400
+        
         try:
             updated_log = Calorie_manager.update_log(
                 log_id=log_id,
+                user_id=user_id,
                 description=description,
-                calories=float(calories) if calories is not None else None,
-                protein_g=float(protein_g) if protein_g is not None else None,
-                carbs_g=float(carbs_g) if carbs_g is not None else None,
-                fat_g=float(fat_g) if fat_g is not None else None,
+                calories=calories,
+                protein_g=protein_g,
+                carbs_g=carbs_g,
+                fat_g=fat_g,
             )
             
             if not updated_log:
@@ -220,13 +408,23 @@ def register_calories_routes(app):
 
     @app.route("/api/calories/log/<int:log_id>", methods=["DELETE"])
     def delete_calorie_log(log_id):
-        """Delete a calorie log entry."""
-        log = Calorie_manager.get_log_by_id(log_id)
+        """Delete a calorie log entry owned by the user."""
+        # DELETE can use query params or JSON body
+        user_id = request.args.get("user_id", type=int)
+        if not user_id:
+            data = request.get_json(silent=True) or {}
+            user_id = data.get("user_id")
         
-        if not log:
-            return jsonify({"error": "Log entry not found"}), 404
+        if not user_id:
+            return jsonify({"error": "user_id is required"}), 400
         
-        Calorie_manager.delete_log(log_id)
+        try:
+            user_id = int(user_id)
+        except (ValueError, TypeError):
+            return jsonify({"error": "Invalid user_id format"}), 400
+        
+        if not Calorie_manager.delete_log(log_id, user_id):
+            return jsonify({"error": "Log entry not found"}), 404
         
         return jsonify({
             "message": "Log deleted successfully"
@@ -0,0 +1,25 @@
+from flask import request, jsonify
+from app.services.dashboard_service import DashboardService
+from app.api.etag import versioned
+from app.services.version_service import CALORIES, TDEE, WORKOUTS
+
+
+def register_dashboard_routes(app):
+    @app.route("/api/dashboard/<int:user_id>", methods=["GET"])
+    @versioned(CALORIES, WORKOUTS, TDEE)
+    def get_dashboard(user_id):
+        """
+        The day's logs, totals, goal and surplus, the latest workout summary
+        and the TDEE profile in one response (?date= defaults to today).
+        """
+        entry_date = request.args.get("date")  # Optional date parameter
+        
+        try:
+            dashboard = DashboardService.get_dashboard(user_id, entry_date)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        
+        if dashboard is None:
+            return jsonify({"error": "User not found"}), 404
+        
+        return jsonify(dashboard), 200
@@ -0,0 +1,42 @@
+from functools import wraps
+from hashlib import blake2b
+from flask import request, make_response
+from app.models.calorie_entry import CalorieLog
+from app.services.version_service import VersionService
+
+
+def versioned(*resources):
+    """
+    Give a per-user GET endpoint an ETag built from the user's resource
+    versions and answer a matching If-None-Match with 304, before the view
+    runs any of its queries. The user comes from the user_id URL argument
+    or query parameter; today's date is part of the tag because several
+    views default to today.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            user_id = kwargs.get("user_id") or request.args.get("user_id", type=int)
+            if not user_id:
+                return view(*args, **kwargs)
+            
+            versions = VersionService.get_versions(user_id, resources)
+            key = "|".join(
+                [request.full_path, CalorieLog.today_iso()]
+                + [f"{name}={versions[name]}" for name in resources]
+            )
+            etag = blake2b(key.encode(), digest_size=12).hexdigest()
+            
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            # Browsers revalidate on every fetch and reuse their copy on 304
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,40 @@
+import json
+import queue
+from flask import Response, stream_with_context
+from app.services.event_hub import events
+
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_SECONDS = 25
+
+
+def register_events_routes(app):
+    @app.route("/api/events/<int:user_id>", methods=["GET"])
+    def stream_events(user_id):
+        """
+        Server-Sent Events stream of the user's changes: log_added,
+        log_updated, log_deleted, feed_added, feed_deleted, card_enriched,
+        workout_saved, workout_deleted, import_progress, account_deletion,
+        and resync when the client fell behind and should reload.
+        """
+        stream = events.subscribe(user_id)
+        
+        def generate():
+            try:
+                # Browsers reconnect after this many milliseconds
+                yield "retry: 5000\n\n"
+                while True:
+                    try:
+                        event, data = stream.get(timeout=KEEPALIVE_SECONDS)
+                    except queue.Empty:
+                        yield ": keep-alive\n\n"
+                        continue
+                    yield f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+            finally:
+                events.unsubscribe(user_id, stream)
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
@@ -0,0 +1,23 @@
+from flask import request, jsonify, Response
+from app.services.export_service import ExportService
+from app.db import db_helper
+
+
+def register_export_routes(app):
+    @app.route("/api/export/<int:user_id>", methods=["GET"])
+    def export_user_data(user_id):
+        """
+        Stream a user's complete history as NDJSON (?gzip=1 for a gzip file).
+        """
+        compress = request.args.get("gzip", "0").lower() in ("1", "true", "yes")
+        
+        user_row = db_helper.fetch_one("SELECT id FROM users WHERE id = ?", (user_id,))
+        if not user_row:
+            return jsonify({"error": "User not found"}), 404
+        
+        filename = f"athleticore-export-{user_id}.ndjson" + (".gz" if compress else "")
+        return Response(
+            ExportService.iter_ndjson(user_id, compress),
+            mimetype="application/gzip" if compress else "application/x-ndjson",
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
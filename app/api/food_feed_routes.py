@@ -1,8 +1,15 @@
 from flask import request, jsonify
 from app.services.food_feed_service import FoodFeedService
 from app.services.food_chatbot_client import process_food_entry
+from app.services.chat_session_service import CONTEXT_MESSAGES
 from app.db import db_helper
 from app.models.user import User
+from app.api.etag import versioned
+from app.services.version_service import FOOD_FEED
+
+
+# Largest page of chat history returned at once
+MAX_HISTORY_PAGE = 200
 
 
 def register_food_feed_routes(app):
@@ -38,7 +45,7 @@ def register_food_feed_routes(app):
             return jsonify({"error": "Food entry not found"}), 404
         
         # Load previous chat history from database
-        db_chat_history = FoodFeedService.get_chat_history(food_feed_id)
+        db_chat_history = FoodFeedService.get_chat_history(food_feed_id, limit=CONTEXT_MESSAGES)
         db_history_formatted = [
             {"role": chat.role, "content": chat.content}
             for chat in db_chat_history
@@ -52,29 +59,21 @@ def register_food_feed_routes(app):
         
         # Call AI chatbot
         reply_text, nutrition_result = process_food_entry(
+            user_id=user.id,
             message=message,
             chat_history=final_history
         )
         
-        # Save user message to database
-        FoodFeedService.save_chat_message(food_feed_id, "user", message)
-        
-        # Save AI response to database
-        FoodFeedService.save_chat_message(food_feed_id, "assistant", reply_text)
-        
-        # If AI returned nutrition data, update the food feed entry
-        if nutrition_result and nutrition_result.get("ready_to_save"):
-            FoodFeedService.update_food_card(
-                feed_id=food_feed_id,
-                food_name=nutrition_result["food_name"],
-                calories=nutrition_result["calories"],
-                protein_g=nutrition_result["protein_g"],
-                carbs_g=nutrition_result["carbs_g"],
-                fat_g=nutrition_result["fat_g"]
-            )
+        # Save both messages (and the card, if the AI finished) in one transaction
+        saved_messages, _ = FoodFeedService.save_chat_turn(
+            food_feed_id, message, reply_text, nutrition_result
+        )
         
         # Prepare response
-        response_data = {"reply": reply_text}
+        response_data = {
+            "reply": reply_text,
+            "messages": [chat.to_dict() for chat in saved_messages]
+        }
         if nutrition_result:
             response_data["nutrition_result"] = nutrition_result
         
@@ -115,6 +114,7 @@ def register_food_feed_routes(app):
         }), 201
 
     @app.route("/api/food/feed/<int:user_id>", methods=["GET"])
+    @versioned(FOOD_FEED)
     def get_food_feed(user_id):
         """Get today's food feed for a user."""
         entry_date = request.args.get("date")  # Optional date parameter
@@ -125,32 +125,82 @@ def register_food_feed_routes(app):
             "feed": [entry.to_dict() for entry in feed_entries]
         }), 200
 
+    @app.route("/api/food/search", methods=["GET"])
+    def search_food():
+        """Full-text search over a user's food history (feed cards and calorie logs)."""
+        user_id = request.args.get("user_id", type=int)
+        query = request.args.get("q", "")
+        page = request.args.get("page", 1, type=int)
+        per_page = request.args.get("per_page", 20, type=int)
+        
+        if not user_id:
+            return jsonify({"error": "user_id is required as a query parameter"}), 400
+        
+        if not query.strip():
+            return jsonify({"error": "q is required"}), 400
+        
+        page = max(page, 1)
+        per_page = min(max(per_page, 1), 100)
+        
+        # Fetch one extra row to know whether another page exists
+        results = FoodFeedService.search_food_history(
+            user_id=user_id,
+            text=query,
+            limit=per_page + 1,
+            offset=(page - 1) * per_page
+        )
+        
+        return jsonify({
+            "results": results[:per_page],
+            "page": page,
+            "per_page": per_page,
+            "has_more": len(results) > per_page
+        }), 200
+
     @app.route("/api/food/entry/<int:feed_id>", methods=["GET"])
     def get_food_entry(feed_id):
-        """Get a specific food entry with its chat history."""
+        """Get a specific food entry with a page of its chat history (?before_id=&limit=)."""
+        before_id = request.args.get("before_id", type=int)
+        limit = min(max(request.args.get("limit", 50, type=int), 1), MAX_HISTORY_PAGE)
+        
         feed_entry = FoodFeedService.get_feed_by_id(feed_id)
         
         if not feed_entry:
             return jsonify({"error": "Food entry not found"}), 404
         
-        # Get chat history for this entry
-        chat_history = FoodFeedService.get_chat_history(feed_id)
+        # Newest page of chat history; one extra (oldest) row tells whether more exist
+        chat_history = FoodFeedService.get_chat_history(feed_id, before_id=before_id, limit=limit + 1)
+        has_more = len(chat_history) > limit
+        if has_more:
+            chat_history = chat_history[1:]
         
         return jsonify({
             "feed_entry": feed_entry.to_dict(),
-            "chat_history": [chat.to_dict() for chat in chat_history]
+            "chat_history": [chat.to_dict() for chat in chat_history],
+            "has_more": has_more,
+            "next_before_id": chat_history[0].id if has_more else None
         }), 200
 
     @app.route("/api/food/entry/<int:feed_id>", methods=["DELETE"])
     def delete_food_entry(feed_id):
-        """Delete a food entry."""
-        feed_entry = FoodFeedService.get_feed_by_id(feed_id)
-        
-        if not feed_entry:
+        """Delete a food entry owned by the user."""
+        # DELETE can use query params or JSON body
+        user_id = request.args.get("user_id", type=int)
+        if not user_id:
+            data = request.get_json(silent=True) or {}
+            user_id = data.get("user_id")
+        
+        if not user_id:
+            return jsonify({"error": "user_id is required"}), 400
+        
+        try:
+            user_id = int(user_id)
+        except (ValueError, TypeError):
+            return jsonify({"error": "Invalid user_id format"}), 400
+        
+        if not FoodFeedService.delete_feed_entry(feed_id, user_id):
             return jsonify({"error": "Food entry not found"}), 404
         
-        FoodFeedService.delete_feed_entry(feed_id)
-        
         return jsonify({
             "message": "Food entry deleted successfully"
         }), 200
@@ -0,0 +1,42 @@
+from flask import request, jsonify
+from app.services.import_service import ImportService, read_records, IMPORT_FORMATS
+from app.db import db_helper
+
+
+def register_import_routes(app):
+    @app.route("/api/import", methods=["POST"])
+    def import_history():
+        """
+        Import calorie and workout history from an uploaded CSV or NDJSON
+        file (multipart field "file", optionally .gz). user_id and format
+        come from the form or query string; format defaults to the file
+        extension. Progress is pushed to the user's event stream.
+        """
+        user_id = request.values.get("user_id", type=int)
+        upload = request.files.get("file")
+
+        if not user_id:
+            return jsonify({"error": "user_id is required"}), 400
+
+        if upload is None or not upload.filename:
+            return jsonify({"error": "file is required"}), 400
+
+        filename = upload.filename.lower()
+        gzipped = filename.endswith(".gz")
+        fmt = request.values.get("format") or ("csv" if filename.removesuffix(".gz").endswith(".csv") else "ndjson")
+        if fmt not in IMPORT_FORMATS:
+            return jsonify({"error": f"format must be one of: {', '.join(IMPORT_FORMATS)}"}), 400
+
+        user_row = db_helper.fetch_one("SELECT id FROM users WHERE id = ?", (user_id,))
+        if not user_row:
+            return jsonify({"error": "User not found"}), 404
+
+        try:
+            result = ImportService.import_records(user_id, read_records(upload.stream, fmt, gzipped))
+        except (UnicodeDecodeError, OSError) as e:
+            return jsonify({"error": f"Could not read file: {e}"}), 400
+
+        return jsonify({
+            "message": f"Imported {result['calorie_logs']} calorie logs and {result['workouts']} workouts",
+            **result
+        }), 200
@@ -0,0 +1,48 @@
+from flask import request, jsonify
+from app.services.account_deletion_service import AccountDeletionService
+from app.services.auth_manager import Authentication_manager
+from app.db import db_helper
+
+
+def register_settings_routes(app):
+    @app.route("/api/settings/account/<int:user_id>", methods=["DELETE"])
+    def delete_account(user_id):
+        """
+        Delete the account and all of its data in the background. Requires
+        the account password in the body. Answers 202 with the job status
+        right away; poll /api/settings/account/<user_id>/deletion or watch
+        account_deletion events for progress. Calling it again resumes a
+        job that stopped.
+        """
+        data = request.get_json() or {}
+        
+        password = data.get("password")
+        
+        if not password:
+            return jsonify({"error": "password is required"}), 400
+        
+        user_row = db_helper.fetch_one("SELECT password_hash FROM users WHERE id = ?", (user_id,))
+        if user_row is None:
+            job = AccountDeletionService.get_status(user_id)
+            if job is not None:
+                return jsonify(job), 200
+            return jsonify({"error": "User not found"}), 404
+        
+        if Authentication_manager.hash_password(password) != user_row[0]:
+            return jsonify({"error": "Wrong password"}), 401
+        
+        job = AccountDeletionService.request_deletion(user_id)
+        if job is None:
+            return jsonify({"error": "User not found"}), 404
+        
+        return jsonify(job), 202
+
+    @app.route("/api/settings/account/<int:user_id>/deletion", methods=["GET"])
+    def get_account_deletion(user_id):
+        """Status and progress of the user's account deletion job."""
+        job = AccountDeletionService.get_status(user_id)
+        
+        if job is None:
+            return jsonify({"error": "No deletion requested for this user"}), 404
+        
+        return jsonify(job), 200
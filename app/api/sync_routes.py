@@ -0,0 +1,31 @@
+from flask import request, jsonify
+from app.services.sync_service import SyncService
+
+
+# Most changed rows returned per sync page
+MAX_SYNC_PAGE = 1000
+
+
+def register_sync_routes(app):
+    @app.route("/api/sync", methods=["GET"])
+    def sync():
+        """
+        Changes since the client's last sync token (?user_id=&since=&limit=).
+        since=0 returns everything; keep calling with next_token while has_more.
+        """
+        user_id = request.args.get("user_id", type=int)
+        since = request.args.get("since", 0, type=int)
+        limit = min(max(request.args.get("limit", 500, type=int), 1), MAX_SYNC_PAGE)
+        
+        if not user_id:
+            return jsonify({"error": "user_id is required as a query parameter"}), 400
+        
+        if since < 0:
+            return jsonify({"error": "since must be a sync token returned by this endpoint"}), 400
+        
+        try:
+            result = SyncService.get_changes(user_id, since, limit)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        
+        return jsonify(result), 200
@@ -1,8 +1,15 @@
 from flask import request, jsonify
 from app.services.tdee_service import TdeeService
 from app.services.chatgpt_client import chat_with_coach
+from app.services.chat_session_service import CONTEXT_MESSAGES
 from app.db import db_helper
 from app.models.user import User
+from app.api.etag import versioned
+from app.services.version_service import TDEE
+
+
+# Largest page of chat history returned at once
+MAX_HISTORY_PAGE = 200
 
 
 def register_tdee_routes(app):
@@ -13,12 +20,15 @@ def register_tdee_routes(app):
         
         message = data.get("message")
         username = data.get("username")
-        chat_history = data.get("history", [])
+        last_seen_id = data.get("last_seen_id")
         stats = data.get("stats", {})
         
         if not message or not username:
             return jsonify({"error": "message and username are required"}), 400
         
+        if last_seen_id is not None and not isinstance(last_seen_id, int):
+            return jsonify({"error": "last_seen_id must be an integer"}), 400
+        
         # Get user from database to get their stats
         user_row = db_helper.fetch_one(
             "SELECT * FROM users WHERE username = ?",
@@ -39,22 +49,21 @@ def register_tdee_routes(app):
         profile_id = TdeeService.get_or_create_profile_id(user.id)
         profile = TdeeService.get_profile_by_user_id(user.id)
         
-        # Load previous chat history from database
-        db_chat_history = TdeeService.get_chat_history(profile.id)
-        db_history_formatted = [
+        # The conversation lives on the server: the client only says what it has seen
+        missed_messages = []
+        missed_has_more = False
+        if last_seen_id is not None:
+            # One extra row tells whether more was missed than one page holds
+            missed_messages = TdeeService.get_chat_after(profile.id, last_seen_id, limit=MAX_HISTORY_PAGE + 1)
+            missed_has_more = len(missed_messages) > MAX_HISTORY_PAGE
+            missed_messages = missed_messages[:MAX_HISTORY_PAGE]
+        
+        # Build the prompt from the latest stored messages (the page shows them on load)
+        final_history = [
             {"role": chat.role, "content": chat.content}
-            for chat in db_chat_history
+            for chat in TdeeService.get_chat_history(profile.id, limit=CONTEXT_MESSAGES)
         ]
         
-        # Use frontend history if provided (current session), otherwise use DB history
-        # Frontend history is more up-to-date for the current session
-        if chat_history:
-            # Frontend is maintaining current session, use it
-            final_history = chat_history
-        else:
-            # No frontend history, use DB history
-            final_history = db_history_formatted
-        
         # Call AI coach
         reply_text, tdee_result = chat_with_coach(
             user_name=user.username,
@@ -66,19 +75,44 @@ def register_tdee_routes(app):
             chat_history=final_history
         )
         
-        # Save user message to database
-        TdeeService.save_chat_message(profile.id, "user", message)
-        
-        # Save AI response to database
-        TdeeService.save_chat_message(profile.id, "assistant", reply_text)
+        # Save the user message and AI response together
+        saved_messages = TdeeService.save_chat_turn(profile.id, message, reply_text)
         
         # Prepare response
-        response_data = {"reply": reply_text}
+        response_data = {
+            "reply": reply_text,
+            "session_id": profile.id,
+            "messages": [chat.to_dict() for chat in saved_messages],
+            "missed_messages": [chat.to_dict() for chat in missed_messages],
+            "missed_has_more": missed_has_more
+        }
         if tdee_result:
             response_data["tdee_result"] = tdee_result
         
         return jsonify(response_data), 200
 
+    @app.route("/api/tdee/chat/history/<int:user_id>", methods=["GET"])
+    def get_tdee_chat_history(user_id):
+        """Get a page of TDEE chat history, newest page first (?before_id=&limit=)."""
+        before_id = request.args.get("before_id", type=int)
+        limit = min(max(request.args.get("limit", 50, type=int), 1), MAX_HISTORY_PAGE)
+        
+        profile = TdeeService.get_profile_by_user_id(user_id)
+        if not profile:
+            return jsonify({"messages": [], "has_more": False}), 200
+        
+        # One extra (oldest) row tells whether an older page exists
+        messages = TdeeService.get_chat_history(profile.id, before_id=before_id, limit=limit + 1)
+        has_more = len(messages) > limit
+        if has_more:
+            messages = messages[1:]
+        
+        return jsonify({
+            "messages": [chat.to_dict() for chat in messages],
+            "has_more": has_more,
+            "next_before_id": messages[0].id if has_more else None
+        }), 200
+
     @app.route("/api/tdee/profile", methods=["POST"])
     def save_tdee_profile():
         """Save or update TDEE profile."""
@@ -127,6 +161,7 @@ def register_tdee_routes(app):
             return jsonify({"error": str(e)}), 500
 
     @app.route("/api/tdee/profile/<int:user_id>", methods=["GET"])
+    @versioned(TDEE)
     def get_tdee_profile(user_id):
         """Get TDEE profile for a user."""
         profile = TdeeService.get_profile_by_user_id(user_id)
@@ -1,11 +1,17 @@
 from flask import request, jsonify
 from app.services.workout_service import WorkoutService
+from app.services.workout_analytics import WorkoutAnalytics
+from app.services.personal_records_service import PersonalRecordsService
 import traceback
 import sqlite3
+from app.api.etag import versioned
+from app.services.validators import check_exercise
+from app.services.version_service import WORKOUTS
 
 
 def register_workout_routes(app):
     @app.route("/api/workouts", methods=["GET"])
+    @versioned(WORKOUTS)
     def get_workouts():
         """Get all workouts for a user."""
         try:
@@ -54,19 +60,10 @@ def register_workout_routes(app):
             return jsonify({"error": "At least one exercise is required"}), 400
         
         for i, exercise in enumerate(exercises):
-            if not isinstance(exercise, dict):
-                return jsonify({"error": f"Exercise {i + 1}: must be an object"}), 400
-            exercise_name = exercise.get("exercise_name")
-            if not exercise_name or not str(exercise_name).strip():
-                return jsonify({"error": f"Exercise {i + 1}: exercise_name is required"}), 400
-            sets_value = exercise.get("sets")
-            if sets_value is None or (isinstance(sets_value, (int, float)) and sets_value <= 0):
-                return jsonify({"error": f"Exercise {i + 1}: sets is required and must be greater than 0"}), 400
-            reps_value = exercise.get("reps")
-            if reps_value is None or (isinstance(reps_value, (int, float)) and reps_value <= 0):
-                return jsonify({"error": f"Exercise {i + 1}: reps is required and must be greater than 0"}), 400
-            if exercise.get("order_index") is None:
-                return jsonify({"error": f"Exercise {i + 1}: order_index is required"}), 400
+            try:
+                check_exercise(exercise)
+            except ValueError as e:
+                return jsonify({"error": f"Exercise {i + 1}: {e}"}), 400
         
         try:
             # Convert user_id to int
@@ -112,6 +109,86 @@ def register_workout_routes(app):
             # Return the actual error message to help with debugging
             return jsonify({"error": f"An unexpected error occurred: {error_msg} (Type: {error_type})"}), 500
 
+    @app.route("/api/workouts/last-performance", methods=["GET"])
+    def get_last_performance():
+        """Get the most recent sets, reps and weight for a batch of exercises."""
+        try:
+            user_id = request.args.get("user_id", type=int)
+            
+            if not user_id:
+                return jsonify({"error": "user_id is required as a query parameter"}), 400
+            
+            # Accept ?exercise=A&exercise=B and/or ?names=A,B
+            names = request.args.getlist("exercise")
+            if request.args.get("names"):
+                names.extend(request.args.get("names").split(","))
+            
+            if not names:
+                return jsonify({"error": "At least one exercise name is required"}), 400
+            
+            last_performance = WorkoutService.get_last_performance(user_id, names)
+            
+            return jsonify({
+                "last_performance": {
+                    name: last_performance.get(WorkoutService.exercise_key(name))
+                    for name in names
+                    if name.strip()
+                }
+            }), 200
+        except Exception as e:
+            print(f"Error getting last performance: {e}")
+            traceback.print_exc()
+            return jsonify({"error": "An unexpected error occurred"}), 500
+
+    @app.route("/api/workouts/analytics", methods=["GET"])
+    @versioned(WORKOUTS)
+    def get_workout_analytics():
+        """Get estimated 1RM, weekly tonnage, PRs and trends for a user."""
+        try:
+            user_id = request.args.get("user_id", type=int)
+            
+            if not user_id:
+                return jsonify({"error": "user_id is required as a query parameter"}), 400
+            
+            analytics = WorkoutAnalytics.get_analytics(
+                user_id,
+                formula=request.args.get("formula", "epley").lower(),
+                start_date=request.args.get("start_date"),
+                end_date=request.args.get("end_date"),
+                exercise_id=request.args.get("exercise_id", type=int),
+            )
+            
+            return jsonify(analytics), 200
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            print(f"Error getting workout analytics: {e}")
+            traceback.print_exc()
+            return jsonify({"error": "An unexpected error occurred"}), 500
+
+    @app.route("/api/workouts/personal-records", methods=["GET"])
+    @versioned(WORKOUTS)
+    def get_personal_records():
+        """Get a user's best weight, estimated 1RM and volume per exercise."""
+        try:
+            user_id = request.args.get("user_id", type=int)
+            
+            if not user_id:
+                return jsonify({"error": "user_id is required as a query parameter"}), 400
+            
+            records = PersonalRecordsService.get_records(
+                user_id,
+                exercise_id=request.args.get("exercise_id", type=int)
+            )
+            
+            return jsonify({
+                "personal_records": [record.to_dict() for record in records]
+            }), 200
+        except Exception as e:
+            print(f"Error getting personal records: {e}")
+            traceback.print_exc()
+            return jsonify({"error": "An unexpected error occurred"}), 500
+
     @app.route("/api/workouts/<int:workout_id>", methods=["GET"])
     def get_workout(workout_id):
         """Get workout details with all exercises."""
@@ -136,6 +213,35 @@ def register_workout_routes(app):
             traceback.print_exc()
             return jsonify({"error": "An unexpected error occurred"}), 500
 
+    @app.route("/api/workouts/<int:workout_id>/clone", methods=["POST"])
+    def clone_workout(workout_id):
+        """Repeat a workout (with its exercises) on a new date."""
+        data = request.get_json() or {}
+        user_id = data.get("user_id")
+        
+        if not user_id:
+            return jsonify({"error": "user_id is required"}), 400
+        
+        try:
+            result = WorkoutService.clone_workout(
+                workout_id=workout_id,
+                user_id=int(user_id),
+                log_date=data.get("log_date"),
+                workout_name=data.get("workout_name")
+            )
+            
+            if not result:
+                return jsonify({"error": "Workout not found or unauthorized"}), 404
+            
+            return jsonify({
+                "message": "Workout copied successfully",
+                **result
+            }), 201
+        except Exception as e:
+            print(f"Error cloning workout: {e}")
+            traceback.print_exc()
+            return jsonify({"error": "An unexpected error occurred"}), 500
+
     @app.route("/api/workouts/<int:workout_id>", methods=["DELETE"])
     def delete_workout(workout_id):
         """Delete a workout and its exercises."""
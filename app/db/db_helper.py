@@ -1,29 +1,164 @@
 import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
 from .init_db import DB_PATH
+
+# Larger than any rowid, so "id < MAX_ROW_ID" matches every row
+MAX_ROW_ID = 2 ** 63 - 1
+
+# Connection of the transaction() block currently running, if any
+_active_conn = ContextVar("active_conn", default=None)
+
+# Autocommit connection of the shared_connection() block currently running, if any
+_shared_conn = ContextVar("shared_conn", default=None)
+
+# Callbacks waiting for the running transaction() block to commit
+_after_commit = ContextVar("after_commit", default=None)
+
 def get_connection():
     conn=sqlite3.connect(DB_PATH)
     conn.execute("PRAGMA foreign_keys = ON;")
     return conn
-def execute_query(query, params=()):
 
+def _acquire():
+    """The open transaction's or shared connection, or a new one the caller must commit and close."""
+    conn = _active_conn.get() or _shared_conn.get()
+    if conn is not None:
+        return conn, False
+    return get_connection(), True
+
+def in_transaction():
+    """Whether a transaction() block is running (its writes may still roll back)."""
+    return _active_conn.get() is not None
+
+def after_commit(callback):
+    """Call callback once the running transaction commits (never, if it rolls back), or now outside one."""
+    pending = _after_commit.get()
+    if pending is None:
+        callback()
+    else:
+        pending.append(callback)
+
+@contextmanager
+def shared_connection():
+    """
+    Run every db_helper call in the block on one autocommit connection, so
+    each write still commits on its own. transaction() blocks inside it
+    run on the same connection. Nested blocks reuse the outer connection.
+    """
+    if _active_conn.get() is not None or _shared_conn.get() is not None:
+        yield _active_conn.get() or _shared_conn.get()
+        return
     conn = get_connection()
+    conn.isolation_level = None
+    token = _shared_conn.set(conn)
+    try:
+        yield conn
+    finally:
+        _shared_conn.reset(token)
+        conn.close()
+
+@contextmanager
+def transaction(immediate=True):
+    """
+    Run every db_helper call in the block on one connection and commit once
+    at the end (rolled back if the block raises). Nested blocks join the
+    outer transaction. immediate=False takes no write lock up front, which
+    suits read-only blocks that only need a consistent snapshot.
+    """
+    if _active_conn.get() is not None:
+        yield _active_conn.get()
+        return
+    shared = _shared_conn.get()
+    conn = shared or get_connection()
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    token = _active_conn.set(conn)
+    callbacks = []
+    callbacks_token = _after_commit.set(callbacks)
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        _after_commit.reset(callbacks_token)
+        _active_conn.reset(token)
+        if shared is None:
+            conn.close()
+    for callback in callbacks:
+        callback()
+
+def execute_query(query, params=()):
+    """Run a write and return the number of rows it changed."""
+    conn, owned = _acquire()
     cursor = conn.cursor()
     cursor.execute(query, params)
-    conn.commit()
-    conn.close()
+    if owned:
+        conn.commit()
+        conn.close()
+    return cursor.rowcount
 def fetch_one(query, params=()):
- 
-    conn = get_connection()
+
+    conn, owned = _acquire()
     cursor = conn.cursor()
     cursor.execute(query, params)
     row = cursor.fetchone()
-    conn.close()
+    if owned:
+        conn.close()
     return row
 
 def fetch_all(query, params=()):
-    conn = get_connection()
+    conn, owned = _acquire()
     cursor = conn.cursor()
     cursor.execute(query, params)
     rows = cursor.fetchall()
-    conn.close()
-    return rows
\ No newline at end of file
+    if owned:
+        conn.close()
+    return rows
+
+def execute_returning(query, params=()):
+    """Run a write with a RETURNING clause, commit, and return the first row."""
+    conn, owned = _acquire()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    row = cursor.fetchone()
+    if owned:
+        conn.commit()
+        conn.close()
+    return row
+
+def execute_many(query, params_seq):
+    """
+    Run one statement for every parameter tuple in a single transaction
+    (the running one, or its own; also under shared_connection()).
+    """
+    with transaction() as conn:
+        conn.cursor().executemany(query, params_seq)
+
+def execute_returning_all(query, params=()):
+    """Run a write with a RETURNING clause, commit, and return every row."""
+    conn, owned = _acquire()
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    if owned:
+        conn.commit()
+        conn.close()
+    return rows
+
+def insert_many(query, params_seq):
+    """
+    executemany an INSERT into an AUTOINCREMENT table and return the new ids
+    in order. The rows are written in one transaction under one write lock
+    (the running transaction, or its own), so their ids are consecutive;
+    not for INSERT OR IGNORE/REPLACE or explicit ids.
+    """
+    params_seq = list(params_seq)
+    if not params_seq:
+        return []
+    with transaction() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(query, params_seq)
+        last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - len(params_seq) + 1, last_id + 1))
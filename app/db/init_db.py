@@ -1,14 +1,34 @@
 import os
 import sqlite3
+from datetime import datetime
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "athleticore.db")
 
 
+# Common shorthand that should land on the same catalog exercise
+EXERCISE_ALIASES = {
+    "Bench Press": ["bp", "flat bench", "flat bench press"],
+    "Overhead Press": ["ohp", "military press", "shoulder press"],
+    "Romanian Deadlift": ["rdl"],
+    "Pull Up": ["pullup", "pullups", "pull ups"],
+    "Chin Up": ["chinup", "chinups", "chin ups"],
+    "Push Up": ["pushup", "pushups", "push ups"],
+}
+
+
+def normalize_exercise_name(name):
+    """Catalog key for an exercise name: lowercase, single spaces, no dashes."""
+    cleaned = name.replace("-", " ").replace("_", " ").replace(".", " ")
+    return " ".join(cleaned.lower().split())
+
+
 def create_connection():
     conn = sqlite3.connect(DB_PATH)
     conn.execute("PRAGMA foreign_keys = ON;")
+    # Only takes effect on a new database (see RetentionService for existing ones)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL;")
     return conn
 
 
@@ -100,6 +120,28 @@ def create_tables(conn):
         fat_g REAL,
         created_at TEXT NOT NULL,
         is_deleted INTEGER DEFAULT 0,
+        deleted_at TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        );
+        """
+    )
+    migrate_calorie_logs(cursor)
+
+    # Soft-deleted calorie logs moved out of calorie_logs after the retention period
+    cursor.execute(
+        """ CREATE TABLE IF NOT EXISTS calorie_logs_archive (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        entry_date TEXT NOT NULL,
+        description TEXT,
+        calories REAL,
+        protein_g REAL,
+        carbs_g REAL,
+        fat_g REAL,
+        created_at TEXT NOT NULL,
+        is_deleted INTEGER DEFAULT 1,
+        deleted_at TEXT,
+        archived_at TEXT NOT NULL,
         FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
         );
         """
@@ -118,37 +160,473 @@ def create_tables(conn):
         """
     )
 
+    cursor.execute(
+        """ CREATE TABLE IF NOT EXISTS chat_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        feature TEXT NOT NULL,       -- which chat the session belongs to, e.g. "calories"
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        );
+        """
+    )
+
     cursor.execute(
         """ CREATE TABLE IF NOT EXISTS chat_messages (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL,
-    sender TEXT NOT NULL,        -- "user" or "ai"
+    sender TEXT NOT NULL,        -- "user" or "assistant"
     message TEXT NOT NULL,       -- the actual chat content
     created_at TEXT NOT NULL,
+    session_id INTEGER REFERENCES chat_sessions(id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
             );
             """
     )
+    migrate_chat_messages(cursor)
+
+    cursor.execute(
+        """ CREATE TABLE IF NOT EXISTS exercises (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        normalized_name TEXT NOT NULL UNIQUE,
+        created_at TEXT NOT NULL
+        );
+        """
+    )
+
+    cursor.execute(
+        """ CREATE TABLE IF NOT EXISTS exercise_aliases (
+        alias TEXT PRIMARY KEY,      -- normalized alias, e.g. "ohp"
+        exercise_id INTEGER NOT NULL,
+        FOREIGN KEY (exercise_id) REFERENCES exercises(id) ON DELETE CASCADE
+        );
+        """
+    )
+
+    seed_exercise_aliases(cursor)
+    migrate_workout_exercises(cursor)
 
     cursor.execute(
         """ CREATE TABLE IF NOT EXISTS workout_exercises (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         workout_id INTEGER NOT NULL,
-        exercise_name TEXT NOT NULL,
+        exercise_id INTEGER NOT NULL,
         sets INTEGER,
         reps INTEGER,
         weight_kg REAL,
         previous_weight REAL,
         order_index INTEGER NOT NULL,
         notes TEXT,
-        FOREIGN KEY (workout_id) REFERENCES workouts(id) ON DELETE CASCADE
+        FOREIGN KEY (workout_id) REFERENCES workouts(id) ON DELETE CASCADE,
+        FOREIGN KEY (exercise_id) REFERENCES exercises(id)
+        );
+        """
+    )
+
+    cursor.execute(
+        """ CREATE TABLE IF NOT EXISTS personal_records (
+        user_id INTEGER NOT NULL,
+        exercise_id INTEGER NOT NULL,
+        best_weight_kg REAL NOT NULL,          -- heaviest single set
+        best_weight_reps INTEGER,
+        best_weight_workout_id INTEGER,
+        best_weight_date TEXT,
+        best_e1rm_kg REAL NOT NULL,            -- best Epley estimated 1RM
+        best_e1rm_workout_id INTEGER,
+        best_e1rm_date TEXT,
+        best_volume_kg REAL NOT NULL,          -- most sets x reps x weight in one workout
+        best_volume_workout_id INTEGER,
+        best_volume_date TEXT,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (user_id, exercise_id),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (exercise_id) REFERENCES exercises(id)
         );
         """
     )
 
+    # While a bulk import holds the write lock it puts a row here; the INSERT
+    # triggers of BULK_LOADED_TABLES then skip and the importer does their
+    # work once per chunk (see ImportService)
+    cursor.execute(
+        """ CREATE TABLE IF NOT EXISTS bulk_load (
+        name TEXT PRIMARY KEY
+        );
+        """
+    )
+
+    # One row per account deletion job; kept after the user row is gone so
+    # the job's outcome can still be read (see AccountDeletionService)
+    cursor.execute(
+        """ CREATE TABLE IF NOT EXISTS account_deletions (
+        user_id INTEGER PRIMARY KEY,
+        status TEXT NOT NULL,                  -- running, done or failed
+        step TEXT,
+        rows_deleted INTEGER NOT NULL DEFAULT 0,
+        requested_at TEXT NOT NULL,
+        finished_at TEXT,
+        error TEXT
+        );
+        """
+    )
+
+    create_search_tables(cursor)
+    create_version_tables(cursor)
+    create_change_log(cursor)
+    create_indexes(cursor)
+
     conn.commit()
 
 
+def _get_or_create_exercise(cursor, name):
+    normalized = normalize_exercise_name(name)
+    cursor.execute(
+        "SELECT exercise_id FROM exercise_aliases WHERE alias = ?",
+        (normalized,)
+    )
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+
+    cursor.execute(
+        "INSERT OR IGNORE INTO exercises (name, normalized_name, created_at) VALUES (?, ?, ?)",
+        (" ".join(name.split()), normalized, datetime.utcnow().isoformat())
+    )
+    cursor.execute(
+        "SELECT id FROM exercises WHERE normalized_name = ?",
+        (normalized,)
+    )
+    return cursor.fetchone()[0]
+
+
+def seed_exercise_aliases(cursor):
+    """Make sure the built-in aliases point at their catalog exercises."""
+    for name, aliases in EXERCISE_ALIASES.items():
+        exercise_id = _get_or_create_exercise(cursor, name)
+        for alias in aliases:
+            cursor.execute(
+                "INSERT OR IGNORE INTO exercise_aliases (alias, exercise_id) VALUES (?, ?)",
+                (normalize_exercise_name(alias), exercise_id)
+            )
+
+
+def migrate_workout_exercises(cursor):
+    """
+    Move an old workout_exercises table (free-text exercise_name on every row)
+    onto the exercises catalog, referencing it by exercise_id instead.
+    """
+    cursor.execute("PRAGMA table_info(workout_exercises)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if "exercise_name" not in columns:
+        return
+
+    # Map every distinct spelling to its catalog id
+    cursor.execute("SELECT DISTINCT exercise_name FROM workout_exercises")
+    name_map = [
+        (exercise_name, _get_or_create_exercise(cursor, exercise_name.strip() or "Unnamed Exercise"))
+        for (exercise_name,) in cursor.fetchall()
+    ]
+    cursor.execute("CREATE TEMP TABLE exercise_name_map (exercise_name TEXT PRIMARY KEY, exercise_id INTEGER NOT NULL)")
+    cursor.executemany("INSERT INTO exercise_name_map (exercise_name, exercise_id) VALUES (?, ?)", name_map)
+
+    cursor.execute(
+        """ CREATE TABLE workout_exercises_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        workout_id INTEGER NOT NULL,
+        exercise_id INTEGER NOT NULL,
+        sets INTEGER,
+        reps INTEGER,
+        weight_kg REAL,
+        previous_weight REAL,
+        order_index INTEGER NOT NULL,
+        notes TEXT,
+        FOREIGN KEY (workout_id) REFERENCES workouts(id) ON DELETE CASCADE,
+        FOREIGN KEY (exercise_id) REFERENCES exercises(id)
+        );
+        """
+    )
+    cursor.execute(
+        """
+        INSERT INTO workout_exercises_new (
+            id, workout_id, exercise_id, sets, reps, weight_kg,
+            previous_weight, order_index, notes
+        )
+        SELECT we.id, we.workout_id, m.exercise_id, we.sets, we.reps, we.weight_kg,
+               we.previous_weight, we.order_index, we.notes
+        FROM workout_exercises we
+        JOIN exercise_name_map m ON m.exercise_name = we.exercise_name
+        """
+    )
+    cursor.execute("DROP TABLE workout_exercises")
+    cursor.execute("ALTER TABLE workout_exercises_new RENAME TO workout_exercises")
+    cursor.execute("DROP TABLE exercise_name_map")
+
+
+def migrate_calorie_logs(cursor):
+    """
+    Add the deleted_at column to a calorie_logs table created before it;
+    logs already soft-deleted count as deleted when they were created.
+    """
+    cursor.execute("PRAGMA table_info(calorie_logs)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if "deleted_at" not in columns:
+        cursor.execute("ALTER TABLE calorie_logs ADD COLUMN deleted_at TEXT")
+        cursor.execute("UPDATE calorie_logs SET deleted_at = created_at WHERE is_deleted = 1")
+
+
+def migrate_chat_messages(cursor):
+    """Add the session_id column to a chat_messages table created before sessions."""
+    cursor.execute("PRAGMA table_info(chat_messages)")
+    columns = {row[1] for row in cursor.fetchall()}
+    if "session_id" not in columns:
+        cursor.execute(
+            "ALTER TABLE chat_messages ADD COLUMN session_id INTEGER REFERENCES chat_sessions(id) ON DELETE CASCADE"
+        )
+
+
+def create_indexes(cursor):
+    """Secondary indexes for the per-user lookups the services run."""
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_calorie_logs_user_date ON calorie_logs(user_id, entry_date)"
+    )
+    # Only soft-deleted rows, oldest deletion first, for the retention job
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_calorie_logs_deleted ON calorie_logs(deleted_at) WHERE is_deleted = 1"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_calorie_logs_archive_user ON calorie_logs_archive(user_id, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_food_feed_user_date ON food_feed(user_id, entry_date)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_workouts_user_date ON workouts(user_id, date)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_workout_exercises_exercise ON workout_exercises(exercise_id, workout_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_workout_exercises_workout ON workout_exercises(workout_id, order_index)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_chat_sessions_user ON chat_sessions(user_id, feature)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages(session_id, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_tdee_chat_profile ON tdee_chat(tdee_profile_id, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_food_chat_feed ON food_chat(food_feed_id, id)"
+    )
+    # One user's rows in id order, for the export's keyset pages (and the
+    # account deletion batches over chat messages without a session)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_calorie_logs_user_id ON calorie_logs(user_id, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_food_feed_user_id ON food_feed(user_id, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_workouts_user_id ON workouts(user_id, id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_chat_messages_user ON chat_messages(user_id, id)"
+    )
+
+
+def create_search_tables(cursor):
+    """
+    FTS5 indexes over food text, kept in sync with the base tables by triggers.
+    Tables created for the first time on an existing database are backfilled.
+    """
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('food_feed_fts', 'calorie_logs_fts')"
+    )
+    existing = {row[0] for row in cursor.fetchall()}
+
+    cursor.execute(
+        """ CREATE VIRTUAL TABLE IF NOT EXISTS food_feed_fts USING fts5(
+        content,
+        food_name,
+        content='food_feed',
+        content_rowid='id'
+        );
+        """
+    )
+
+    cursor.execute(
+        """ CREATE VIRTUAL TABLE IF NOT EXISTS calorie_logs_fts USING fts5(
+        description,
+        content='calorie_logs',
+        content_rowid='id'
+        );
+        """
+    )
+
+    cursor.executescript(
+        """
+        CREATE TRIGGER IF NOT EXISTS food_feed_fts_insert AFTER INSERT ON food_feed BEGIN
+            INSERT INTO food_feed_fts (rowid, content, food_name)
+            VALUES (new.id, new.content, new.food_name);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS food_feed_fts_delete AFTER DELETE ON food_feed BEGIN
+            INSERT INTO food_feed_fts (food_feed_fts, rowid, content, food_name)
+            VALUES ('delete', old.id, old.content, old.food_name);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS food_feed_fts_update AFTER UPDATE OF content, food_name ON food_feed BEGIN
+            INSERT INTO food_feed_fts (food_feed_fts, rowid, content, food_name)
+            VALUES ('delete', old.id, old.content, old.food_name);
+            INSERT INTO food_feed_fts (rowid, content, food_name)
+            VALUES (new.id, new.content, new.food_name);
+        END;
+
+        DROP TRIGGER IF EXISTS calorie_logs_fts_insert;
+        CREATE TRIGGER calorie_logs_fts_insert AFTER INSERT ON calorie_logs
+        WHEN NOT EXISTS (SELECT 1 FROM bulk_load) BEGIN
+            INSERT INTO calorie_logs_fts (rowid, description)
+            VALUES (new.id, new.description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS calorie_logs_fts_delete AFTER DELETE ON calorie_logs BEGIN
+            INSERT INTO calorie_logs_fts (calorie_logs_fts, rowid, description)
+            VALUES ('delete', old.id, old.description);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS calorie_logs_fts_update AFTER UPDATE OF description ON calorie_logs BEGIN
+            INSERT INTO calorie_logs_fts (calorie_logs_fts, rowid, description)
+            VALUES ('delete', old.id, old.description);
+            INSERT INTO calorie_logs_fts (rowid, description)
+            VALUES (new.id, new.description);
+        END;
+        """
+    )
+
+    if "food_feed_fts" not in existing:
+        cursor.execute("INSERT INTO food_feed_fts (food_feed_fts) VALUES ('rebuild')")
+    if "calorie_logs_fts" not in existing:
+        cursor.execute("INSERT INTO calorie_logs_fts (calorie_logs_fts) VALUES ('rebuild')")
+
+
+# Tables the bulk importer inserts into, and the guard their INSERT triggers carry
+BULK_LOADED_TABLES = ("calorie_logs", "workouts", "workout_exercises")
+BULK_LOAD_GUARD = "WHEN NOT EXISTS (SELECT 1 FROM bulk_load)"
+
+
+def _create_row_trigger(cursor, name, event, table, body):
+    """
+    AFTER trigger on table; INSERT triggers of bulk-loaded tables are
+    (re)created with the bulk_load guard.
+    """
+    guard = ""
+    if event == "INSERT" and table in BULK_LOADED_TABLES:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        guard = BULK_LOAD_GUARD
+    cursor.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table} {guard} BEGIN
+            {body}
+        END;
+        """
+    )
+
+
+# Tables whose writes bump a per-user resource version:
+# table -> (resource, SQL giving the owning user_id from `row`)
+VERSIONED_TABLES = {
+    "calorie_logs": ("calories", "row.user_id"),
+    "food_feed": ("food_feed", "row.user_id"),
+    "workouts": ("workouts", "row.user_id"),
+    "workout_exercises": ("workouts", "(SELECT user_id FROM workouts WHERE id = row.workout_id)"),
+    "personal_records": ("workouts", "row.user_id"),
+    "tdee_profile": ("tdee", "row.user_id"),
+    "users": ("tdee", "row.id"),
+}
+
+
+def create_version_tables(cursor):
+    """
+    Per-user, per-resource version counters for ETags. Triggers bump them
+    inside the same transaction as every write to the tables they cover.
+    """
+    cursor.execute(
+        """ CREATE TABLE IF NOT EXISTS resource_versions (
+        user_id INTEGER NOT NULL,
+        resource TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        PRIMARY KEY (user_id, resource)
+        );
+        """
+    )
+
+    for table, (resource, user_sql) in VERSIONED_TABLES.items():
+        for event, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+            # Rows whose owner is already gone (cascaded deletes) bump nothing
+            _create_row_trigger(
+                cursor, f"{table}_version_{event.lower()}", event, table,
+                f"""INSERT INTO resource_versions (user_id, resource, version)
+            SELECT owner, '{resource}', 1 FROM (SELECT {user_sql.replace("row.", row + ".")} AS owner)
+            WHERE owner IS NOT NULL
+            ON CONFLICT (user_id, resource) DO UPDATE SET version = version + 1;"""
+            )
+
+
+# Tables whose rows /api/sync hands out: table -> SQL giving the owning user_id from `row`
+SYNCED_TABLES = {
+    "calorie_logs": "row.user_id",
+    "food_feed": "row.user_id",
+    "workouts": "row.user_id",
+    "workout_exercises": "(SELECT user_id FROM workouts WHERE id = row.workout_id)",
+}
+
+
+def create_change_log(cursor):
+    """
+    Append-only log of which synced rows changed, in commit order (seq),
+    written by triggers. A change_log created on an existing database is
+    backfilled with every current row.
+    """
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'change_log'")
+    exists = cursor.fetchone() is not None
+
+    cursor.execute(
+        """ CREATE TABLE IF NOT EXISTS change_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        entity TEXT NOT NULL,
+        entity_id INTEGER NOT NULL
+        );
+        """
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_change_log_user_seq ON change_log(user_id, seq)"
+    )
+
+    for table, user_sql in SYNCED_TABLES.items():
+        for event, row in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+            # Children deleted along with their workout are covered by the workout's entry
+            _create_row_trigger(
+                cursor, f"{table}_change_{event.lower()}", event, table,
+                f"""INSERT INTO change_log (user_id, entity, entity_id)
+            SELECT owner, '{table}', {row}.id FROM (SELECT {user_sql.replace("row.", row + ".")} AS owner)
+            WHERE owner IS NOT NULL;"""
+            )
+
+        if not exists:
+            cursor.execute(
+                f"""
+                INSERT INTO change_log (user_id, entity, entity_id)
+                SELECT owner, '{table}', id FROM (SELECT {user_sql} AS owner, row.id FROM {table} row)
+                WHERE owner IS NOT NULL
+                ORDER BY id
+                """
+            )
+
+
 def init_db():
     """Create the database file and all tables."""
     os.makedirs(BASE_DIR, exist_ok=True)
@@ -9,6 +9,7 @@ class ChatMessage:
     sender: str
     message: str
     created_at: str
+    session_id: Optional[int] = None
 
     @classmethod
     def from_row(cls, row: tuple) -> "ChatMessage":
@@ -16,7 +17,7 @@ class ChatMessage:
         row must come from:
         SELECT * FROM chat_messages
         with columns in this exact order:
-        id, user_id, sender, message, created_at
+        id, user_id, sender, message, created_at, session_id
         """
         return cls(
             id=row[0],
@@ -24,6 +25,7 @@ class ChatMessage:
             sender=row[2],
             message=row[3],
             created_at=row[4],
+            session_id=row[5],
         )
 
     def to_dict(self) -> dict:
@@ -33,6 +35,7 @@ class ChatMessage:
             "sender": self.sender,
             "message": self.message,
             "created_at": self.created_at,
+            "session_id": self.session_id,
         }
 
     @staticmethod
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Optional
+from datetime import datetime
+
+@dataclass
+class ChatSession:
+    id: Optional[int]
+    user_id: int
+    feature: str
+    created_at: str
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "ChatSession":
+        """
+        row must come from:
+        SELECT * FROM chat_sessions
+        with columns in this exact order:
+        id, user_id, feature, created_at
+        """
+        return cls(
+            id=row[0],
+            user_id=row[1],
+            feature=row[2],
+            created_at=row[3],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "feature": self.feature,
+            "created_at": self.created_at,
+        }
+
+    @staticmethod
+    def now_iso() -> str:
+        return datetime.utcnow().isoformat()
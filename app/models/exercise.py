@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Optional
+from datetime import datetime
+
+@dataclass
+class Exercise:
+    id: Optional[int]
+    name: str
+    normalized_name: str
+    created_at: str
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "Exercise":
+        """
+        row must come from:
+        SELECT * FROM exercises
+        with columns in this exact order:
+        id, name, normalized_name, created_at
+        """
+        return cls(
+            id=row[0],
+            name=row[1],
+            normalized_name=row[2],
+            created_at=row[3],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "normalized_name": self.normalized_name,
+            "created_at": self.created_at,
+        }
+
+    @staticmethod
+    def now_iso() -> str:
+        return datetime.utcnow().isoformat()
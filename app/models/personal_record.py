@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from typing import Optional
+from datetime import datetime
+
+@dataclass
+class PersonalRecord:
+    user_id: int
+    exercise_id: int
+    exercise_name: str
+    best_weight_kg: float
+    best_weight_reps: Optional[int]
+    best_weight_workout_id: Optional[int]
+    best_weight_date: Optional[str]
+    best_e1rm_kg: float
+    best_e1rm_workout_id: Optional[int]
+    best_e1rm_date: Optional[str]
+    best_volume_kg: float
+    best_volume_workout_id: Optional[int]
+    best_volume_date: Optional[str]
+    updated_at: str
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "PersonalRecord":
+        """
+        row must come from PersonalRecordsService.RECORD_SELECT
+        with columns in this exact order:
+        user_id, exercise_id, exercise_name,
+        best_weight_kg, best_weight_reps, best_weight_workout_id, best_weight_date,
+        best_e1rm_kg, best_e1rm_workout_id, best_e1rm_date,
+        best_volume_kg, best_volume_workout_id, best_volume_date, updated_at
+        """
+        return cls(
+            user_id=row[0],
+            exercise_id=row[1],
+            exercise_name=row[2],
+            best_weight_kg=row[3],
+            best_weight_reps=row[4],
+            best_weight_workout_id=row[5],
+            best_weight_date=row[6],
+            best_e1rm_kg=row[7],
+            best_e1rm_workout_id=row[8],
+            best_e1rm_date=row[9],
+            best_volume_kg=row[10],
+            best_volume_workout_id=row[11],
+            best_volume_date=row[12],
+            updated_at=row[13],
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "exercise_id": self.exercise_id,
+            "exercise_name": self.exercise_name,
+            "best_weight": {
+                "weight_kg": self.best_weight_kg,
+                "reps": self.best_weight_reps,
+                "workout_id": self.best_weight_workout_id,
+                "date": self.best_weight_date,
+            },
+            "best_estimated_1rm": {
+                "estimated_1rm_kg": round(self.best_e1rm_kg, 2),
+                "workout_id": self.best_e1rm_workout_id,
+                "date": self.best_e1rm_date,
+            },
+            "best_volume": {
+                "volume_kg": self.best_volume_kg,
+                "workout_id": self.best_volume_workout_id,
+                "date": self.best_volume_date,
+            },
+            "updated_at": self.updated_at,
+        }
+
+    @staticmethod
+    def now_iso() -> str:
+        return datetime.utcnow().isoformat()
@@ -13,15 +13,16 @@ class WorkoutExercise:
     previous_weight: Optional[float]
     order_index: int
     notes: Optional[str]
+    exercise_id: Optional[int] = None
 
     @classmethod
     def from_row(cls, row: tuple) -> "WorkoutExercise":
         """
-        row must come from:
-        SELECT * FROM workout_exercises
+        row must come from WorkoutService.EXERCISE_SELECT
+        (workout_exercises joined to exercises for the name)
         with columns in this exact order:
         id, workout_id, exercise_name, sets, reps, weight_kg,
-        previous_weight, order_index, notes
+        previous_weight, order_index, notes, exercise_id
         """
         return cls(
             id=row[0],
@@ -33,6 +34,7 @@ class WorkoutExercise:
             previous_weight=row[6],
             order_index=row[7],
             notes=row[8],
+            exercise_id=row[9],
         )
 
     def to_dict(self) -> dict:
@@ -46,6 +48,7 @@ class WorkoutExercise:
             "previous_weight": self.previous_weight,
             "order_index": self.order_index,
             "notes": self.notes,
+            "exercise_id": self.exercise_id,
         }
 
     @staticmethod
@@ -0,0 +1,250 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.db import db_helper
+from app.models.user import User
+from app.services.autocomplete_service import autocomplete
+from app.services.event_hub import events, ACCOUNT_DELETION
+from app.services.food_similarity_cache import similarity_index
+from app.services.recent_foods import recent_foods
+
+
+# Longest a deletion batch may hold the write lock; other writers wait at most about this long
+WRITE_BUDGET_SECONDS = float(os.getenv("ACCOUNT_DELETION_WRITE_BUDGET_MS", "50")) / 1000
+
+# Parent rows deleted per batch to start with, and the bounds the batch size adapts within
+DELETE_BATCH_SIZE = 500
+MIN_DELETE_BATCH = 10
+MAX_DELETE_BATCH = 5000
+
+# Least time between batches, so waiting writers get the lock
+BATCH_PAUSE_SECONDS = 0.01
+
+# Tables emptied for a user, in order: (table, query for a batch of the user's rowids in it).
+# Children go before their parents, each in batches of their own, so a parent with many
+# children never turns into one big cascade. change_log comes last since the delete
+# triggers of the tables above it still append to it.
+DELETION_STEPS: List[Tuple[str, str]] = [
+    ("personal_records", "SELECT rowid FROM personal_records WHERE user_id = ? LIMIT ?"),
+    ("calorie_logs", "SELECT id FROM calorie_logs WHERE user_id = ? LIMIT ?"),
+    ("calorie_logs_archive", "SELECT id FROM calorie_logs_archive WHERE user_id = ? LIMIT ?"),
+    (
+        "food_chat",
+        "SELECT c.id FROM food_feed f JOIN food_chat c ON c.food_feed_id = f.id WHERE f.user_id = ? LIMIT ?",
+    ),
+    ("food_feed", "SELECT id FROM food_feed WHERE user_id = ? LIMIT ?"),
+    (
+        "workout_exercises",
+        "SELECT we.id FROM workouts w JOIN workout_exercises we ON we.workout_id = w.id WHERE w.user_id = ? LIMIT ?",
+    ),
+    ("workouts", "SELECT id FROM workouts WHERE user_id = ? LIMIT ?"),
+    (
+        "chat_messages",
+        "SELECT m.id FROM chat_sessions s JOIN chat_messages m ON m.session_id = s.id WHERE s.user_id = ? LIMIT ?",
+    ),
+    ("chat_sessions", "SELECT id FROM chat_sessions WHERE user_id = ? LIMIT ?"),
+    # Messages written before chat sessions existed (idx_chat_messages_user)
+    ("chat_messages", "SELECT id FROM chat_messages WHERE user_id = ? LIMIT ?"),
+    (
+        "tdee_chat",
+        "SELECT c.id FROM tdee_profile p JOIN tdee_chat c ON c.tdee_profile_id = p.id WHERE p.user_id = ? LIMIT ?",
+    ),
+    ("tdee_profile", "SELECT id FROM tdee_profile WHERE user_id = ? LIMIT ?"),
+    ("change_log", "SELECT seq FROM change_log WHERE user_id = ? LIMIT ?"),
+]
+
+# Users whose deletion job runs in this process
+_running = set()
+_running_lock = threading.Lock()
+
+
+def _next_batch_size(batch_size: int, held: float) -> int:
+    """Shrink the batch in proportion when it held the lock past the budget, grow it when well under."""
+    if held > WRITE_BUDGET_SECONDS:
+        return max(MIN_DELETE_BATCH, int(batch_size * WRITE_BUDGET_SECONDS / held))
+    if held < WRITE_BUDGET_SECONDS / 2:
+        return min(MAX_DELETE_BATCH, batch_size * 2)
+    return batch_size
+
+
+def _job_from_row(row: tuple) -> Dict[str, Any]:
+    return {
+        "user_id": row[0],
+        "status": row[1],
+        "step": row[2],
+        "rows_deleted": row[3],
+        "requested_at": row[4],
+        "finished_at": row[5],
+        "error": row[6],
+    }
+
+
+class AccountDeletionService:
+    @staticmethod
+    def get_status(user_id: int) -> Optional[Dict[str, Any]]:
+        """The user's deletion job, or None if none was requested."""
+        row = db_helper.fetch_one("SELECT * FROM account_deletions WHERE user_id = ?", (user_id,))
+        return _job_from_row(row) if row else None
+
+    @staticmethod
+    def open_job(user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Record a deletion job for a user, or reopen one that stopped
+        (failed, or interrupted by a restart). A finished job is left as is.
+
+        Returns:
+            The job status, or None if the user does not exist and was never deleted
+        """
+        with db_helper.transaction():
+            job = AccountDeletionService.get_status(user_id)
+            if job is not None and job["status"] == "done":
+                return job
+            if db_helper.fetch_one("SELECT id FROM users WHERE id = ?", (user_id,)) is None:
+                return None
+            job_row = db_helper.execute_returning(
+                """
+                INSERT INTO account_deletions (user_id, status, requested_at)
+                VALUES (?, 'running', ?)
+                ON CONFLICT (user_id) DO UPDATE SET status = 'running', finished_at = NULL, error = NULL
+                RETURNING *
+                """,
+                (user_id, User.now_iso())
+            )
+        return _job_from_row(job_row)
+
+    @staticmethod
+    def request_deletion(user_id: int) -> Optional[Dict[str, Any]]:
+        """Open the user's deletion job and run it in the background; same return as open_job."""
+        job = AccountDeletionService.open_job(user_id)
+        if job is not None and job["status"] == "running":
+            AccountDeletionService.start(user_id)
+        return job
+
+    @staticmethod
+    def start(user_id: int) -> bool:
+        """Run the user's deletion job in a daemon thread unless one already runs here."""
+        with _running_lock:
+            if user_id in _running:
+                return False
+            _running.add(user_id)
+        threading.Thread(target=AccountDeletionService._run_claimed, args=(user_id,), daemon=True).start()
+        return True
+
+    @staticmethod
+    def pending_user_ids() -> List[int]:
+        """Users whose deletion job is marked running (possibly by a process that stopped)."""
+        rows = db_helper.fetch_all("SELECT user_id FROM account_deletions WHERE status = 'running'")
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def resume_pending() -> List[int]:
+        """Restart every job left running by a previous process; returns their user ids."""
+        return [user_id for user_id in AccountDeletionService.pending_user_ids() if AccountDeletionService.start(user_id)]
+
+    @staticmethod
+    def _run_claimed(user_id: int) -> None:
+        try:
+            AccountDeletionService.run(user_id)
+        finally:
+            with _running_lock:
+                _running.discard(user_id)
+
+    @staticmethod
+    def run(user_id: int, progress=None) -> Dict[str, Any]:
+        """
+        Delete everything a user owns, then the user, in batches of one
+        short write transaction each instead of one cascade that locks out
+        every other writer for its whole length.
+
+        Batch sizes adapt so each batch holds the write lock for about
+        WRITE_BUDGET_SECONDS at most, and the job sleeps between batches
+        (at least as long as the batch held the lock) so waiting requests
+        get through. Progress is saved with every batch and pushed to the
+        user's event stream. Rows written while the job runs are removed
+        by the final cascade.
+
+        Returns:
+            The finished job status
+        """
+        try:
+            for table, select_ids in DELETION_STEPS:
+                batch_size = DELETE_BATCH_SIZE
+                while True:
+                    with db_helper.transaction():
+                        started = time.perf_counter()
+                        ids = [row[0] for row in db_helper.fetch_all(select_ids, (user_id, batch_size))]
+                        deleted = 0
+                        if ids:
+                            deleted = db_helper.execute_query(
+                                f"DELETE FROM {table} WHERE rowid IN ({','.join('?' * len(ids))})", tuple(ids)
+                            )
+                        job_row = db_helper.execute_returning(
+                            """
+                            UPDATE account_deletions SET step = ?, rows_deleted = rows_deleted + ?
+                            WHERE user_id = ?
+                            RETURNING *
+                            """,
+                            (table, deleted, user_id)
+                        )
+                        events.publish(user_id, ACCOUNT_DELETION, _job_from_row(job_row))
+                    held = time.perf_counter() - started
+
+                    if progress:
+                        progress(_job_from_row(job_row))
+                    if len(ids) < batch_size:
+                        break
+                    batch_size = _next_batch_size(batch_size, held)
+                    time.sleep(max(BATCH_PAUSE_SECONDS, held))
+
+            with db_helper.transaction():
+                # Cascades whatever was written since its table was emptied
+                deleted = db_helper.execute_query("DELETE FROM users WHERE id = ?", (user_id,))
+                deleted += db_helper.execute_query("DELETE FROM change_log WHERE user_id = ?", (user_id,))
+                db_helper.execute_query("DELETE FROM resource_versions WHERE user_id = ?", (user_id,))
+                job_row = db_helper.execute_returning(
+                    """
+                    UPDATE account_deletions
+                    SET status = 'done', step = NULL, rows_deleted = rows_deleted + ?, finished_at = ?
+                    WHERE user_id = ?
+                    RETURNING *
+                    """,
+                    (deleted, User.now_iso(), user_id)
+                )
+                events.publish(user_id, ACCOUNT_DELETION, _job_from_row(job_row))
+        except sqlite3.Error as e:
+            job_row = db_helper.execute_returning(
+                "UPDATE account_deletions SET status = 'failed', error = ? WHERE user_id = ? RETURNING *",
+                (str(e), user_id)
+            )
+            return _job_from_row(job_row)
+
+        recent_foods.forget_user(user_id)
+        similarity_index.forget_user(user_id)
+        autocomplete.forget_user(user_id)
+        return _job_from_row(job_row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete user accounts in small batches.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--user-id", type=int, help="Delete this user's account")
+    target.add_argument("--resume", action="store_true", help="Finish every interrupted deletion job")
+    args = parser.parse_args()
+
+    def report(job):
+        print(f"user {job['user_id']}: {job['rows_deleted']} rows deleted ({job['step'] or job['status']})")
+
+    if args.resume:
+        user_ids = AccountDeletionService.pending_user_ids()
+    else:
+        job = AccountDeletionService.open_job(args.user_id)
+        if job is None:
+            parser.error(f"user {args.user_id} does not exist")
+        user_ids = [args.user_id] if job["status"] == "running" else []
+
+    for user_id in user_ids:
+        report(AccountDeletionService.run(user_id, progress=report))
@@ -0,0 +1,220 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.db import db_helper
+
+
+# Total memory the cached tries may use before the least recently used are dropped
+MEMORY_BUDGET_BYTES = int(os.getenv("AUTOCOMPLETE_MEMORY_BUDGET_BYTES", str(32 * 1024 * 1024)))
+
+# Rough per-node cost of a dict-backed trie node in CPython
+NODE_BYTES = 240
+
+# A term's weight halves every HALF_LIFE_DAYS without use
+HALF_LIFE_DAYS = 30.0
+
+EXERCISES = "exercises"
+FOODS = "foods"
+
+
+class Term:
+    __slots__ = ("text", "count", "last_used")
+
+    def __init__(self, text: str, count: int, last_used: str):
+        self.text = text
+        self.count = count
+        self.last_used = last_used
+
+    def score(self, now: datetime) -> float:
+        """Frequency decayed by how long ago the term was last used."""
+        try:
+            age_days = max((now - datetime.fromisoformat(self.last_used[:19])).total_seconds() / 86400, 0.0)
+        except ValueError:
+            age_days = 0.0
+        return self.count * 0.5 ** (age_days / HALF_LIFE_DAYS)
+
+    def to_dict(self) -> dict:
+        return {"text": self.text, "count": self.count, "last_used": self.last_used}
+
+
+class TrieNode:
+    __slots__ = ("children", "terms")
+
+    def __init__(self):
+        self.children: Dict[str, "TrieNode"] = {}
+        self.terms: Optional[List[Term]] = None
+
+
+class PrefixTrie:
+    """
+    Prefix trie over one user's terms. Every word start of a term is indexed,
+    so "bench" finds "Barbell Bench Press".
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+        self.node_count = 1
+        self._terms: Dict[str, Term] = {}
+
+    def _insert_key(self, key: str, term: Term) -> None:
+        node = self.root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = TrieNode()
+                node.children[char] = child
+                self.node_count += 1
+            node = child
+        if node.terms is None:
+            node.terms = []
+        node.terms.append(term)
+
+    def add(self, text: str, used_at: str, count: int = 1) -> None:
+        text = " ".join(text.split())
+        key = text.lower()
+        if not key:
+            return
+
+        term = self._terms.get(key)
+        if term is not None:
+            term.count += count
+            if used_at > term.last_used:
+                term.last_used = used_at
+            return
+
+        term = Term(text, count, used_at)
+        self._terms[key] = term
+        words = key.split(" ")
+        for idx in range(len(words)):
+            self._insert_key(" ".join(words[idx:]), term)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Term]:
+        node = self.root
+        for char in " ".join(prefix.lower().split()):
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        found = {}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            if current.terms:
+                for term in current.terms:
+                    found[id(term)] = term
+            stack.extend(current.children.values())
+
+        now = datetime.utcnow()
+        ranked = sorted(found.values(), key=lambda term: (term.score(now), term.last_used), reverse=True)
+        return ranked[:limit]
+
+
+def _load_exercises(user_id: int) -> List[Tuple[str, int, str]]:
+    return db_helper.fetch_all(
+        """
+        SELECT e.name, COUNT(*), MAX(w.date)
+        FROM workout_exercises we
+        JOIN workouts w ON w.id = we.workout_id
+        JOIN exercises e ON e.id = we.exercise_id
+        WHERE w.user_id = ?
+        GROUP BY we.exercise_id
+        """,
+        (user_id,)
+    )
+
+
+def _load_foods(user_id: int) -> List[Tuple[str, int, str]]:
+    log_rows = db_helper.fetch_all(
+        """
+        SELECT MAX(description), COUNT(*), MAX(created_at)
+        FROM calorie_logs
+        WHERE user_id = ? AND is_deleted = 0 AND description IS NOT NULL
+        GROUP BY lower(trim(description))
+        """,
+        (user_id,)
+    )
+    feed_rows = db_helper.fetch_all(
+        """
+        SELECT MAX(food_name), COUNT(*), MAX(created_at)
+        FROM food_feed
+        WHERE user_id = ? AND food_name IS NOT NULL
+        GROUP BY lower(trim(food_name))
+        """,
+        (user_id,)
+    )
+    return list(log_rows) + list(feed_rows)
+
+
+_LOADERS = {EXERCISES: _load_exercises, FOODS: _load_foods}
+
+
+class AutocompleteService:
+    """
+    Per-user prefix tries for exercise names and food descriptions.
+
+    Tries are built on first use and evicted least-recently-used once their
+    estimated size exceeds the memory budget.
+    """
+
+    def __init__(self, memory_budget: int = MEMORY_BUDGET_BYTES):
+        self.memory_budget = memory_budget
+        self._lock = threading.Lock()
+        self._tries: "OrderedDict[Tuple[str, int], PrefixTrie]" = OrderedDict()
+        self._bytes_used = 0
+
+    def _trie_for(self, kind: str, user_id: int) -> PrefixTrie:
+        key = (kind, user_id)
+        trie = self._tries.get(key)
+        if trie is not None:
+            self._tries.move_to_end(key)
+            return trie
+
+        trie = PrefixTrie()
+        for text, count, last_used in _LOADERS[kind](user_id):
+            if text:
+                trie.add(text, last_used or "", count)
+        self._tries[key] = trie
+        self._bytes_used += trie.node_count * NODE_BYTES
+        self._evict(keep=key)
+        return trie
+
+    def _evict(self, keep: Tuple[str, int]) -> None:
+        while self._bytes_used > self.memory_budget and len(self._tries) > 1:
+            oldest_key = next(iter(self._tries))
+            if oldest_key == keep:
+                break
+            evicted = self._tries.pop(oldest_key)
+            self._bytes_used -= evicted.node_count * NODE_BYTES
+
+    def suggest(self, kind: str, user_id: int, prefix: str, limit: int = 10) -> List[dict]:
+        """Best completions for prefix, ranked by recency-weighted frequency."""
+        if not prefix.strip():
+            return []
+        with self._lock:
+            trie = self._trie_for(kind, user_id)
+            return [term.to_dict() for term in trie.complete(prefix, limit)]
+
+    def record(self, kind: str, user_id: int, text: Optional[str], used_at: str) -> None:
+        """Add a newly saved term to the user's trie if it is loaded."""
+        if not text or not text.strip():
+            return
+        with self._lock:
+            trie = self._tries.get((kind, user_id))
+            if trie is None:
+                return
+            before = trie.node_count
+            trie.add(text, used_at)
+            self._bytes_used += (trie.node_count - before) * NODE_BYTES
+            self._evict(keep=(kind, user_id))
+
+    def forget_user(self, user_id: int) -> None:
+        """Drop the user's tries so they are rebuilt from the database on next use."""
+        with self._lock:
+            for key in [key for key in self._tries if key[1] == user_id]:
+                self._bytes_used -= self._tries.pop(key).node_count * NODE_BYTES
+
+
+autocomplete = AutocompleteService()
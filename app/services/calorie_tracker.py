@@ -1,8 +1,43 @@
 from app.models.calorie_entry import CalorieLog
 from app.db import db_helper
+from app.services.food_similarity_cache import remember_food, similarity_index
+from app.services.recent_foods import recent_foods, parse_item_id
+from app.services.autocomplete_service import autocomplete, FOODS
+from app.services.event_hub import events, LOG_ADDED, LOG_UPDATED, LOG_DELETED
 from typing import Optional, List
 
 
+def _remember_logs(user_id: int, logs: List[CalorieLog], used_at: str, similar: bool = True) -> None:
+    """
+    Feed new logs to the in-process caches (similarity index when similar,
+    recent foods, autocomplete) once the write commits, so a rolled-back
+    batch leaves no entries for ids that were never saved.
+    """
+    def remember():
+        for log in logs:
+            if similar:
+                remember_food(user_id, log.description, log.description, log.calories, log.protein_g, log.carbs_g, log.fat_g)
+            recent_foods.record(
+                user_id, f"log:{log.id}", log.description,
+                log.calories, log.protein_g, log.carbs_g, log.fat_g, used_at
+            )
+            autocomplete.record(FOODS, user_id, log.description, used_at)
+    db_helper.after_commit(remember)
+
+
+def _forget_foods(user_id: int) -> None:
+    """
+    Drop the user's cached foods (similarity index, recent foods,
+    autocomplete) once the write commits; they are rebuilt from the
+    database without the edited or deleted log's old values.
+    """
+    def forget():
+        similarity_index.forget_user(user_id)
+        recent_foods.forget_user(user_id)
+        autocomplete.forget_user(user_id)
+    db_helper.after_commit(forget)
+
+
 class Calorie_manager:
     @staticmethod
     #hanadeh men el route haolo add log with these parameters
@@ -57,7 +92,169 @@ class Calorie_manager:
         )
 
         # 5) Convert DB row -> CalorieLog object
-        return CalorieLog.from_row(row)
+        log = CalorieLog.from_row(row)
+
+        # 6) Keep the similarity cache and recent foods current
+        _remember_logs(user_id, [log], created_at)
+        events.publish(user_id, LOG_ADDED, {"logs": [log.to_dict()]})
+        return log
+
+    @staticmethod
+    def add_logs(user_id: int, items: List[dict], entry_date: Optional[str] = None) -> List[CalorieLog]:
+        """
+        Insert several already-validated logs with one executemany.
+
+        Each item has description, calories, protein_g, carbs_g, fat_g and
+        an optional entry_date (falls back to entry_date, then today).
+        Runs in its own transaction unless called inside one.
+        """
+        if entry_date is None:
+            entry_date = CalorieLog.today_iso()
+        created_at = CalorieLog.now_iso()
+
+        with db_helper.transaction():
+            # The transaction holds the write lock, so new ids are all above this
+            last_id = db_helper.fetch_one("SELECT COALESCE(MAX(id), 0) FROM calorie_logs")[0]
+            db_helper.execute_many(
+                """
+                INSERT INTO calorie_logs (
+                    user_id, entry_date, description,
+                    calories, protein_g, carbs_g, fat_g,
+                    created_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        user_id,
+                        item.get("entry_date") or entry_date,
+                        item.get("description"),
+                        item.get("calories"),
+                        item.get("protein_g"),
+                        item.get("carbs_g"),
+                        item.get("fat_g"),
+                        created_at,
+                    )
+                    for item in items
+                ],
+            )
+            rows = db_helper.fetch_all(
+                "SELECT * FROM calorie_logs WHERE user_id = ? AND id > ? ORDER BY id ASC",
+                (user_id, last_id),
+            )
+
+        logs = [CalorieLog.from_row(row) for row in rows]
+        _remember_logs(user_id, logs, created_at)
+        if logs:
+            events.publish(user_id, LOG_ADDED, {"logs": [log.to_dict() for log in logs]})
+        return logs
+
+    @staticmethod
+    def quick_log(user_id: int, item_id: str, entry_date: Optional[str] = None) -> Optional[CalorieLog]:
+        """
+        Re-log a known food by its recent-foods id ("log:<id>" or "feed:<id>")
+        with one INSERT ... SELECT, no model call. Returns None if the source
+        row does not exist, was deleted or belongs to another user.
+        """
+        parsed = parse_item_id(item_id)
+        if parsed is None:
+            return None
+        source, source_id = parsed
+
+        if entry_date is None:
+            entry_date = CalorieLog.today_iso()
+        created_at = CalorieLog.now_iso()
+
+        if source == "log":
+            select_sql = """
+                SELECT user_id, ?, description, calories, protein_g, carbs_g, fat_g, ?
+                FROM calorie_logs
+                WHERE id = ? AND user_id = ? AND is_deleted = 0
+            """
+        else:
+            select_sql = """
+                SELECT user_id, ?, food_name, calories, protein_g, carbs_g, fat_g, ?
+                FROM food_feed
+                WHERE id = ? AND user_id = ? AND calories IS NOT NULL
+            """
+
+        row = db_helper.execute_returning(
+            """
+            INSERT INTO calorie_logs (
+                user_id, entry_date, description,
+                calories, protein_g, carbs_g, fat_g,
+                created_at
+            )
+            """ + select_sql + """
+            RETURNING *
+            """,
+            (entry_date, created_at, source_id, user_id),
+        )
+        if row is None:
+            return None
+
+        log = CalorieLog.from_row(row)
+        _remember_logs(user_id, [log], created_at, similar=False)
+        events.publish(user_id, LOG_ADDED, {"logs": [log.to_dict()]})
+        return log
+
+    @staticmethod
+    def copy_day(user_id: int, source_date: str, target_date: Optional[str] = None) -> List[CalorieLog]:
+        """
+        Copy a day's active logs to another date with one INSERT ... SELECT.
+        Returns the new logs (empty if the source day had none).
+        """
+        if target_date is None:
+            target_date = CalorieLog.today_iso()
+        created_at = CalorieLog.now_iso()
+
+        rows = db_helper.execute_returning_all(
+            """
+            INSERT INTO calorie_logs (
+                user_id, entry_date, description,
+                calories, protein_g, carbs_g, fat_g,
+                created_at
+            )
+            SELECT user_id, ?, description, calories, protein_g, carbs_g, fat_g, ?
+            FROM calorie_logs
+            WHERE user_id = ? AND entry_date = ? AND is_deleted = 0
+            ORDER BY id ASC
+            RETURNING *
+            """,
+            (target_date, created_at, user_id, source_date),
+        )
+
+        logs = [CalorieLog.from_row(row) for row in rows]
+        _remember_logs(user_id, logs, created_at, similar=False)
+        if logs:
+            events.publish(user_id, LOG_ADDED, {"logs": [log.to_dict() for log in logs]})
+        return logs
+
+    @staticmethod
+    def get_day_totals(user_id: int, entry_date: str) -> dict:
+        """Calorie and macro totals of a user's active logs on one date."""
+        row = db_helper.fetch_one(
+            """
+            SELECT COUNT(*), COALESCE(SUM(calories), 0), COALESCE(SUM(protein_g), 0),
+                   COALESCE(SUM(carbs_g), 0), COALESCE(SUM(fat_g), 0)
+            FROM calorie_logs
+            WHERE user_id = ? AND entry_date = ? AND is_deleted = 0
+            """,
+            (user_id, entry_date)
+        )
+        return {
+            "entry_date": entry_date,
+            "log_count": row[0],
+            "total_calories": float(row[1]),
+            "total_protein_g": float(row[2]),
+            "total_carbs_g": float(row[3]),
+            "total_fat_g": float(row[4]),
+        }
+
+    @staticmethod
+    def get_recent_foods(user_id: int, sort: str = "recent", limit: int = 20) -> List[dict]:
+        """Distinct foods the user logged recently (or most often)."""
+        return [food.to_dict() for food in recent_foods.list(user_id, sort, limit)]
 
     @staticmethod
     def get_logs(user_id: int, entry_date: Optional[str] = None) -> List[CalorieLog]:
@@ -105,12 +302,18 @@ class Calorie_manager:
         return 0.0
 
     @staticmethod
-    def get_log_by_id(log_id: int) -> Optional[CalorieLog]:
-        """Get a specific calorie log by ID."""
-        row = db_helper.fetch_one(
-            "SELECT * FROM calorie_logs WHERE id = ? AND is_deleted = 0",
-            (log_id,)
-        )
+    def get_log_by_id(log_id: int, user_id: Optional[int] = None) -> Optional[CalorieLog]:
+        """Get a specific calorie log by ID (only if user_id owns it, when given)."""
+        if user_id is None:
+            row = db_helper.fetch_one(
+                "SELECT * FROM calorie_logs WHERE id = ? AND is_deleted = 0",
+                (log_id,)
+            )
+        else:
+            row = db_helper.fetch_one(
+                "SELECT * FROM calorie_logs WHERE id = ? AND user_id = ? AND is_deleted = 0",
+                (log_id, user_id)
+            )
         if row is None:
             return None
         return CalorieLog.from_row(row)
@@ -118,77 +321,58 @@ class Calorie_manager:
     @staticmethod
     def update_log(
         log_id: int,
+        user_id: int,
         description: Optional[str] = None,
         calories: Optional[float] = None,
         protein_g: Optional[float] = None,
         carbs_g: Optional[float] = None,
         fat_g: Optional[float] = None,
     ) -> Optional[CalorieLog]:
-        """Update a calorie log entry."""
-        # Step 1: Check which fields the user wants to update
-        # Only include fields that are not None (meaning user provided a value)
-        fields_to_update = {}
-        
-        if description is not None:
-            fields_to_update["description"] = description
-        if calories is not None:
-            fields_to_update["calories"] = calories
-        if protein_g is not None:
-            fields_to_update["protein_g"] = protein_g
-        if carbs_g is not None:
-            fields_to_update["carbs_g"] = carbs_g
-        if fat_g is not None:
-            fields_to_update["fat_g"] = fat_g
-        
-        # Step 2: If user didn't provide any fields to update, just return the current log
-        if len(fields_to_update) == 0:
-            return Calorie_manager.get_log_by_id(log_id)
-        
-        # Step 3: Build two lists - one for SQL parts, one for values
-        sql_parts = []
-        values = []
-        
-        # Step 4: Go through each field we want to update
-        for field_name in fields_to_update:
-            # Create SQL part like "description = ?"
-            sql_part = field_name + " = ?"
-            sql_parts.append(sql_part)
-            
-            # Get the actual value (like "Chicken" or 231.0)
-            field_value = fields_to_update[field_name]
-            values.append(field_value)
-        
-        # Step 5: Add the log_id at the end (needed for WHERE id = ?)
-        values.append(log_id)
-        
-        # Step 6: Join all SQL parts with commas
-        # If sql_parts = ["description = ?", "calories = ?"]
-        # Then sql_set_clause = "description = ?, calories = ?"
-        sql_set_clause = ", ".join(sql_parts)
-        
-        # Step 7: Build the complete SQL query
-        # Start with "UPDATE calorie_logs SET "
-        query_start = "UPDATE calorie_logs SET "
-        # Add our SQL parts: "description = ?, calories = ?"
-        query_middle = sql_set_clause
-        # Add the WHERE part: " WHERE id = ? AND is_deleted = 0"
-        query_end = " WHERE id = ? AND is_deleted = 0"
-        # Combine all parts
-        complete_query = query_start + query_middle + query_end
-        
-        # Step 8: Convert values list to tuple and execute query
-        values_tuple = tuple(values)
-        db_helper.execute_query(complete_query, values_tuple)
-        
-        # Step 9: Get and return the updated log
-        updated_log = Calorie_manager.get_log_by_id(log_id)
-        return updated_log
+        """
+        Update a calorie log entry the user owns, in one UPDATE ... RETURNING.
+        Returns None if the log does not exist, is deleted or belongs to
+        someone else.
+        """
+        # Only include fields the user provided a value for
+        fields_to_update = {
+            "description": description,
+            "calories": calories,
+            "protein_g": protein_g,
+            "carbs_g": carbs_g,
+            "fat_g": fat_g,
+        }
+        fields_to_update = {name: value for name, value in fields_to_update.items() if value is not None}
+
+        # Nothing to change: just return the current log
+        if not fields_to_update:
+            return Calorie_manager.get_log_by_id(log_id, user_id)
+
+        # e.g. "description = ?, calories = ?"
+        sql_set_clause = ", ".join(field_name + " = ?" for field_name in fields_to_update)
+        values = tuple(fields_to_update.values()) + (log_id, user_id)
+
+        row = db_helper.execute_returning(
+            "UPDATE calorie_logs SET " + sql_set_clause
+            + " WHERE id = ? AND user_id = ? AND is_deleted = 0 RETURNING *",
+            values
+        )
+        if row is None:
+            return None
+        log = CalorieLog.from_row(row)
+        # The cached foods may hold the old wording or macros
+        _forget_foods(user_id)
+        events.publish(user_id, LOG_UPDATED, {"log": log.to_dict()})
+        return log
 
     @staticmethod
-    def delete_log(log_id: int) -> bool:
-        """Soft delete a calorie log (set is_deleted = 1)."""
-        db_helper.execute_query(
-            "UPDATE calorie_logs SET is_deleted = 1 WHERE id = ?",
-            (log_id,)
+    def delete_log(log_id: int, user_id: int) -> bool:
+        """Soft delete a calorie log the user owns; False if there was none."""
+        deleted = db_helper.execute_query(
+            "UPDATE calorie_logs SET is_deleted = 1, deleted_at = ? WHERE id = ? AND user_id = ? AND is_deleted = 0",
+            (CalorieLog.now_iso(), log_id, user_id)
         )
-        return True
+        if deleted:
+            # Deleted foods must stop matching and leave the recent list
+            _forget_foods(user_id)
+            events.publish(user_id, LOG_DELETED, {"id": log_id})
+        return deleted > 0
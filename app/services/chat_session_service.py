@@ -0,0 +1,85 @@
+from app.models.chat_message import ChatMessage
+from app.models.chat_session import ChatSession
+from app.db import db_helper
+from typing import Optional, List, Dict
+
+
+# Most recent messages sent to the model as conversation context
+CONTEXT_MESSAGES = 20
+
+# Features with their own chat sessions
+CALORIES_CHAT = "calories"
+
+
+class ChatSessionService:
+    @staticmethod
+    def get_or_create_session(user_id: int, feature: str, session_id: Optional[int] = None) -> ChatSession:
+        """
+        The user's session for a feature chat. An unknown session_id, or one
+        that belongs to another user or feature, starts a new session.
+        """
+        if session_id:
+            row = db_helper.fetch_one(
+                "SELECT * FROM chat_sessions WHERE id = ? AND user_id = ? AND feature = ?",
+                (session_id, user_id, feature)
+            )
+            if row is not None:
+                return ChatSession.from_row(row)
+
+        row = db_helper.execute_returning(
+            "INSERT INTO chat_sessions (user_id, feature, created_at) VALUES (?, ?, ?) RETURNING *",
+            (user_id, feature, ChatSession.now_iso())
+        )
+        return ChatSession.from_row(row)
+
+    @staticmethod
+    def get_recent_messages(session_id: int, limit: int = CONTEXT_MESSAGES) -> List[ChatMessage]:
+        """The latest messages of a session, oldest first."""
+        rows = db_helper.fetch_all(
+            """
+            SELECT * FROM (
+                SELECT * FROM chat_messages
+                WHERE session_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+            ) ORDER BY id ASC
+            """,
+            (session_id, limit)
+        )
+        return [ChatMessage.from_row(row) for row in rows]
+
+    @staticmethod
+    def get_messages_after(session_id: int, after_id: int, limit: int = 100) -> List[ChatMessage]:
+        """Messages the client has not seen yet (id greater than after_id), oldest first."""
+        rows = db_helper.fetch_all(
+            """
+            SELECT * FROM chat_messages
+            WHERE session_id = ? AND id > ?
+            ORDER BY id ASC
+            LIMIT ?
+            """,
+            (session_id, after_id, limit)
+        )
+        return [ChatMessage.from_row(row) for row in rows]
+
+    @staticmethod
+    def save_turn(session: ChatSession, user_message: str, assistant_message: str) -> List[ChatMessage]:
+        """Append the user message and the reply with one executemany (user first)."""
+        created_at = ChatMessage.now_iso()
+        turn = [("user", user_message), ("assistant", assistant_message)]
+        ids = db_helper.insert_many(
+            "INSERT INTO chat_messages (user_id, sender, message, created_at, session_id) VALUES (?, ?, ?, ?, ?)",
+            [(session.user_id, sender, message, created_at, session.id) for sender, message in turn]
+        )
+        return [
+            ChatMessage(
+                id=message_id, user_id=session.user_id, sender=sender,
+                message=message, created_at=created_at, session_id=session.id
+            )
+            for message_id, (sender, message) in zip(ids, turn)
+        ]
+
+    @staticmethod
+    def to_prompt_history(messages: List[ChatMessage]) -> List[Dict[str, str]]:
+        """Messages in the {"role", "content"} form the chat clients expect."""
+        return [{"role": msg.sender, "content": msg.message} for msg in messages]
@@ -0,0 +1,107 @@
+from app.models.calorie_entry import CalorieLog
+from app.models.tdee_profile import TdeeProfile
+from app.models.workout import Workout
+from app.db import db_helper
+from typing import Optional, Dict, Any
+
+
+class DashboardService:
+    @staticmethod
+    def get_dashboard(user_id: int, entry_date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Everything the dashboard and calories pages show on load, read in
+        three queries on one connection (a single read snapshot):
+        the user with their TDEE profile, the day's logs and the latest
+        workout with its exercise summary. Day totals are summed from the
+        logs instead of being queried again.
+
+        Returns:
+            None if the user does not exist
+        """
+        if entry_date is None:
+            entry_date = CalorieLog.today_iso()
+
+        with db_helper.transaction(immediate=False):
+            user_row = db_helper.fetch_one(
+                """
+                SELECT u.age, u.gender, u.height, u.weight, p.*
+                FROM users u
+                LEFT JOIN tdee_profile p ON p.user_id = u.id
+                WHERE u.id = ?
+                """,
+                (user_id,)
+            )
+            if user_row is None:
+                return None
+
+            log_rows = db_helper.fetch_all(
+                """
+                SELECT * FROM calorie_logs
+                WHERE user_id = ? AND entry_date = ? AND is_deleted = 0
+                ORDER BY created_at DESC
+                """,
+                (user_id, entry_date)
+            )
+
+            workout_row = db_helper.fetch_one(
+                """
+                SELECT w.*, COUNT(we.id), COALESCE(SUM(we.sets), 0),
+                       COALESCE(SUM(we.sets * we.reps * we.weight_kg), 0)
+                FROM (
+                    SELECT * FROM workouts
+                    WHERE user_id = ?
+                    ORDER BY date DESC, created_at DESC
+                    LIMIT 1
+                ) w
+                LEFT JOIN workout_exercises we ON we.workout_id = w.id
+                GROUP BY w.id
+                """,
+                (user_id,)
+            )
+
+        stats = {
+            "age": user_row[0],
+            "gender": user_row[1],
+            "height_cm": user_row[2],
+            "weight_kg": user_row[3],
+        }
+        profile = None
+        if user_row[4] is not None:
+            profile = {**TdeeProfile.from_row(user_row[4:]).to_dict(), **stats}
+
+        logs = [CalorieLog.from_row(row) for row in log_rows]
+        totals = {
+            "entry_date": entry_date,
+            "log_count": len(logs),
+            "total_calories": float(sum(log.calories or 0 for log in logs)),
+            "total_protein_g": float(sum(log.protein_g or 0 for log in logs)),
+            "total_carbs_g": float(sum(log.carbs_g or 0 for log in logs)),
+            "total_fat_g": float(sum(log.fat_g or 0 for log in logs)),
+        }
+
+        # Surplus is how far the day is over the goal, never negative
+        goal_calories = profile["goal_calories"] if profile else None
+        surplus = 0.0
+        if goal_calories is not None:
+            surplus = max(0.0, totals["total_calories"] - goal_calories)
+
+        latest_workout = None
+        if workout_row is not None:
+            latest_workout = {
+                **Workout.from_row(workout_row[:6]).to_dict(),
+                "exercise_count": workout_row[6],
+                "total_sets": workout_row[7],
+                "tonnage_kg": round(float(workout_row[8]), 2),
+            }
+
+        return {
+            "entry_date": entry_date,
+            "logs": [log.to_dict() for log in logs],
+            "totals": totals,
+            "total_calories": totals["total_calories"],
+            "goal_calories": goal_calories,
+            "surplus": surplus,
+            "latest_workout": latest_workout,
+            "profile": profile,
+            "stats": stats,
+        }
@@ -0,0 +1,80 @@
+import queue
+import threading
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.db import db_helper
+
+
+# Events buffered per open stream before a slow client is told to resync
+MAX_QUEUED_EVENTS = 100
+
+# Event names pushed to clients
+LOG_ADDED = "log_added"
+LOG_UPDATED = "log_updated"
+LOG_DELETED = "log_deleted"
+FEED_ADDED = "feed_added"
+FEED_DELETED = "feed_deleted"
+CARD_ENRICHED = "card_enriched"
+WORKOUT_SAVED = "workout_saved"
+WORKOUT_DELETED = "workout_deleted"
+IMPORT_PROGRESS = "import_progress"
+ACCOUNT_DELETION = "account_deletion"
+RESYNC = "resync"
+
+
+class EventHub:
+    """
+    In-process pub/sub of per-user change events for the SSE streams.
+
+    Services publish after their writes; each open stream has a bounded
+    queue. A stream that falls behind loses its backlog and gets a single
+    "resync" event, telling the client to reload instead.
+    """
+
+    def __init__(self, max_queued: int = MAX_QUEUED_EVENTS):
+        self.max_queued = max_queued
+        self._subscribers: Dict[int, Set[queue.Queue]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> queue.Queue:
+        """Open a stream for a user; pass the queue to unsubscribe() when done."""
+        stream = queue.Queue(maxsize=self.max_queued)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(stream)
+        return stream
+
+    def unsubscribe(self, user_id: int, stream: queue.Queue) -> None:
+        with self._lock:
+            streams = self._subscribers.get(user_id)
+            if streams is not None:
+                streams.discard(stream)
+                if not streams:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id: int, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Send an event to the user's open streams once the current
+        transaction commits (right away outside one; never on rollback).
+        """
+        db_helper.after_commit(lambda: self._deliver(user_id, (event, data or {})))
+
+    def _deliver(self, user_id: int, item: Tuple[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            streams = list(self._subscribers.get(user_id, ()))
+        for stream in streams:
+            try:
+                stream.put_nowait(item)
+            except queue.Full:
+                # Drop the backlog; the client reloads everything on resync
+                try:
+                    while True:
+                        stream.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    stream.put_nowait((RESYNC, {}))
+                except queue.Full:
+                    pass
+
+
+events = EventHub()
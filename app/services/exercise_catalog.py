@@ -0,0 +1,95 @@
+import threading
+from typing import Dict, List, Optional
+
+from app.db import db_helper
+from app.db.init_db import normalize_exercise_name
+from app.models.exercise import Exercise
+
+
+class ExerciseCatalog:
+    """
+    Resolves free-text exercise names to ids in the shared exercises catalog.
+
+    Normalized name -> id lookups are cached in memory; the catalog only ever
+    grows, so cached entries never go stale. Lookups made inside an open
+    transaction are not cached, since a rollback could undo the rows.
+    """
+
+    _name_to_id: Dict[str, int] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def resolve_ids(names: List[str], create: bool = True) -> Dict[str, int]:
+        """
+        Map exercise names to catalog ids.
+
+        Args:
+            names: Exercise names as typed by the user
+            create: Add names that are not in the catalog yet
+
+        Returns:
+            Dictionary keyed by normalize_exercise_name(name). Names that are
+            unknown (with create=False) or blank are left out.
+        """
+        display_names = {}
+        for name in names:
+            if name and name.strip():
+                display_names.setdefault(normalize_exercise_name(name), " ".join(name.split()))
+
+        result = {}
+        with ExerciseCatalog._lock:
+            for key in display_names:
+                if key in ExerciseCatalog._name_to_id:
+                    result[key] = ExerciseCatalog._name_to_id[key]
+        missing = [key for key in display_names if key not in result]
+        if not missing:
+            return result
+
+        found = ExerciseCatalog._lookup(missing)
+        unknown = [key for key in missing if key not in found]
+        if unknown and create:
+            created_at = Exercise.now_iso()
+            db_helper.execute_many(
+                "INSERT OR IGNORE INTO exercises (name, normalized_name, created_at) VALUES (?, ?, ?)",
+                [(display_names[key], key, created_at) for key in unknown]
+            )
+            found.update(ExerciseCatalog._lookup(unknown))
+
+        if not db_helper.in_transaction():
+            with ExerciseCatalog._lock:
+                ExerciseCatalog._name_to_id.update(found)
+        result.update(found)
+        return result
+
+    @staticmethod
+    def resolve_id(name: str, create: bool = True) -> Optional[int]:
+        """Catalog id for one exercise name (see resolve_ids)."""
+        return ExerciseCatalog.resolve_ids([name], create).get(normalize_exercise_name(name))
+
+    @staticmethod
+    def _lookup(keys: List[str]) -> Dict[str, int]:
+        placeholders = ",".join("?" * len(keys))
+        rows = db_helper.fetch_all(
+            f"""
+            SELECT normalized_name, id, 0 AS is_alias FROM exercises
+            WHERE normalized_name IN ({placeholders})
+            UNION ALL
+            SELECT alias, exercise_id, 1 AS is_alias FROM exercise_aliases
+            WHERE alias IN ({placeholders})
+            ORDER BY is_alias ASC
+            """,
+            tuple(keys) + tuple(keys)
+        )
+        # Aliases come last so they win over an exercise with the same spelling
+        return {row[0]: row[1] for row in rows}
+
+    @staticmethod
+    def get_exercise(exercise_id: int) -> Optional[Exercise]:
+        """Get a catalog exercise by ID."""
+        row = db_helper.fetch_one(
+            "SELECT * FROM exercises WHERE id = ?",
+            (exercise_id,)
+        )
+        if row is None:
+            return None
+        return Exercise.from_row(row)
@@ -0,0 +1,112 @@
+import json
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from app.db import db_helper
+from app.models.calorie_entry import CalorieLog
+from app.models.chat_message import ChatMessage
+from app.models.food_chat import FoodChat
+from app.models.food_feed import FoodFeed
+from app.models.tdee_chat import TdeeChat
+from app.models.tdee_profile import TdeeProfile
+from app.models.user import User
+from app.models.workout import Workout
+from app.models.workout_exercise import WorkoutExercise
+from app.services.workout_service import WorkoutService
+
+
+# Rows read per query while exporting
+EXPORT_PAGE_SIZE = 500
+
+# Record type -> (query over one user's rows after a given id, model)
+# Each query takes (user_id, after_id, limit) and returns rows ordered by the id it selects first.
+# The (user_id, id) indexes let each page seek straight to the user's rows after after_id.
+EXPORT_SECTIONS: List[Tuple[str, str, Any]] = [
+    ("user", "SELECT * FROM users WHERE id = ? AND id > ? ORDER BY id LIMIT ?", User),
+    ("tdee_profile", "SELECT * FROM tdee_profile WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?", TdeeProfile),
+    (
+        "tdee_chat",
+        """
+        SELECT c.* FROM tdee_chat c
+        JOIN tdee_profile p ON p.id = c.tdee_profile_id
+        WHERE p.user_id = ? AND c.id > ?
+        ORDER BY c.id LIMIT ?
+        """,
+        TdeeChat,
+    ),
+    ("calorie_log", "SELECT * FROM calorie_logs WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?", CalorieLog),
+    # Deleted logs the retention job moved out of calorie_logs
+    (
+        "calorie_log",
+        "SELECT * FROM calorie_logs_archive WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+        CalorieLog,
+    ),
+    ("chat_message", "SELECT * FROM chat_messages WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?", ChatMessage),
+    ("food_feed", "SELECT * FROM food_feed WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?", FoodFeed),
+    (
+        "food_chat",
+        """
+        SELECT c.* FROM food_chat c
+        JOIN food_feed f ON f.id = c.food_feed_id
+        WHERE f.user_id = ? AND c.id > ?
+        ORDER BY c.id LIMIT ?
+        """,
+        FoodChat,
+    ),
+    ("workout", "SELECT * FROM workouts WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?", Workout),
+    (
+        "workout_exercise",
+        WorkoutService.EXERCISE_SELECT + """
+        JOIN workouts w ON w.id = we.workout_id
+        WHERE w.user_id = ? AND we.id > ?
+        ORDER BY we.id LIMIT ?
+        """,
+        WorkoutExercise,
+    ),
+]
+
+
+class ExportService:
+    @staticmethod
+    def iter_records(user_id: int, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Every record of a user's history as a dict with a "type" key:
+        profile and TDEE chats, calorie logs (deleted and archived ones included), chats,
+        food feed cards with their chats, and workouts with their exercises.
+
+        Rows are read page by page (keyset on id), so memory stays flat and
+        no read lock is held while a slow client consumes the output.
+        """
+        for record_type, query, model in EXPORT_SECTIONS:
+            after_id = 0
+            while True:
+                rows = db_helper.fetch_all(query, (user_id, after_id, page_size))
+                for row in rows:
+                    yield {"type": record_type, **model.from_row(row).to_dict()}
+                if len(rows) < page_size:
+                    break
+                after_id = rows[-1][0]
+
+    @staticmethod
+    def iter_ndjson(user_id: int, compress: bool = False) -> Iterator[bytes]:
+        """
+        The export as NDJSON, one chunk per page of records, gzip-compressed
+        on the fly when compress is set.
+        """
+        compressor = zlib.compressobj(wbits=31) if compress else None
+        encode: Callable[[bytes], bytes] = compressor.compress if compressor else (lambda data: data)
+
+        lines = []
+        for record in ExportService.iter_records(user_id):
+            lines.append(json.dumps(record, separators=(",", ":")))
+            if len(lines) >= EXPORT_PAGE_SIZE:
+                chunk = encode(("\n".join(lines) + "\n").encode())
+                lines = []
+                if chunk:
+                    yield chunk
+
+        chunk = encode(("\n".join(lines) + "\n").encode()) if lines else b""
+        if compressor:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
@@ -1,8 +1,20 @@
 import os
 import json
 import re
+import threading
+from collections import OrderedDict
 from groq import Groq
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from app.services.food_parser import (
+    ParsedItem,
+    parse_meal,
+    resolve_local,
+    item_cache_key,
+    per_unit_nutrition,
+    scale_nutrition,
+    sum_nutrition,
+)
+from app.services.food_similarity_cache import find_similar_food
 
 # Initialize Groq client
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
@@ -11,6 +23,27 @@ if not GROQ_API_KEY:
 
 client = Groq(api_key=GROQ_API_KEY)
 
+# Per-unit nutrition the model already gave us, keyed by (food name, unit), least recently used first
+MAX_CACHED_ITEMS = int(os.getenv("FOOD_ITEM_CACHE_SIZE", "5000"))
+_item_nutrition_cache: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+_item_cache_lock = threading.Lock()
+
+
+def _cached_item(key: Tuple[str, str]) -> Optional[Dict]:
+    with _item_cache_lock:
+        per_unit = _item_nutrition_cache.get(key)
+        if per_unit is not None:
+            _item_nutrition_cache.move_to_end(key)
+        return per_unit
+
+
+def _cache_item(key: Tuple[str, str], per_unit: Dict) -> None:
+    with _item_cache_lock:
+        _item_nutrition_cache[key] = per_unit
+        _item_nutrition_cache.move_to_end(key)
+        while len(_item_nutrition_cache) > MAX_CACHED_ITEMS:
+            _item_nutrition_cache.popitem(last=False)
+
 
 def create_food_system_prompt() -> str:
     """Create system prompt for the food nutrition AI."""
@@ -61,7 +94,147 @@ def parse_nutrition_result(response_text: str) -> Optional[Dict]:
     return None
 
 
+def create_items_prompt(items: List[ParsedItem]) -> str:
+    """Prompt asking the model for nutrition of several parsed items at once."""
+    lines = []
+    for idx, item in enumerate(items):
+        quantity = int(item.quantity) if float(item.quantity).is_integer() else round(item.quantity, 2)
+        lines.append(f"{idx + 1}. {item.name} - quantity: {quantity} {item.unit or 'piece'}")
+
+    return f"""You are a nutrition database for Athleticore.AI. For each numbered food below, estimate the nutrition for exactly the quantity given.
+
+{chr(10).join(lines)}
+
+Respond with ONLY a JSON array, one entry per line above in the same order, in this exact format:
+[
+    {{"item": 1, "food_name": "Cheeseburger", "calories": 350.0, "protein_g": 20.0, "carbs_g": 30.0, "fat_g": 15.0}}
+]
+If a line is not a food or drink you can identify, put null in its place instead of an object."""
+
+
+def parse_nutrition_items(response_text: str, expected_count: int) -> Optional[List[Optional[Dict]]]:
+    """
+    Extract a list of per-item nutrition objects from a batched AI response;
+    None entries are items the model could not identify as food.
+    """
+    json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
+    if not json_match:
+        return None
+    try:
+        results = json.loads(json_match.group())
+    except json.JSONDecodeError:
+        return None
+
+    if not isinstance(results, list) or len(results) != expected_count:
+        return None
+
+    number_fields = ["calories", "protein_g", "carbs_g", "fat_g"]
+    for result in results:
+        if result is None:
+            continue
+        if not isinstance(result, dict) or "food_name" not in result:
+            return None
+        if not all(isinstance(result.get(field), (int, float)) for field in number_fields):
+            return None
+    return results
+
+
+def estimate_items(items: List[ParsedItem]) -> Optional[List[Optional[Dict]]]:
+    """
+    Ask the model for the nutrition of several items, each at its parsed
+    quantity, in one call. Returns the results in the same order (None for
+    an item that is not a food), or None if the call failed.
+    """
+    try:
+        response = client.chat.completions.create(
+            model="llama-3.3-70b-versatile",
+            messages=[{"role": "user", "content": create_items_prompt(items)}],
+            temperature=0.2,
+            max_tokens=1000
+        )
+        return parse_nutrition_items(response.choices[0].message.content, len(items))
+    except Exception as e:
+        print(f"Error calling Groq API: {e}")
+        return None
+
+
+def resolve_meal(user_id: int, message: str) -> Optional[Tuple[str, Dict]]:
+    """
+    Resolve a plain meal message ("2 eggs, 2 slices of toast and a coffee")
+    item by item without the conversational model.
+
+    Each item is looked up in the local nutrition table, the per-unit cache
+    and the user's own earlier foods first; whatever is left goes to the model in one batched call, but only
+    if it has an explicit unit ("200g", "2 slices") - a leftover without one
+    ("a bit hungry today") means the message is probably not a meal at all.
+    Items the model cannot identify as food are left out of the totals and
+    named in the reply and in the result's "skipped_items".
+    Returns None when the message is not a plain meal or cannot be resolved,
+    so the caller can fall back to the normal chat.
+    """
+    items = parse_meal(message)
+    if not items:
+        return None
+
+    resolved: List[Optional[Dict]] = []
+    unresolved: Dict[Tuple[str, str], ParsedItem] = {}
+    for item in items:
+        nutrition = resolve_local(item)
+        if nutrition is None:
+            cached = _cached_item(item_cache_key(item))
+            if cached is not None:
+                nutrition = scale_nutrition(cached, item.quantity)
+            else:
+                nutrition = find_similar_food(user_id, item.raw)
+            if nutrition is None:
+                if item.unit is None:
+                    return None
+                unresolved.setdefault(item_cache_key(item), item)
+        resolved.append(nutrition)
+
+    if unresolved:
+        estimates = estimate_items(list(unresolved.values()))
+        if estimates is None:
+            return None
+        # The model answered for each item's own quantity; the cache keeps one unit
+        per_units: Dict[Tuple[str, str], Dict] = {}
+        for (key, asked), estimate in zip(unresolved.items(), estimates):
+            if estimate is not None:
+                per_units[key] = per_unit_nutrition(estimate, asked.quantity)
+                _cache_item(key, per_units[key])
+        for idx, item in enumerate(items):
+            per_unit = per_units.get(item_cache_key(item))
+            if resolved[idx] is None and per_unit is not None:
+                resolved[idx] = scale_nutrition(per_unit, item.quantity)
+
+    known = [(item, nutrition) for item, nutrition in zip(items, resolved) if nutrition is not None]
+    if not known:
+        return None
+
+    nutrition_result = sum_nutrition(known)
+    nutrition_result["skipped_items"] = [
+        item.raw for item, nutrition in zip(items, resolved) if nutrition is None
+    ]
+    return _logged_reply(nutrition_result), nutrition_result
+
+
+def _logged_reply(nutrition_result: Dict) -> str:
+    reply = f"Got it! That's about {round(float(nutrition_result['calories']))} calories."
+    if nutrition_result.get("skipped_items"):
+        reply += f" I left out {', '.join(nutrition_result['skipped_items'])}, which I couldn't identify as food."
+    return reply
+
+
+def _awaiting_answer(chat_history: list) -> bool:
+    """True if the last assistant message asked the user a question."""
+    for msg in reversed(chat_history):
+        if msg.get("role") == "assistant":
+            return msg.get("content", "").rstrip().endswith("?")
+    return False
+
+
 def process_food_entry(
+    user_id: int,
     message: str,
     chat_history: list
 ) -> tuple[str, Optional[Dict]]:
@@ -69,6 +242,19 @@ def process_food_entry(
     Process a food entry message and get AI response with nutrition data.
     Returns: (reply_text, nutrition_result_dict or None)
     """
+    # Plain meal logs are resolved locally; only unknown items reach the model.
+    # Skip this when the message is probably an answer to a clarifying question.
+    if not _awaiting_answer(chat_history) and "?" not in message:
+        # Something that reads like an already-logged food reuses its macros
+        similar = find_similar_food(user_id, message)
+        if similar is not None:
+            similar["ready_to_save"] = True
+            return _logged_reply(similar), similar
+
+        meal_result = resolve_meal(user_id, message)
+        if meal_result is not None:
+            return meal_result
+
     # Create system prompt
     system_prompt = create_food_system_prompt()
     
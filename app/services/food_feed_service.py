@@ -1,8 +1,13 @@
 from app.models.food_feed import FoodFeed
 from app.models.food_chat import FoodChat
 from app.db import db_helper
-from typing import Optional, List
+from app.services.food_similarity_cache import remember_food, similarity_index
+from app.services.recent_foods import recent_foods
+from app.services.autocomplete_service import autocomplete, FOODS
+from app.services.event_hub import events, FEED_ADDED, FEED_DELETED, CARD_ENRICHED
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import date
+import re
 
 
 class FoodFeedService:
@@ -26,7 +31,9 @@ class FoodFeedService:
             "SELECT * FROM food_feed WHERE user_id = ? ORDER BY id DESC LIMIT 1",
             (user_id,)
         )
-        return FoodFeed.from_row(row)
+        feed_entry = FoodFeed.from_row(row)
+        events.publish(user_id, FEED_ADDED, {"feed_entry": feed_entry.to_dict()})
+        return feed_entry
 
     @staticmethod
     def update_food_card(
@@ -38,19 +45,36 @@ class FoodFeedService:
         fat_g: float
     ) -> FoodFeed:
         """Update a feed entry with AI-generated nutrition information."""
-        db_helper.execute_query(
+        row = db_helper.execute_returning(
             """UPDATE food_feed 
                SET food_name = ?, calories = ?, protein_g = ?, carbs_g = ?, fat_g = ?
-               WHERE id = ?""",
+               WHERE id = ?
+               RETURNING *""",
             (food_name, calories, protein_g, carbs_g, fat_g, feed_id)
         )
-        
-        # Fetch the updated entry
-        row = db_helper.fetch_one(
-            "SELECT * FROM food_feed WHERE id = ?",
-            (feed_id,)
-        )
-        return FoodFeed.from_row(row)
+        feed_entry = FoodFeed.from_row(row)
+        FoodFeedService._remember_card(feed_entry)
+        return feed_entry
+
+    @staticmethod
+    def _remember_card(feed_entry: FoodFeed) -> None:
+        used_at = FoodFeed.now_iso()
+
+        def remember():
+            # The user's own wording now maps to these macros
+            remember_food(
+                feed_entry.user_id, feed_entry.content, feed_entry.food_name, feed_entry.calories,
+                feed_entry.protein_g, feed_entry.carbs_g, feed_entry.fat_g
+            )
+            recent_foods.record(
+                feed_entry.user_id, f"feed:{feed_entry.id}", feed_entry.food_name,
+                feed_entry.calories, feed_entry.protein_g, feed_entry.carbs_g, feed_entry.fat_g, used_at
+            )
+            autocomplete.record(FOODS, feed_entry.user_id, feed_entry.food_name, used_at)
+
+        # Only once the card is committed, like the event below
+        db_helper.after_commit(remember)
+        events.publish(feed_entry.user_id, CARD_ENRICHED, {"feed_entry": feed_entry.to_dict()})
 
     @staticmethod
     def get_today_feed(user_id: int, entry_date: Optional[str] = None) -> List[FoodFeed]:
@@ -76,20 +100,51 @@ class FoodFeedService:
         return FoodFeed.from_row(row)
 
     @staticmethod
-    def delete_feed_entry(feed_id: int) -> bool:
-        """Delete a feed entry."""
-        db_helper.execute_query(
-            "DELETE FROM food_feed WHERE id = ?",
-            (feed_id,)
+    def delete_feed_entry(feed_id: int, user_id: int) -> bool:
+        """Delete a feed entry the user owns; False if there was none."""
+        deleted = db_helper.execute_query(
+            "DELETE FROM food_feed WHERE id = ? AND user_id = ?",
+            (feed_id, user_id)
         )
-        return True
+        if deleted:
+            # The user's cached foods are rebuilt without the entry
+            def forget():
+                similarity_index.forget_user(user_id)
+                recent_foods.forget_user(user_id)
+                autocomplete.forget_user(user_id)
+            db_helper.after_commit(forget)
+            events.publish(user_id, FEED_DELETED, {"id": feed_id})
+        return deleted > 0
 
     @staticmethod
-    def get_chat_history(food_feed_id: int) -> List[FoodChat]:
-        """Get all chat messages for a specific food feed entry, ordered by creation time."""
+    def get_chat_history(
+        food_feed_id: int,
+        before_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[FoodChat]:
+        """
+        Chat messages for a food feed entry, oldest first.
+        
+        With limit, only the newest `limit` messages (older than before_id,
+        if given) are loaded via idx_food_chat_feed.
+        """
+        if limit is None and before_id is None:
+            rows = db_helper.fetch_all(
+                "SELECT * FROM food_chat WHERE food_feed_id = ? ORDER BY id ASC",
+                (food_feed_id,)
+            )
+            return [FoodChat.from_row(row) for row in rows]
+        
         rows = db_helper.fetch_all(
-            "SELECT * FROM food_chat WHERE food_feed_id = ? ORDER BY created_at ASC",
-            (food_feed_id,)
+            """
+            SELECT * FROM (
+                SELECT * FROM food_chat
+                WHERE food_feed_id = ? AND id < ?
+                ORDER BY id DESC
+                LIMIT ?
+            ) ORDER BY id ASC
+            """,
+            (food_feed_id, before_id or db_helper.MAX_ROW_ID, limit if limit is not None else -1)
         )
         return [FoodChat.from_row(row) for row in rows]
 
@@ -97,15 +152,123 @@ class FoodFeedService:
     def save_chat_message(food_feed_id: int, role: str, content: str) -> FoodChat:
         """Save a chat message to the database."""
         created_at = FoodChat.now_iso()
-        db_helper.execute_query(
-            "INSERT INTO food_chat (food_feed_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+        row = db_helper.execute_returning(
+            "INSERT INTO food_chat (food_feed_id, role, content, created_at) VALUES (?, ?, ?, ?) RETURNING *",
             (food_feed_id, role, content, created_at)
         )
-        
-        # Fetch the last inserted message
-        row = db_helper.fetch_one(
-            "SELECT * FROM food_chat WHERE food_feed_id = ? ORDER BY id DESC LIMIT 1",
-            (food_feed_id,)
-        )
         return FoodChat.from_row(row)
 
+    @staticmethod
+    def save_chat_turn(
+        food_feed_id: int,
+        user_message: str,
+        assistant_message: str,
+        nutrition_result: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[FoodChat], Optional[FoodFeed]]:
+        """
+        Store one chat exchange in a single transaction: both messages with
+        one executemany and, when the AI finished the estimate, the card update.
+        
+        Returns:
+            The stored messages (user first) and the updated card, or None if
+            nutrition_result was not ready to save
+        """
+        created_at = FoodChat.now_iso()
+        turn = [("user", user_message), ("assistant", assistant_message)]
+        
+        with db_helper.transaction():
+            ids = db_helper.insert_many(
+                "INSERT INTO food_chat (food_feed_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                [(food_feed_id, role, content, created_at) for role, content in turn]
+            )
+            
+            feed_row = None
+            if nutrition_result and nutrition_result.get("ready_to_save"):
+                feed_row = db_helper.execute_returning(
+                    """UPDATE food_feed
+                       SET food_name = ?, calories = ?, protein_g = ?, carbs_g = ?, fat_g = ?
+                       WHERE id = ?
+                       RETURNING *""",
+                    (
+                        nutrition_result["food_name"],
+                        nutrition_result["calories"],
+                        nutrition_result["protein_g"],
+                        nutrition_result["carbs_g"],
+                        nutrition_result["fat_g"],
+                        food_feed_id,
+                    )
+                )
+        
+        messages = [
+            FoodChat(id=chat_id, food_feed_id=food_feed_id, role=role, content=content, created_at=created_at)
+            for chat_id, (role, content) in zip(ids, turn)
+        ]
+        feed_entry = None
+        if feed_row is not None:
+            feed_entry = FoodFeed.from_row(feed_row)
+            FoodFeedService._remember_card(feed_entry)
+        return messages, feed_entry
+
+    @staticmethod
+    def build_search_query(text: str) -> Optional[str]:
+        """Turn free text into an FTS5 query: every word must match as a prefix."""
+        words = re.findall(r"\w+", text.lower())
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
+
+    @staticmethod
+    def search_food_history(user_id: int, text: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Full-text search over a user's food feed cards and calorie logs.
+        bm25 scores of the two FTS tables come from different corpus
+        statistics, so each source is ranked on its own (newest first on
+        ties) and the two lists are interleaved: best card, best log,
+        second card, and so on. Fetches limit rows starting at offset.
+        """
+        match_query = FoodFeedService.build_search_query(text)
+        if match_query is None:
+            return []
+
+        rows = db_helper.fetch_all(
+            """
+            SELECT source, id, food_name, content, calories, protein_g, carbs_g, fat_g,
+                   entry_date, created_at,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY source ORDER BY rank ASC, entry_date DESC, created_at DESC
+                   ) AS position
+            FROM (
+                SELECT 'food_feed' AS source, f.id, f.food_name, f.content,
+                       f.calories, f.protein_g, f.carbs_g, f.fat_g,
+                       f.entry_date, f.created_at, bm25(food_feed_fts) AS rank
+                FROM food_feed_fts
+                JOIN food_feed f ON f.id = food_feed_fts.rowid
+                WHERE food_feed_fts MATCH ? AND f.user_id = ?
+                UNION ALL
+                SELECT 'calorie_log' AS source, c.id, c.description, c.description,
+                       c.calories, c.protein_g, c.carbs_g, c.fat_g,
+                       c.entry_date, c.created_at, bm25(calorie_logs_fts) AS rank
+                FROM calorie_logs_fts
+                JOIN calorie_logs c ON c.id = calorie_logs_fts.rowid
+                WHERE calorie_logs_fts MATCH ? AND c.user_id = ? AND c.is_deleted = 0
+            )
+            ORDER BY position ASC, source = 'food_feed' DESC
+            LIMIT ? OFFSET ?
+            """,
+            (match_query, user_id, match_query, user_id, limit, offset)
+        )
+        return [
+            {
+                "source": row[0],
+                "id": row[1],
+                "food_name": row[2],
+                "content": row[3],
+                "calories": row[4],
+                "protein_g": row[5],
+                "carbs_g": row[6],
+                "fat_g": row[7],
+                "entry_date": row[8],
+                "created_at": row[9],
+            }
+            for row in rows
+        ]
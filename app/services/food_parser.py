@@ -0,0 +1,346 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+# Words that can stand in for a quantity at the start of an item
+NUMBER_WORDS = {
+    "a": 1.0,
+    "an": 1.0,
+    "one": 1.0,
+    "two": 2.0,
+    "three": 3.0,
+    "four": 4.0,
+    "five": 5.0,
+    "six": 6.0,
+    "seven": 7.0,
+    "eight": 8.0,
+    "nine": 9.0,
+    "ten": 10.0,
+    "eleven": 11.0,
+    "twelve": 12.0,
+    "half": 0.5,
+    "half a": 0.5,
+    "half an": 0.5,
+    "a half": 0.5,
+    "a couple of": 2.0,
+    "a couple": 2.0,
+    "couple of": 2.0,
+}
+
+UNICODE_FRACTIONS = {"½": 0.5, "¼": 0.25, "¾": 0.75, "⅓": 1 / 3, "⅔": 2 / 3}
+
+# Spelling variants -> canonical unit
+UNIT_ALIASES = {
+    "g": "g", "gr": "g", "gm": "g", "gms": "g", "gram": "g", "grams": "g",
+    "kg": "kg", "kgs": "kg", "kilo": "kg", "kilos": "kg", "kilogram": "kg", "kilograms": "kg",
+    "oz": "oz", "ounce": "oz", "ounces": "oz",
+    "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "ml": "ml", "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "l": "l", "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "cup": "cup", "cups": "cup",
+    "tbsp": "tbsp", "tablespoon": "tbsp", "tablespoons": "tbsp",
+    "tsp": "tsp", "teaspoon": "tsp", "teaspoons": "tsp",
+    "slice": "slice", "slices": "slice",
+    "piece": "piece", "pieces": "piece", "pc": "piece", "pcs": "piece",
+    "bowl": "bowl", "bowls": "bowl",
+    "glass": "glass", "glasses": "glass",
+    "mug": "mug", "mugs": "mug",
+    "can": "can", "cans": "can",
+    "bottle": "bottle", "bottles": "bottle",
+    "scoop": "scoop", "scoops": "scoop",
+    "serving": "serving", "servings": "serving",
+}
+
+# Grams per unit for units that mean the same thing for every food
+MASS_UNITS = {"g": 1.0, "kg": 1000.0, "oz": 28.35, "lb": 453.6}
+
+# Words that never change the nutrition lookup
+FILLER_WORDS = {"of", "some", "plain", "fresh", "cooked", "boiled", "poached", "steamed"}
+
+# Item boundaries: commas, semicolons, "+", "&", "plus", and "and"/"then"
+# only when the next item starts with a quantity (so "mac and cheese" stays whole)
+_QUANTITY_START = r"(?:\d|½|¼|¾|⅓|⅔|a\b|an\b|one\b|two\b|three\b|four\b|five\b|six\b|seven\b|eight\b|nine\b|ten\b|eleven\b|twelve\b|half\b|couple\b)"
+_SPLIT_PATTERN = re.compile(
+    r"\s*(?:,|;|\n|\+|&|\bplus\b)\s*(?:and\s+)?|\s+(?:and|then)\s+(?=" + _QUANTITY_START + r")",
+    re.IGNORECASE,
+)
+
+# "I had ...", "just ate ..." in front of the first item
+_LEAD_IN = re.compile(r"^(?:i\s+)?(?:just\s+)?(?:had|ate|drank|have|eat|logged?)\s+", re.IGNORECASE)
+
+_LEADING_NUMBER = re.compile(r"^(\d+(?:\.\d+)?(?:\s*/\s*\d+)?|\d*[½¼¾⅓⅔])\s*")
+_TRAILING_AMOUNT = re.compile(r"\s*[,(]?\s*(\d+(?:\.\d+)?)\s*([a-z]+)\s*\)?$")
+
+
+@dataclass
+class ParsedItem:
+    quantity: float
+    unit: Optional[str]
+    name: str
+    raw: str
+
+    def to_dict(self) -> dict:
+        return {
+            "quantity": self.quantity,
+            "unit": self.unit,
+            "name": self.name,
+            "raw": self.raw,
+        }
+
+
+@dataclass
+class LocalFood:
+    name: str
+    # calories, protein_g, carbs_g, fat_g per 100 g
+    per_100g: Tuple[float, float, float, float]
+    # grams per unit; "piece" is used when no unit is given
+    units: Dict[str, float]
+    aliases: Tuple[str, ...] = ()
+
+
+# Small built-in table for the everyday items people log most.
+# Values are per 100 g (USDA reference values, rounded).
+LOCAL_FOODS = [
+    LocalFood("Egg", (143.0, 12.6, 0.7, 9.5), {"piece": 50.0}, ("eggs", "large egg", "boiled egg", "hard boiled egg", "scrambled egg")),
+    LocalFood("Toast", (265.0, 9.0, 49.0, 3.2), {"piece": 30.0, "slice": 30.0}, ("bread", "white bread", "white toast", "slice of bread")),
+    LocalFood("Whole Wheat Toast", (247.0, 13.0, 41.0, 3.4), {"piece": 32.0, "slice": 32.0}, ("whole wheat bread", "wholemeal bread", "brown bread", "brown toast")),
+    LocalFood("Coffee", (1.0, 0.1, 0.0, 0.0), {"piece": 240.0, "cup": 240.0, "mug": 300.0, "ml": 1.0, "l": 1000.0}, ("black coffee", "americano", "espresso")),
+    LocalFood("Coffee with Milk", (15.0, 0.8, 1.2, 0.8), {"piece": 240.0, "cup": 240.0, "mug": 300.0, "ml": 1.0, "l": 1000.0}, ("coffee with milk", "white coffee", "latte")),
+    LocalFood("Tea", (1.0, 0.0, 0.3, 0.0), {"piece": 240.0, "cup": 240.0, "mug": 300.0, "ml": 1.0, "l": 1000.0}, ("black tea", "green tea")),
+    LocalFood("Milk", (50.0, 3.3, 4.8, 2.0), {"piece": 244.0, "cup": 244.0, "glass": 250.0, "tbsp": 15.0, "ml": 1.0, "l": 1000.0}, ("semi skimmed milk", "2% milk")),
+    LocalFood("Orange Juice", (45.0, 0.7, 10.4, 0.2), {"piece": 248.0, "cup": 248.0, "glass": 250.0, "bottle": 330.0, "ml": 1.0, "l": 1000.0}, ("oj",)),
+    LocalFood("Banana", (89.0, 1.1, 22.8, 0.3), {"piece": 118.0}, ("bananas",)),
+    LocalFood("Apple", (52.0, 0.3, 13.8, 0.2), {"piece": 182.0}, ("apples",)),
+    LocalFood("Orange", (47.0, 0.9, 11.8, 0.1), {"piece": 131.0}, ("oranges",)),
+    LocalFood("Oatmeal", (71.0, 2.5, 12.0, 1.5), {"piece": 234.0, "bowl": 234.0, "cup": 234.0, "serving": 234.0}, ("porridge", "oats")),
+    LocalFood("White Rice", (130.0, 2.7, 28.2, 0.3), {"piece": 158.0, "cup": 158.0, "bowl": 200.0, "serving": 158.0}, ("rice", "cooked rice")),
+    LocalFood("Pasta", (158.0, 5.8, 30.9, 0.9), {"piece": 140.0, "cup": 140.0, "bowl": 250.0, "serving": 140.0}, ("spaghetti", "penne")),
+    LocalFood("Chicken Breast", (165.0, 31.0, 0.0, 3.6), {"piece": 170.0, "serving": 170.0}, ("chicken", "grilled chicken", "grilled chicken breast")),
+    LocalFood("Salmon", (208.0, 20.0, 0.0, 13.4), {"piece": 150.0, "serving": 150.0}, ("salmon fillet", "grilled salmon")),
+    LocalFood("Greek Yogurt", (59.0, 10.2, 3.6, 0.4), {"piece": 170.0, "cup": 245.0, "serving": 170.0, "bowl": 245.0}, ("yogurt", "yoghurt", "greek yoghurt")),
+    LocalFood("Peanut Butter", (588.0, 25.0, 20.0, 50.0), {"piece": 16.0, "tbsp": 16.0, "tsp": 5.3, "serving": 32.0}, ()),
+    LocalFood("Almonds", (579.0, 21.2, 21.6, 49.9), {"piece": 1.2, "cup": 143.0, "serving": 28.0}, ("almond",)),
+    LocalFood("Avocado", (160.0, 2.0, 8.5, 14.7), {"piece": 150.0}, ("avocados",)),
+    LocalFood("Bagel", (257.0, 10.0, 50.5, 1.6), {"piece": 105.0}, ("bagels", "plain bagel")),
+    LocalFood("Potato", (87.0, 1.9, 20.1, 0.1), {"piece": 173.0, "cup": 156.0, "serving": 173.0}, ("potatoes", "baked potato", "boiled potato")),
+    LocalFood("Whey Protein", (400.0, 80.0, 10.0, 5.0), {"piece": 30.0, "scoop": 30.0, "serving": 30.0}, ("protein powder", "whey")),
+    LocalFood("Olive Oil", (884.0, 0.0, 0.0, 100.0), {"piece": 13.5, "tbsp": 13.5, "tsp": 4.5}, ()),
+    LocalFood("Butter", (717.0, 0.9, 0.1, 81.1), {"piece": 14.0, "tbsp": 14.0, "tsp": 4.7, "slice": 10.0}, ()),
+]
+
+
+
+def normalize_food_name(name: str) -> str:
+    """Lowercase, strip punctuation and filler words so lookups match loosely."""
+    cleaned = re.sub(r"[^a-z0-9%\s]", " ", name.lower())
+    words = [word for word in cleaned.split() if word not in FILLER_WORDS]
+    return " ".join(words)
+
+
+_LOCAL_FOOD_INDEX: Dict[str, LocalFood] = {}
+for _food in LOCAL_FOODS:
+    _LOCAL_FOOD_INDEX[normalize_food_name(_food.name)] = _food
+    for _alias in _food.aliases:
+        _LOCAL_FOOD_INDEX[normalize_food_name(_alias)] = _food
+
+
+def _singular(word: str) -> str:
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("oes") and len(word) > 4:
+        return word[:-2]
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+
+def _parse_number(text: str) -> Optional[float]:
+    text = text.replace(" ", "")
+    if text and text[-1] in UNICODE_FRACTIONS:
+        whole = text[:-1]
+        return (float(whole) if whole else 0.0) + UNICODE_FRACTIONS[text[-1]]
+    if "/" in text:
+        numerator, denominator = text.split("/", 1)
+        if float(denominator) == 0:
+            return None
+        return float(numerator) / float(denominator)
+    return float(text)
+
+
+def _take_unit(text: str) -> Tuple[Optional[str], str]:
+    """Strip a leading unit (and an optional "of") off the front of text."""
+    match = re.match(r"^([a-z]+)\.?\b\s*(?:of\s+)?(.*)$", text)
+    if match and match.group(1) in UNIT_ALIASES:
+        return UNIT_ALIASES[match.group(1)], match.group(2)
+    return None, text
+
+
+def parse_item(text: str) -> Optional[ParsedItem]:
+    """
+    Parse one item such as "2 slices of toast", "200g chicken breast" or
+    "grilled chicken 200 g" into quantity, unit and name.
+
+    Returns None when no explicit quantity can be found.
+    """
+    raw = text.strip().strip(".!")
+    lowered = raw.lower()
+    if not lowered:
+        return None
+
+    quantity: Optional[float] = None
+    unit: Optional[str] = None
+    rest = lowered
+
+    number_match = _LEADING_NUMBER.match(rest)
+    if number_match:
+        quantity = _parse_number(number_match.group(1))
+        rest = rest[number_match.end():]
+        unit, rest = _take_unit(rest)
+    else:
+        # Longest number word first so "a couple of" wins over "a"
+        for word in sorted(NUMBER_WORDS, key=len, reverse=True):
+            if rest == word or rest.startswith(word + " "):
+                quantity = NUMBER_WORDS[word]
+                rest = rest[len(word):].strip()
+                unit, rest = _take_unit(rest)
+                break
+
+    if quantity is None:
+        # "grilled chicken 200 g" - amount written after the food
+        trailing = _TRAILING_AMOUNT.search(rest)
+        if trailing and trailing.group(2) in UNIT_ALIASES:
+            quantity = float(trailing.group(1))
+            unit = UNIT_ALIASES[trailing.group(2)]
+            rest = rest[:trailing.start()]
+
+    if quantity is None or quantity <= 0:
+        return None
+
+    name = normalize_food_name(rest)
+    if not name:
+        return None
+
+    return ParsedItem(quantity=quantity, unit=unit, name=name, raw=raw)
+
+
+def split_meal(message: str) -> List[str]:
+    """Split a meal description into its individual items."""
+    parts = _SPLIT_PATTERN.split(message.strip())
+    return [part.strip() for part in parts if part and part.strip()]
+
+
+def parse_meal(message: str) -> Optional[List[ParsedItem]]:
+    """
+    Deterministically parse a meal message into items.
+
+    Returns None if the message does not look like a plain food log (a question,
+    or any item without an explicit quantity); the caller then falls back to the
+    conversational model path.
+    """
+    if not message or "?" in message:
+        return None
+
+    segments = split_meal(_LEAD_IN.sub("", message.strip()))
+    if not segments:
+        return None
+
+    items = []
+    for segment in segments:
+        item = parse_item(segment)
+        if item is None:
+            return None
+        items.append(item)
+    return items
+
+
+def find_local_food(name: str) -> Optional[LocalFood]:
+    """Look up a normalized food name in the built-in nutrition table."""
+    if name in _LOCAL_FOOD_INDEX:
+        return _LOCAL_FOOD_INDEX[name]
+    singular = " ".join(_singular(word) for word in name.split())
+    return _LOCAL_FOOD_INDEX.get(singular)
+
+
+def item_grams(item: ParsedItem, food: LocalFood) -> Optional[float]:
+    """Convert an item's quantity and unit into grams for a local food."""
+    unit = item.unit or "piece"
+    if unit in MASS_UNITS:
+        return item.quantity * MASS_UNITS[unit]
+    if unit in food.units:
+        return item.quantity * food.units[unit]
+    return None
+
+
+def resolve_local(item: ParsedItem) -> Optional[Dict]:
+    """Resolve an item against the built-in table, or None if it is unknown."""
+    food = find_local_food(item.name)
+    if food is None:
+        return None
+    grams = item_grams(item, food)
+    if grams is None:
+        return None
+
+    factor = grams / 100.0
+    calories, protein_g, carbs_g, fat_g = food.per_100g
+    return {
+        "food_name": food.name,
+        "calories": round(calories * factor, 1),
+        "protein_g": round(protein_g * factor, 1),
+        "carbs_g": round(carbs_g * factor, 1),
+        "fat_g": round(fat_g * factor, 1),
+    }
+
+
+def item_cache_key(item: ParsedItem) -> Tuple[str, str]:
+    """Cache key for per-unit nutrition learned from earlier model answers."""
+    return (item.name, item.unit or "piece")
+
+
+def scale_nutrition(per_unit: Dict, quantity: float) -> Dict:
+    """Multiply per-unit nutrition by a quantity."""
+    return {
+        "food_name": per_unit["food_name"],
+        "calories": round(float(per_unit["calories"]) * quantity, 1),
+        "protein_g": round(float(per_unit["protein_g"]) * quantity, 1),
+        "carbs_g": round(float(per_unit["carbs_g"]) * quantity, 1),
+        "fat_g": round(float(per_unit["fat_g"]) * quantity, 1),
+    }
+
+
+def per_unit_nutrition(nutrition: Dict, quantity: float) -> Dict:
+    """Divide nutrition for a quantity down to one unit, unrounded, for caching."""
+    return {
+        "food_name": nutrition["food_name"],
+        "calories": float(nutrition["calories"]) / quantity,
+        "protein_g": float(nutrition["protein_g"]) / quantity,
+        "carbs_g": float(nutrition["carbs_g"]) / quantity,
+        "fat_g": float(nutrition["fat_g"]) / quantity,
+    }
+
+
+def format_item_label(item: ParsedItem) -> str:
+    """Human readable label such as "2 slice toast" for combined food names."""
+    quantity = int(item.quantity) if float(item.quantity).is_integer() else round(item.quantity, 2)
+    if item.unit:
+        return f"{quantity} {item.unit} {item.name}"
+    return f"{quantity} {item.name}"
+
+
+def sum_nutrition(items: List[Tuple[ParsedItem, Dict]]) -> Dict:
+    """Add up per-item nutrition into one result shaped like parse_nutrition_result."""
+    first_item = items[0][0]
+    if len(items) == 1 and first_item.quantity == 1 and first_item.unit is None:
+        food_name = items[0][1]["food_name"]
+    else:
+        food_name = ", ".join(format_item_label(item) for item, _ in items)
+
+    return {
+        "food_name": food_name,
+        "calories": round(sum(float(n["calories"]) for _, n in items), 1),
+        "protein_g": round(sum(float(n["protein_g"]) for _, n in items), 1),
+        "carbs_g": round(sum(float(n["carbs_g"]) for _, n in items), 1),
+        "fat_g": round(sum(float(n["fat_g"]) for _, n in items), 1),
+        "ready_to_save": True,
+        "items": [{**item.to_dict(), **nutrition} for item, nutrition in items],
+    }
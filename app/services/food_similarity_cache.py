@@ -0,0 +1,247 @@
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.db import db_helper
+
+
+# Cosine similarity needed before a stored description counts as the same food
+SIMILARITY_THRESHOLD = float(os.getenv("FOOD_SIMILARITY_THRESHOLD", "0.85"))
+
+VECTOR_DIM = 1024
+NGRAM_SIZES = (2, 3, 4)
+
+# Random-hyperplane LSH: several small tables so near neighbours share a bucket
+# in at least one of them without comparing against every stored vector
+LSH_TABLES = 12
+LSH_BITS = 8
+LSH_SEED = 1337
+
+# Users whose index is kept in memory at once
+MAX_CACHED_USERS = int(os.getenv("FOOD_SIMILARITY_MAX_USERS", "200"))
+
+# Joining words that say nothing about the food itself
+_STOP_WORDS = {"a", "an", "and", "the", "with", "of", "some", "plus", "i", "had", "ate"}
+
+_UNIT_WORDS = {
+    "g": "g", "gr": "g", "gram": "g", "grams": "g",
+    "kg": "kg", "oz": "oz", "ml": "ml", "l": "l",
+    "cup": "cup", "cups": "cup", "slice": "slice", "slices": "slice",
+    "tbsp": "tbsp", "tsp": "tsp", "scoop": "scoop", "scoops": "scoop",
+}
+
+
+def normalize_description(text: str) -> List[str]:
+    """
+    Lowercase a food description and split it into tokens, gluing amounts
+    to their unit so "200 g" and "200g" become the same token.
+    """
+    tokens = re.findall(r"\d+(?:\.\d+)?|[a-z]+", text.lower())
+    merged = []
+    for token in tokens:
+        if merged and merged[-1][0].isdigit() and token in _UNIT_WORDS and not merged[-1][-1].isalpha():
+            merged[-1] = merged[-1] + _UNIT_WORDS[token]
+        elif token not in _STOP_WORDS:
+            merged.append(token)
+    return merged
+
+
+def amount_key(tokens: List[str]) -> Tuple[str, ...]:
+    """Every amount in the description; two foods only match if these agree."""
+    return tuple(sorted(token for token in tokens if token[0].isdigit()))
+
+
+def vectorize(tokens: List[str]) -> np.ndarray:
+    """Hashed character n-gram vector (L2 normalized) for a token list."""
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    for token in tokens:
+        padded = f" {token} "
+        for size in NGRAM_SIZES:
+            for start in range(max(len(padded) - size + 1, 1)):
+                gram = padded[start:start + size].encode("utf-8")
+                bucket = zlib.crc32(gram)
+                sign = 1.0 if bucket & 0x80000000 else -1.0
+                vector[bucket % VECTOR_DIM] += sign
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+_PLANES = np.random.default_rng(LSH_SEED).standard_normal((LSH_TABLES * LSH_BITS, VECTOR_DIM)).astype(np.float32)
+_BIT_WEIGHTS = 1 << np.arange(LSH_BITS)
+
+
+def _lsh_keys(vector: np.ndarray) -> List[int]:
+    bits = (_PLANES @ vector > 0).reshape(LSH_TABLES, LSH_BITS)
+    return [int(key) for key in bits @ _BIT_WEIGHTS]
+
+
+class FoodSimilarityIndex:
+    """
+    Approximate nearest-neighbour index over one user's food descriptions
+    that already have nutrition attached (food_feed cards and calorie_logs).
+    Not thread-safe on its own; FoodSimilarityCache guards it.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._vectors = np.zeros((0, VECTOR_DIM), dtype=np.float32)
+        self._size = 0
+        self._entries: List[Tuple[Tuple[str, ...], Dict]] = []
+        self._seen: Dict[Tuple[str, ...], int] = {}
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(LSH_TABLES)]
+
+    def add(self, tokens: List[str], nutrition: Dict) -> None:
+        key = tuple(tokens)
+        if key in self._seen:
+            # Same wording again - keep the most recent macros
+            self._entries[self._seen[key]] = (amount_key(tokens), nutrition)
+            return
+
+        vector = vectorize(tokens)
+        if self._size == len(self._vectors):
+            grown = np.zeros((max(16, self._size * 2), VECTOR_DIM), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+
+        row = self._size
+        self._vectors[row] = vector
+        self._size += 1
+        self._entries.append((amount_key(tokens), nutrition))
+        self._seen[key] = row
+        for table, bucket_key in enumerate(_lsh_keys(vector)):
+            self._buckets[table].setdefault(bucket_key, []).append(row)
+
+    def lookup(self, tokens: List[str]) -> Optional[Dict]:
+        if self._size == 0:
+            return None
+
+        vector = vectorize(tokens)
+        amounts = amount_key(tokens)
+        candidates = set()
+        for table, bucket_key in enumerate(_lsh_keys(vector)):
+            candidates.update(self._buckets[table].get(bucket_key, ()))
+        candidates = [row for row in candidates if self._entries[row][0] == amounts]
+        if not candidates:
+            return None
+
+        rows = np.fromiter(candidates, dtype=np.int64)
+        scores = self._vectors[rows] @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        return dict(self._entries[rows[best]][1])
+
+
+class FoodSimilarityCache:
+    """
+    One FoodSimilarityIndex per user, so a match only ever comes from the
+    user's own cards and logs. A user's index is built from the database
+    on first lookup, kept current by add(), and dropped (rebuilt on next
+    lookup) when one of their logs or cards is edited or deleted. At most
+    max_users indexes are kept, least recently used evicted first.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, max_users: int = MAX_CACHED_USERS):
+        self.threshold = threshold
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._users: "OrderedDict[int, FoodSimilarityIndex]" = OrderedDict()
+
+    def _load(self, user_id: int) -> FoodSimilarityIndex:
+        feed_rows = db_helper.fetch_all(
+            """
+            SELECT content, food_name, calories, protein_g, carbs_g, fat_g
+            FROM food_feed
+            WHERE user_id = ? AND calories IS NOT NULL
+            ORDER BY id ASC
+            """,
+            (user_id,)
+        )
+        log_rows = db_helper.fetch_all(
+            """
+            SELECT description, description, calories, protein_g, carbs_g, fat_g
+            FROM calorie_logs
+            WHERE user_id = ? AND calories IS NOT NULL AND description IS NOT NULL AND is_deleted = 0
+            ORDER BY id ASC
+            """,
+            (user_id,)
+        )
+        index = FoodSimilarityIndex(self.threshold)
+        for row in list(log_rows) + list(feed_rows):
+            tokens = normalize_description(row[0] or "")
+            if tokens:
+                index.add(tokens, _nutrition_from_row(row))
+        return index
+
+    def add(self, user_id: int, description: str, nutrition: Dict) -> None:
+        """Index a user's description as soon as its nutrition is saved."""
+        tokens = normalize_description(description or "")
+        if not tokens or nutrition.get("calories") is None:
+            return
+        with self._lock:
+            index = self._users.get(user_id)
+            # Not loaded yet: the lazy load will pick this row up from the DB
+            if index is not None:
+                index.add(tokens, nutrition)
+
+    def lookup(self, user_id: int, description: str) -> Optional[Dict]:
+        """Return the user's stored nutrition for a near-identical description, or None."""
+        tokens = normalize_description(description or "")
+        if not tokens:
+            return None
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is None:
+                index = self._load(user_id)
+                self._users[user_id] = index
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            else:
+                self._users.move_to_end(user_id)
+            return index.lookup(tokens)
+
+    def forget_user(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+
+def _nutrition_from_row(row: tuple) -> Dict:
+    return {
+        "food_name": row[1] or row[0],
+        "calories": row[2],
+        "protein_g": row[3],
+        "carbs_g": row[4],
+        "fat_g": row[5],
+    }
+
+
+similarity_index = FoodSimilarityCache()
+
+
+def find_similar_food(user_id: int, description: str) -> Optional[Dict]:
+    """Nutrition of a food this user saved before that reads like this description."""
+    return similarity_index.lookup(user_id, description)
+
+
+def remember_food(
+    user_id: int,
+    description: str,
+    food_name: Optional[str],
+    calories: Optional[float],
+    protein_g: Optional[float],
+    carbs_g: Optional[float],
+    fat_g: Optional[float],
+) -> None:
+    """Add a user's freshly saved description and its nutrition to their index."""
+    similarity_index.add(
+        user_id,
+        description,
+        _nutrition_from_row((description, food_name, calories, protein_g, carbs_g, fat_g)),
+    )
@@ -0,0 +1,361 @@
+import argparse
+import csv
+import gzip
+import io
+import json
+from datetime import date
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.db import db_helper
+from app.models.calorie_entry import CalorieLog
+from app.models.workout import Workout
+from app.services.autocomplete_service import autocomplete
+from app.services.event_hub import events, IMPORT_PROGRESS, RESYNC
+from app.services.exercise_catalog import ExerciseCatalog, normalize_exercise_name
+from app.services.food_similarity_cache import similarity_index
+from app.services.personal_records_service import PersonalRecordsService
+from app.services.recent_foods import recent_foods
+from app.services.validators import clean_calorie_item, check_exercise
+
+
+# Valid rows written per transaction
+IMPORT_CHUNK_SIZE = 5000
+
+# Row errors kept in the import summary
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def read_records(stream: BinaryIO, fmt: str, gzipped: bool = False) -> Iterator[Tuple[int, Optional[dict]]]:
+    """
+    Parse an upload incrementally into (line number, record) pairs; the
+    record is None when the line is not valid JSON.
+
+    CSV rows are calorie logs unless the header has exercise_name, in which
+    case each row is one exercise of a workout. NDJSON lines carry a "type"
+    (calorie_log, workout, workout_exercise), as /api/export writes them.
+    """
+    if gzipped:
+        stream = gzip.GzipFile(fileobj=stream)
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        record_type = "workout_exercise" if "exercise_name" in (reader.fieldnames or []) else "calorie_log"
+        for row in reader:
+            # Blank cells mean "no value"
+            record = {key: value for key, value in row.items() if key and value not in (None, "")}
+            record.setdefault("type", record_type)
+            yield reader.line_num, record
+        return
+
+    for line_num, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_num, None
+            continue
+        yield line_num, record if isinstance(record, dict) else None
+
+
+def _iso_date(value: Any, field: str) -> str:
+    try:
+        return date.fromisoformat(str(value)[:10]).isoformat()
+    except ValueError:
+        raise ValueError(f"{field} must be a YYYY-MM-DD date")
+
+
+def _number(value: Any, field: str, cast: Callable = float) -> Any:
+    if value is None:
+        return None
+    try:
+        return cast(float(value))
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number")
+
+
+def _workout_ref(value: Any, field: str) -> Any:
+    # Exported ids are integers in NDJSON and strings in CSV
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{field} must be a workout id")
+    return value
+
+
+class ImportService:
+    @staticmethod
+    def import_records(
+        user_id: int,
+        records: Iterator[Tuple[int, Optional[dict]]],
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Validate records with the calorie and workout route rules and write
+        the valid ones in chunks: each chunk is one transaction of
+        executemany inserts plus one personal-records upsert. Invalid rows
+        are skipped and reported.
+
+        Exercise rows join the workout with the same date and name (an
+        exported workout_id also works); workouts created earlier in the
+        same import are extended rather than duplicated.
+
+        Args:
+            progress: Called with the running totals after every chunk
+
+        Returns:
+            Totals: rows read, logs/workouts/exercises imported, invalid
+            rows skipped, rows ignored (deleted logs, other record types)
+            and the first errors as {"line", "error"}
+        """
+        stats = {
+            "rows": 0,
+            "calorie_logs": 0,
+            "workouts": 0,
+            "exercises": 0,
+            "skipped": 0,
+            "ignored": 0,
+            "errors": [],
+        }
+        # (date, workout_name) -> workouts.id, and the next order_index of each workout
+        workout_ids: Dict[Tuple[str, str], int] = {}
+        next_order: Dict[int, int] = {}
+        # Exported workout ids -> (date, workout_name, notes), for export-format exercises
+        exported_workouts: Dict[Any, Tuple[str, str, Optional[str]]] = {}
+
+        logs: List[dict] = []
+        exercises: List[dict] = []
+
+        def flush():
+            ImportService._write_chunk(user_id, logs, exercises, workout_ids, next_order, stats)
+            logs.clear()
+            exercises.clear()
+            events.publish(user_id, IMPORT_PROGRESS, {k: v for k, v in stats.items() if k != "errors"})
+            if progress:
+                progress(stats)
+
+        for line_num, record in records:
+            stats["rows"] += 1
+            try:
+                if record is None:
+                    raise ValueError("not a JSON object")
+                record_type = record.get("type")
+                if record_type == "calorie_log":
+                    if record.get("is_deleted") in (1, "1", True):
+                        stats["ignored"] += 1
+                        continue
+                    item = clean_calorie_item({
+                        **record,
+                        "description": record.get("description") or record.get("food_name"),
+                    })
+                    item["entry_date"] = _iso_date(record.get("entry_date") or record.get("date"), "entry_date")
+                    logs.append(item)
+                elif record_type == "workout":
+                    exported_workouts[_workout_ref(record.get("id"), "id")] = (
+                        record.get("date"), record.get("workout_name"), record.get("notes")
+                    )
+                    continue
+                elif record_type == "workout_exercise":
+                    exercises.append(ImportService._clean_exercise(record, exported_workouts))
+                else:
+                    # Other export records (profile, chats) are not imported
+                    stats["ignored"] += 1
+                    continue
+            except ValueError as e:
+                stats["skipped"] += 1
+                if len(stats["errors"]) < MAX_REPORTED_ERRORS:
+                    stats["errors"].append({"line": line_num, "error": str(e)})
+                continue
+
+            if len(logs) + len(exercises) >= chunk_size:
+                flush()
+
+        if logs or exercises:
+            flush()
+
+        # Imported history changes recent foods, suggestions and every open view
+        recent_foods.forget_user(user_id)
+        similarity_index.forget_user(user_id)
+        autocomplete.forget_user(user_id)
+        events.publish(user_id, RESYNC)
+        return stats
+
+    @staticmethod
+    def _clean_exercise(record: dict, exported_workouts: Dict[Any, Tuple[str, str, Optional[str]]]) -> dict:
+        """One exercise row, validated like POST /api/workouts, with its workout's date, name and notes."""
+        workout_id = record.get("workout_id")
+        if workout_id is not None and _workout_ref(workout_id, "workout_id") in exported_workouts:
+            log_date, workout_name, workout_notes = exported_workouts[workout_id]
+        else:
+            log_date = record.get("log_date") or record.get("date")
+            workout_name = record.get("workout_name")
+            workout_notes = record.get("workout_notes")
+        if not workout_name or not str(workout_name).strip():
+            raise ValueError("workout_name is required")
+        if not log_date:
+            raise ValueError("log_date is required")
+
+        exercise = {
+            "exercise_name": record.get("exercise_name"),
+            "sets": _number(record.get("sets"), "sets", int),
+            "reps": _number(record.get("reps"), "reps", int),
+            "weight_kg": _number(record.get("weight_kg"), "weight_kg") or 0.0,
+            "previous_weight": _number(record.get("previous_weight"), "previous_weight") or 0.0,
+            # Assigned when written; imports list exercises in workout order
+            "order_index": 0,
+            "notes": record.get("notes"),
+        }
+        check_exercise(exercise)
+        exercise["key"] = (_iso_date(log_date, "log_date"), " ".join(str(workout_name).split()))
+        exercise["workout_notes"] = workout_notes
+        return exercise
+
+    @staticmethod
+    def _write_chunk(
+        user_id: int,
+        logs: List[dict],
+        exercises: List[dict],
+        workout_ids: Dict[Tuple[str, str], int],
+        next_order: Dict[int, int],
+        stats: Dict[str, Any],
+    ) -> None:
+        """Write one chunk of validated rows in a single transaction."""
+        created_at = CalorieLog.now_iso()
+
+        # Catalog ids are resolved (and cached) before the transaction
+        catalog_ids = ExerciseCatalog.resolve_ids([ex["exercise_name"] for ex in exercises])
+
+        with db_helper.transaction():
+            # The per-row INSERT triggers skip while this row exists; _index_chunk does their work
+            db_helper.execute_query("INSERT INTO bulk_load (name) VALUES ('import')")
+            # The transaction holds the write lock, so the chunk's ids are all above these
+            last_ids = db_helper.fetch_one(
+                """
+                SELECT (SELECT COALESCE(MAX(id), 0) FROM calorie_logs),
+                       (SELECT COALESCE(MAX(id), 0) FROM workouts),
+                       (SELECT COALESCE(MAX(id), 0) FROM workout_exercises)
+                """
+            )
+
+            db_helper.execute_many(
+                """
+                INSERT INTO calorie_logs (
+                    user_id, entry_date, description,
+                    calories, protein_g, carbs_g, fat_g,
+                    created_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        user_id, item["entry_date"], item["description"],
+                        item["calories"], item["protein_g"], item["carbs_g"], item["fat_g"],
+                        created_at,
+                    )
+                    for item in logs
+                ],
+            )
+
+            new_keys = {}
+            for ex in exercises:
+                if ex["key"] not in workout_ids:
+                    new_keys.setdefault(ex["key"], ex["workout_notes"])
+            new_ids = db_helper.insert_many(
+                "INSERT INTO workouts (user_id, workout_name, date, notes, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(user_id, name, log_date, notes, Workout.now_iso()) for (log_date, name), notes in new_keys.items()],
+            )
+            chunk_workout_ids = dict(zip(new_keys, new_ids))
+
+            exercise_rows = []
+            touched = set()
+            for ex in exercises:
+                workout_id = workout_ids.get(ex["key"]) or chunk_workout_ids[ex["key"]]
+                order_index = next_order.get(workout_id, 0)
+                next_order[workout_id] = order_index + 1
+                touched.add(workout_id)
+                exercise_rows.append((
+                    workout_id, catalog_ids[normalize_exercise_name(ex["exercise_name"])],
+                    ex["sets"], ex["reps"], ex["weight_kg"], ex["previous_weight"],
+                    order_index, ex["notes"],
+                ))
+            db_helper.execute_many(
+                """
+                INSERT INTO workout_exercises (
+                    workout_id, exercise_id, sets, reps, weight_kg,
+                    previous_weight, order_index, notes
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                exercise_rows,
+            )
+
+            db_helper.execute_query("DELETE FROM bulk_load")
+            ImportService._index_chunk(user_id, *last_ids)
+            PersonalRecordsService.record_workouts(user_id, touched)
+
+        workout_ids.update(chunk_workout_ids)
+        stats["calorie_logs"] += len(logs)
+        stats["workouts"] += len(new_ids)
+        stats["exercises"] += len(exercise_rows)
+
+    @staticmethod
+    def _index_chunk(user_id: int, after_log_id: int, after_workout_id: int, after_exercise_id: int) -> None:
+        """
+        Set-based version of what the skipped INSERT triggers do, for the
+        rows above the given ids: calorie_logs_fts, change_log and one
+        version bump per resource that got rows.
+        """
+        resources = {"calorie_logs": "calories", "workouts": "workouts", "workout_exercises": "workouts"}
+        changed = set()
+        db_helper.execute_query(
+            "INSERT INTO calorie_logs_fts (rowid, description) SELECT id, description FROM calorie_logs WHERE id > ?",
+            (after_log_id,)
+        )
+        for table, after_id in (
+            ("calorie_logs", after_log_id),
+            ("workouts", after_workout_id),
+            ("workout_exercises", after_exercise_id),
+        ):
+            added = db_helper.execute_query(
+                f"INSERT INTO change_log (user_id, entity, entity_id) SELECT ?, '{table}', id FROM {table} WHERE id > ? ORDER BY id",
+                (user_id, after_id)
+            )
+            if added:
+                changed.add(resources[table])
+        db_helper.execute_many(
+            """
+            INSERT INTO resource_versions (user_id, resource, version) VALUES (?, ?, 1)
+            ON CONFLICT (user_id, resource) DO UPDATE SET version = version + 1
+            """,
+            [(user_id, resource) for resource in sorted(changed)]
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import calorie and workout history from a CSV or NDJSON file.")
+    parser.add_argument("path", help="CSV or NDJSON file (.gz is decompressed)")
+    parser.add_argument("--user-id", type=int, required=True, help="User the history belongs to")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if db_helper.fetch_one("SELECT id FROM users WHERE id = ?", (args.user_id,)) is None:
+        parser.error(f"user {args.user_id} does not exist")
+
+    gzipped = args.path.endswith(".gz")
+    fmt = args.format or ("csv" if args.path.removesuffix(".gz").endswith(".csv") else "ndjson")
+
+    def report(stats):
+        print(
+            f"{stats['rows']} rows: {stats['calorie_logs']} logs, {stats['workouts']} workouts, "
+            f"{stats['exercises']} exercises, {stats['skipped']} skipped"
+        )
+
+    with open(args.path, "rb") as upload:
+        result = ImportService.import_records(
+            args.user_id, read_records(upload, fmt, gzipped), args.chunk_size, progress=report
+        )
+    for error in result["errors"]:
+        print(f"line {error['line']}: {error['error']}")
@@ -0,0 +1,221 @@
+import argparse
+from typing import Iterable, List, Optional
+
+from app.db import db_helper
+from app.models.personal_record import PersonalRecord
+
+
+# Epley estimate, matching workout_analytics.estimate_1rm
+E1RM_SQL = """
+    CASE WHEN we.reps <= 0 THEN 0
+         WHEN we.reps = 1 THEN we.weight_kg
+         ELSE we.weight_kg * (1 + we.reps / 30.0) END
+"""
+
+RECORD_COLUMNS = (
+    "user_id, exercise_id, "
+    "best_weight_kg, best_weight_reps, best_weight_workout_id, best_weight_date, "
+    "best_e1rm_kg, best_e1rm_workout_id, best_e1rm_date, "
+    "best_volume_kg, best_volume_workout_id, best_volume_date, updated_at"
+)
+
+# (value column, columns that travel with it) for each kind of record
+RECORD_KINDS = (
+    ("best_weight_kg", ("best_weight_reps", "best_weight_workout_id", "best_weight_date")),
+    ("best_e1rm_kg", ("best_e1rm_workout_id", "best_e1rm_date")),
+    ("best_volume_kg", ("best_volume_workout_id", "best_volume_date")),
+)
+
+
+def _best_select(where: str) -> str:
+    """Best weight, 1RM and volume session per (user, exercise) over the rows matching where."""
+    return f"""
+        WITH lifts AS (
+            SELECT w.user_id, we.exercise_id, w.id AS workout_id, w.date,
+                   COALESCE(we.weight_kg, 0) AS weight_kg, we.reps,
+                   {E1RM_SQL} AS e1rm,
+                   COALESCE(we.sets * we.reps * we.weight_kg, 0) AS volume
+            FROM workout_exercises we
+            JOIN workouts w ON w.id = we.workout_id
+            WHERE {where}
+        ),
+        sessions AS (
+            SELECT user_id, exercise_id, workout_id, date, SUM(volume) AS volume
+            FROM lifts
+            GROUP BY user_id, exercise_id, workout_id
+        ),
+        by_weight AS (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY user_id, exercise_id
+                ORDER BY weight_kg DESC, date ASC, workout_id ASC
+            ) AS rn FROM lifts
+        ),
+        by_e1rm AS (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY user_id, exercise_id
+                ORDER BY COALESCE(e1rm, 0) DESC, date ASC, workout_id ASC
+            ) AS rn FROM lifts
+        ),
+        by_volume AS (
+            SELECT *, ROW_NUMBER() OVER (
+                PARTITION BY user_id, exercise_id
+                ORDER BY volume DESC, date ASC, workout_id ASC
+            ) AS rn FROM sessions
+        )
+        SELECT bw.user_id, bw.exercise_id,
+               bw.weight_kg, bw.reps, bw.workout_id, bw.date,
+               COALESCE(be.e1rm, 0), be.workout_id, be.date,
+               bv.volume, bv.workout_id, bv.date,
+               ?
+        FROM by_weight bw
+        JOIN by_e1rm be ON be.user_id = bw.user_id AND be.exercise_id = bw.exercise_id AND be.rn = 1
+        JOIN by_volume bv ON bv.user_id = bw.user_id AND bv.exercise_id = bw.exercise_id AND bv.rn = 1
+        WHERE bw.rn = 1
+    """
+
+
+def _merge_clause() -> str:
+    """Upsert SET clause that keeps whichever record is better (earlier date wins ties)."""
+    assignments = []
+    for value_col, extra_cols in RECORD_KINDS:
+        date_col = extra_cols[-1]
+        better = (
+            f"(excluded.{value_col} > {value_col} OR "
+            f"(excluded.{value_col} = {value_col} AND excluded.{date_col} < {date_col}))"
+        )
+        for col in (value_col,) + extra_cols:
+            assignments.append(f"{col} = CASE WHEN {better} THEN excluded.{col} ELSE {col} END")
+    assignments.append("updated_at = excluded.updated_at")
+    return ",\n            ".join(assignments)
+
+
+class PersonalRecordsService:
+    # personal_records rows with their catalog name, in PersonalRecord.from_row order
+    RECORD_SELECT = """
+            SELECT pr.user_id, pr.exercise_id, e.name,
+                   pr.best_weight_kg, pr.best_weight_reps, pr.best_weight_workout_id, pr.best_weight_date,
+                   pr.best_e1rm_kg, pr.best_e1rm_workout_id, pr.best_e1rm_date,
+                   pr.best_volume_kg, pr.best_volume_workout_id, pr.best_volume_date,
+                   pr.updated_at
+            FROM personal_records pr
+            JOIN exercises e ON e.id = pr.exercise_id
+            """
+
+    @staticmethod
+    def get_records(user_id: int, exercise_id: Optional[int] = None) -> List[PersonalRecord]:
+        """Get a user's personal records, optionally for one exercise."""
+        query = PersonalRecordsService.RECORD_SELECT + " WHERE pr.user_id = ?"
+        params: list = [user_id]
+        if exercise_id:
+            query += " AND pr.exercise_id = ?"
+            params.append(exercise_id)
+        rows = db_helper.fetch_all(query + " ORDER BY e.name ASC", tuple(params))
+        return [PersonalRecord.from_row(row) for row in rows]
+
+    @staticmethod
+    def record_workout(user_id: int, workout_id: int) -> None:
+        """Fold a new or edited workout's lifts into the user's records."""
+        db_helper.execute_query(
+            f"""
+            INSERT INTO personal_records ({RECORD_COLUMNS})
+            {_best_select("w.id = ? AND w.user_id = ?")}
+            ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+            {_merge_clause()}
+            """,
+            (workout_id, user_id, PersonalRecord.now_iso())
+        )
+
+    @staticmethod
+    def record_workouts(user_id: int, workout_ids: Iterable[int]) -> None:
+        """Fold several new workouts' lifts into the user's records in one upsert."""
+        ids = sorted(set(workout_ids))
+        if not ids:
+            return
+        placeholders = ",".join("?" * len(ids))
+        db_helper.execute_query(
+            f"""
+            INSERT INTO personal_records ({RECORD_COLUMNS})
+            {_best_select(f"w.user_id = ? AND w.id IN ({placeholders})")}
+            ON CONFLICT (user_id, exercise_id) DO UPDATE SET
+            {_merge_clause()}
+            """,
+            (user_id, *ids, PersonalRecord.now_iso())
+        )
+
+    @staticmethod
+    def exercises_held_by(user_id: int, workout_id: int) -> List[int]:
+        """Exercise ids whose weight, 1RM or volume record comes from this workout."""
+        rows = db_helper.fetch_all(
+            """
+            SELECT exercise_id FROM personal_records
+            WHERE user_id = ?
+              AND (best_weight_workout_id = ? OR best_e1rm_workout_id = ? OR best_volume_workout_id = ?)
+            """,
+            (user_id, workout_id, workout_id, workout_id)
+        )
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def recompute(user_id: int, exercise_ids: Iterable[int]) -> None:
+        """Rebuild the records for these exercises from the user's remaining history."""
+        ids = sorted(set(exercise_ids))
+        if not ids:
+            return
+        placeholders = ",".join("?" * len(ids))
+        db_helper.execute_query(
+            f"DELETE FROM personal_records WHERE user_id = ? AND exercise_id IN ({placeholders})",
+            (user_id, *ids)
+        )
+        db_helper.execute_query(
+            f"""
+            INSERT INTO personal_records ({RECORD_COLUMNS})
+            {_best_select(f"w.user_id = ? AND we.exercise_id IN ({placeholders})")}
+            """,
+            (user_id, *ids, PersonalRecord.now_iso())
+        )
+
+    @staticmethod
+    def refresh_workout(user_id: int, workout_id: int) -> None:
+        """
+        Bring records up to date after a workout was edited: records it held
+        are recomputed (they may have gone down), then its current lifts are
+        merged in.
+        """
+        PersonalRecordsService.recompute(
+            user_id,
+            PersonalRecordsService.exercises_held_by(user_id, workout_id)
+        )
+        PersonalRecordsService.record_workout(user_id, workout_id)
+
+    @staticmethod
+    def rebuild(user_id: Optional[int] = None) -> int:
+        """
+        Recompute records from scratch for one user or everyone (backfill).
+
+        Returns:
+            Number of personal_records rows written
+        """
+        with db_helper.transaction():
+            if user_id is None:
+                db_helper.execute_query("DELETE FROM personal_records")
+                where, params = "1 = 1", ()
+            else:
+                db_helper.execute_query("DELETE FROM personal_records WHERE user_id = ?", (user_id,))
+                where, params = "w.user_id = ?", (user_id,)
+            db_helper.execute_query(
+                f"INSERT INTO personal_records ({RECORD_COLUMNS}) {_best_select(where)}",
+                params + (PersonalRecord.now_iso(),)
+            )
+            if user_id is None:
+                row = db_helper.fetch_one("SELECT COUNT(*) FROM personal_records")
+            else:
+                row = db_helper.fetch_one("SELECT COUNT(*) FROM personal_records WHERE user_id = ?", (user_id,))
+        return row[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the personal_records table from workout history.")
+    parser.add_argument("--user-id", type=int, help="Only rebuild this user's records")
+    args = parser.parse_args()
+    count = PersonalRecordsService.rebuild(args.user_id)
+    print(f"Rebuilt {count} personal records")
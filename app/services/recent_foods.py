@@ -0,0 +1,186 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from app.db import db_helper
+
+
+# Distinct foods remembered per user, and users kept in memory at once
+MAX_FOODS_PER_USER = 50
+MAX_CACHED_USERS = 1000
+
+
+@dataclass
+class RecentFood:
+    id: str            # "log:<calorie_logs.id>" or "feed:<food_feed.id>" of the latest occurrence
+    description: str
+    calories: Optional[float]
+    protein_g: Optional[float]
+    carbs_g: Optional[float]
+    fat_g: Optional[float]
+    count: int
+    last_used: str
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "description": self.description,
+            "calories": self.calories,
+            "protein_g": self.protein_g,
+            "carbs_g": self.carbs_g,
+            "fat_g": self.fat_g,
+            "count": self.count,
+            "last_used": self.last_used,
+        }
+
+
+def food_key(description: str) -> str:
+    return " ".join(description.lower().split())
+
+
+def parse_item_id(item_id: str) -> Optional[tuple]:
+    """Split "log:12" / "feed:7" into ("log", 12); None if malformed."""
+    source, _, raw_id = str(item_id).partition(":")
+    if source not in ("log", "feed") or not raw_id.isdigit():
+        return None
+    return source, int(raw_id)
+
+
+class RecentFoodsIndex:
+    """
+    Per-user bounded LRU of distinct foods with how often each was logged.
+
+    A user's list is built from calorie_logs and food_feed the first time it
+    is needed, then kept current by record() on every new log or card.
+    """
+
+    def __init__(self, max_foods: int = MAX_FOODS_PER_USER, max_users: int = MAX_CACHED_USERS):
+        self.max_foods = max_foods
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._users: "OrderedDict[int, OrderedDict[str, RecentFood]]" = OrderedDict()
+
+    def _load(self, user_id: int) -> "OrderedDict[str, RecentFood]":
+        # Latest row per distinct description, with how many times it was logged
+        log_rows = db_helper.fetch_all(
+            """
+            SELECT c.id, c.description, c.calories, c.protein_g, c.carbs_g, c.fat_g,
+                   c.created_at, g.times
+            FROM calorie_logs c
+            JOIN (
+                SELECT MAX(id) AS id, COUNT(*) AS times
+                FROM calorie_logs
+                WHERE user_id = ? AND is_deleted = 0
+                  AND description IS NOT NULL AND calories IS NOT NULL
+                GROUP BY lower(trim(description))
+            ) g ON g.id = c.id
+            ORDER BY c.id DESC
+            LIMIT ?
+            """,
+            (user_id, self.max_foods)
+        )
+        feed_rows = db_helper.fetch_all(
+            """
+            SELECT f.id, f.food_name, f.calories, f.protein_g, f.carbs_g, f.fat_g,
+                   f.created_at, g.times
+            FROM food_feed f
+            JOIN (
+                SELECT MAX(id) AS id, COUNT(*) AS times
+                FROM food_feed
+                WHERE user_id = ? AND food_name IS NOT NULL AND calories IS NOT NULL
+                GROUP BY lower(trim(food_name))
+            ) g ON g.id = f.id
+            ORDER BY f.id DESC
+            LIMIT ?
+            """,
+            (user_id, self.max_foods)
+        )
+
+        merged: Dict[str, RecentFood] = {}
+        for source, rows in (("feed", feed_rows), ("log", log_rows)):
+            for row in rows:
+                key = food_key(row[1])
+                food = RecentFood(
+                    id=f"{source}:{row[0]}",
+                    description=row[1],
+                    calories=row[2],
+                    protein_g=row[3],
+                    carbs_g=row[4],
+                    fat_g=row[5],
+                    count=row[7],
+                    last_used=row[6],
+                )
+                existing = merged.get(key)
+                if existing is not None:
+                    food.count += existing.count
+                    if existing.last_used > food.last_used:
+                        food.id, food.last_used = existing.id, existing.last_used
+                merged[key] = food
+
+        # Least recently used first, so the end of the dict is the newest
+        ordered = sorted(merged.items(), key=lambda item: item[1].last_used)
+        foods = OrderedDict(ordered[-self.max_foods:])
+        return foods
+
+    def _foods_for(self, user_id: int) -> "OrderedDict[str, RecentFood]":
+        foods = self._users.get(user_id)
+        if foods is None:
+            foods = self._load(user_id)
+            self._users[user_id] = foods
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return foods
+
+    def record(
+        self,
+        user_id: int,
+        item_id: str,
+        description: Optional[str],
+        calories: Optional[float],
+        protein_g: Optional[float],
+        carbs_g: Optional[float],
+        fat_g: Optional[float],
+        used_at: str,
+    ) -> None:
+        """Move a just-logged food to the front (only if the user is cached)."""
+        if not description or calories is None:
+            return
+        with self._lock:
+            foods = self._users.get(user_id)
+            if foods is None:
+                # Built from the database on next read, which includes this row
+                return
+            key = food_key(description)
+            existing = foods.pop(key, None)
+            foods[key] = RecentFood(
+                id=item_id,
+                description=description,
+                calories=calories,
+                protein_g=protein_g,
+                carbs_g=carbs_g,
+                fat_g=fat_g,
+                count=(existing.count if existing else 0) + 1,
+                last_used=used_at,
+            )
+            while len(foods) > self.max_foods:
+                foods.popitem(last=False)
+
+    def forget_user(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def list(self, user_id: int, sort: str = "recent", limit: int = 20) -> List[RecentFood]:
+        """Recent foods newest first, or by frequency with sort="frequent"."""
+        with self._lock:
+            foods = list(self._foods_for(user_id).values())
+        if sort == "frequent":
+            foods.sort(key=lambda food: (food.count, food.last_used), reverse=True)
+        else:
+            foods.reverse()
+        return foods[:limit]
+
+
+recent_foods = RecentFoodsIndex()
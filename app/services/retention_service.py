@@ -0,0 +1,161 @@
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from app.db import db_helper
+from app.models.calorie_entry import CalorieLog
+
+
+# Days a soft-deleted calorie log stays in calorie_logs before it is archived
+RETENTION_DAYS = int(os.getenv("CALORIE_LOG_RETENTION_DAYS", "30"))
+
+# Logs moved per transaction, and the most batches one run moves
+RETENTION_BATCH_SIZE = 500
+RETENTION_MAX_BATCHES = 200
+
+# Free pages released per incremental vacuum step, and the most steps one run takes
+VACUUM_PAGES_PER_STEP = 256
+VACUUM_MAX_STEPS = 40
+
+# Pause between write transactions, so request traffic gets the lock
+RETENTION_PAUSE_SECONDS = 0.05
+
+# Rows ANALYZE samples per index; keeps it quick on big tables
+ANALYSIS_LIMIT = 1000
+
+# Columns copied from calorie_logs into calorie_logs_archive
+ARCHIVED_COLUMNS = (
+    "id, user_id, entry_date, description, calories, protein_g, carbs_g, fat_g, "
+    "created_at, is_deleted, deleted_at"
+)
+
+
+class RetentionService:
+    @staticmethod
+    def archive_deleted_logs(
+        days: int = RETENTION_DAYS,
+        batch_size: int = RETENTION_BATCH_SIZE,
+        max_batches: int = RETENTION_MAX_BATCHES,
+        hard_delete: bool = False,
+    ) -> int:
+        """
+        Move calorie logs soft-deleted more than `days` ago into
+        calorie_logs_archive (or drop them with hard_delete), oldest
+        deletion first, one short transaction per batch. The delete
+        triggers keep the search index, ETags and /api/sync up to date.
+
+        Returns:
+            Number of logs moved
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        moved = 0
+        for _ in range(max_batches):
+            with db_helper.transaction():
+                ids = [row[0] for row in db_helper.fetch_all(
+                    """
+                    SELECT id FROM calorie_logs
+                    WHERE is_deleted = 1 AND deleted_at < ?
+                    ORDER BY deleted_at
+                    LIMIT ?
+                    """,
+                    (cutoff, batch_size)
+                )]
+                if ids:
+                    placeholders = ",".join("?" * len(ids))
+                    if not hard_delete:
+                        db_helper.execute_query(
+                            f"""
+                            INSERT OR REPLACE INTO calorie_logs_archive ({ARCHIVED_COLUMNS}, archived_at)
+                            SELECT {ARCHIVED_COLUMNS}, ? FROM calorie_logs WHERE id IN ({placeholders})
+                            """,
+                            (CalorieLog.now_iso(), *ids)
+                        )
+                    moved += db_helper.execute_query(
+                        f"DELETE FROM calorie_logs WHERE id IN ({placeholders})", tuple(ids)
+                    )
+            if len(ids) < batch_size:
+                break
+            time.sleep(RETENTION_PAUSE_SECONDS)
+        return moved
+
+    @staticmethod
+    def incremental_vacuum(
+        pages_per_step: int = VACUUM_PAGES_PER_STEP, max_steps: int = VACUUM_MAX_STEPS
+    ) -> int:
+        """
+        Return free pages to the file system a few at a time. Only works on
+        a database in auto_vacuum = INCREMENTAL mode (see full_vacuum).
+
+        Returns:
+            Number of pages released
+        """
+        with db_helper.shared_connection():
+            if db_helper.fetch_one("PRAGMA auto_vacuum")[0] != 2:
+                return 0
+            released = 0
+            for _ in range(max_steps):
+                free_pages = db_helper.fetch_one("PRAGMA freelist_count")[0]
+                if not free_pages:
+                    break
+                step = min(free_pages, pages_per_step)
+                db_helper.fetch_all(f"PRAGMA incremental_vacuum({step})")
+                released += step
+                time.sleep(RETENTION_PAUSE_SECONDS)
+        return released
+
+    @staticmethod
+    def analyze() -> None:
+        """Refresh the query planner's statistics, sampling at most ANALYSIS_LIMIT rows per index."""
+        with db_helper.shared_connection():
+            db_helper.execute_query(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+            db_helper.execute_query("ANALYZE")
+
+    @staticmethod
+    def full_vacuum() -> None:
+        """
+        Switch the database to incremental auto-vacuum and rebuild it. Locks
+        the whole database while it runs: for maintenance windows, once per
+        database created before incremental auto-vacuum.
+        """
+        with db_helper.shared_connection():
+            db_helper.execute_query("PRAGMA auto_vacuum = INCREMENTAL")
+            db_helper.execute_query("VACUUM")
+
+    @staticmethod
+    def run(days: int = RETENTION_DAYS, hard_delete: bool = False) -> Dict[str, Any]:
+        """
+        One bounded retention pass for a scheduler (cron, systemd timer):
+        archive expired deleted logs, release free pages, then ANALYZE.
+        A run that hits RETENTION_MAX_BATCHES leaves the rest for the next.
+        """
+        archived = RetentionService.archive_deleted_logs(days, hard_delete=hard_delete)
+        released = RetentionService.incremental_vacuum()
+        RetentionService.analyze()
+        return {
+            "archived": 0 if hard_delete else archived,
+            "deleted": archived if hard_delete else 0,
+            "pages_released": released,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old soft-deleted calorie logs and compact the database.")
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS, help="Retention period of deleted logs")
+    parser.add_argument("--hard-delete", action="store_true", help="Drop expired logs instead of archiving them")
+    parser.add_argument(
+        "--full-vacuum", action="store_true",
+        help="Switch to incremental auto-vacuum and rebuild the database (locks it; run once, off-peak)"
+    )
+    args = parser.parse_args()
+
+    if args.full_vacuum:
+        RetentionService.full_vacuum()
+        print("Database rebuilt with incremental auto-vacuum")
+
+    result = RetentionService.run(args.days, args.hard_delete)
+    print(
+        f"{result['archived']} logs archived, {result['deleted']} deleted, "
+        f"{result['pages_released']} pages released"
+    )
@@ -0,0 +1,75 @@
+from app.models.calorie_entry import CalorieLog
+from app.models.food_feed import FoodFeed
+from app.models.workout import Workout
+from app.models.workout_exercise import WorkoutExercise
+from app.services.workout_service import WorkoutService
+from app.db import db_helper
+from typing import Dict, Any, List
+
+
+# Current row of each synced entity, by id
+ENTITY_SELECTS = {
+    "calorie_logs": ("SELECT * FROM calorie_logs WHERE id IN ({})", CalorieLog),
+    "food_feed": ("SELECT * FROM food_feed WHERE id IN ({})", FoodFeed),
+    "workouts": ("SELECT * FROM workouts WHERE id IN ({})", Workout),
+    "workout_exercises": (WorkoutService.EXERCISE_SELECT + " WHERE we.id IN ({})", WorkoutExercise),
+}
+
+
+class SyncService:
+    @staticmethod
+    def get_changes(user_id: int, since: int = 0, limit: int = 500) -> Dict[str, Any]:
+        """
+        Rows of a user's calorie logs, food feed, workouts and workout
+        exercises that changed after the sync token `since`, read from
+        change_log in one snapshot.
+
+        Each changed entity is listed once, in the order of its latest
+        change. Soft-deleted calorie logs come back with is_deleted = 1;
+        rows that no longer exist are listed under "deleted". Exercises
+        removed together with their workout are implied by the workout's
+        deletion.
+
+        Returns:
+            Dictionary with 'changes', 'deleted', 'next_token' (pass it as
+            `since` next time) and 'has_more'
+        """
+        changes: Dict[str, List[dict]] = {entity: [] for entity in ENTITY_SELECTS}
+        deleted: Dict[str, List[int]] = {entity: [] for entity in ENTITY_SELECTS}
+
+        with db_helper.transaction(immediate=False):
+            # One extra entry tells whether another page exists
+            log_rows = db_helper.fetch_all(
+                """
+                SELECT entity, entity_id, MAX(seq) AS last_seq
+                FROM change_log
+                WHERE user_id = ? AND seq > ?
+                GROUP BY entity, entity_id
+                ORDER BY last_seq ASC
+                LIMIT ?
+                """,
+                (user_id, since, limit + 1)
+            )
+            has_more = len(log_rows) > limit
+            log_rows = log_rows[:limit]
+
+            ids_by_entity: Dict[str, List[int]] = {}
+            for entity, entity_id, _ in log_rows:
+                ids_by_entity.setdefault(entity, []).append(entity_id)
+
+            for entity, ids in ids_by_entity.items():
+                query, model = ENTITY_SELECTS[entity]
+                rows = db_helper.fetch_all(query.format(",".join("?" * len(ids))), tuple(ids))
+                found = {row[0]: model.from_row(row) for row in rows}
+                for entity_id in ids:
+                    if entity_id in found:
+                        changes[entity].append(found[entity_id].to_dict())
+                    else:
+                        deleted[entity].append(entity_id)
+
+        return {
+            "changes": changes,
+            "deleted": deleted,
+            "next_token": log_rows[-1][2] if log_rows else since,
+            "has_more": has_more,
+        }
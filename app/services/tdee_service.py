@@ -55,11 +55,49 @@ class TdeeService:
         return TdeeService.get_profile_by_user_id(user_id)
 
     @staticmethod
-    def get_chat_history(tdee_profile_id: int) -> List[TdeeChat]:
-        """Get all chat messages for a TDEE profile, ordered by creation time."""
+    def get_chat_history(
+        tdee_profile_id: int,
+        before_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[TdeeChat]:
+        """
+        Chat messages for a TDEE profile, oldest first.
+        
+        With limit, only the newest `limit` messages (older than before_id,
+        if given) are loaded, walking idx_tdee_chat_profile backwards, so the
+        cost does not grow with the length of the conversation.
+        """
+        if limit is None and before_id is None:
+            rows = db_helper.fetch_all(
+                "SELECT * FROM tdee_chat WHERE tdee_profile_id = ? ORDER BY id ASC",
+                (tdee_profile_id,)
+            )
+            return [TdeeChat.from_row(row) for row in rows]
+        
         rows = db_helper.fetch_all(
-            "SELECT * FROM tdee_chat WHERE tdee_profile_id = ? ORDER BY created_at ASC",
-            (tdee_profile_id,)
+            """
+            SELECT * FROM (
+                SELECT * FROM tdee_chat
+                WHERE tdee_profile_id = ? AND id < ?
+                ORDER BY id DESC
+                LIMIT ?
+            ) ORDER BY id ASC
+            """,
+            (tdee_profile_id, before_id or db_helper.MAX_ROW_ID, limit if limit is not None else -1)
+        )
+        return [TdeeChat.from_row(row) for row in rows]
+
+    @staticmethod
+    def get_chat_after(tdee_profile_id: int, after_id: int, limit: int = 100) -> List[TdeeChat]:
+        """Chat messages newer than after_id, oldest first."""
+        rows = db_helper.fetch_all(
+            """
+            SELECT * FROM tdee_chat
+            WHERE tdee_profile_id = ? AND id > ?
+            ORDER BY id ASC
+            LIMIT ?
+            """,
+            (tdee_profile_id, after_id, limit)
         )
         return [TdeeChat.from_row(row) for row in rows]
 
@@ -67,18 +105,26 @@ class TdeeService:
     def save_chat_message(tdee_profile_id: int, role: str, content: str) -> TdeeChat:
         """Save a chat message to the database."""
         created_at = TdeeChat.now_iso()
-        db_helper.execute_query(
-            "INSERT INTO tdee_chat (tdee_profile_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+        row = db_helper.execute_returning(
+            "INSERT INTO tdee_chat (tdee_profile_id, role, content, created_at) VALUES (?, ?, ?, ?) RETURNING *",
             (tdee_profile_id, role, content, created_at)
         )
-        
-        # Fetch the last inserted message
-        row = db_helper.fetch_one(
-            "SELECT * FROM tdee_chat WHERE tdee_profile_id = ? ORDER BY id DESC LIMIT 1",
-            (tdee_profile_id,)
-        )
         return TdeeChat.from_row(row)
 
+    @staticmethod
+    def save_chat_turn(tdee_profile_id: int, user_message: str, assistant_message: str) -> List[TdeeChat]:
+        """Store the user message and the coach's reply with one executemany (user first)."""
+        created_at = TdeeChat.now_iso()
+        turn = [("user", user_message), ("assistant", assistant_message)]
+        ids = db_helper.insert_many(
+            "INSERT INTO tdee_chat (tdee_profile_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+            [(tdee_profile_id, role, content, created_at) for role, content in turn]
+        )
+        return [
+            TdeeChat(id=chat_id, tdee_profile_id=tdee_profile_id, role=role, content=content, created_at=created_at)
+            for chat_id, (role, content) in zip(ids, turn)
+        ]
+
     @staticmethod
     def get_or_create_profile_id(user_id: int) -> int:
         """Get existing profile ID or create a minimal profile and return its ID."""
@@ -0,0 +1,49 @@
+from typing import Any, Dict, Optional
+
+
+# Macro fields a calorie log may carry
+MACRO_FIELDS = ("calories", "protein_g", "carbs_g", "fat_g")
+
+
+def clean_calorie_item(item: Any, entry_date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Validate one calorie log item and return it with a stripped description
+    and float macros. Raises ValueError with the reason.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("must be an object")
+    description = item.get("description")
+    if not description or not str(description).strip():
+        raise ValueError("description is required")
+    clean = {"description": str(description).strip(), "entry_date": item.get("entry_date") or entry_date}
+    for field in MACRO_FIELDS:
+        value = item.get(field)
+        if value is None:
+            clean[field] = None
+            continue
+        try:
+            clean[field] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a number")
+        if clean[field] < 0:
+            raise ValueError(f"{field} cannot be negative")
+    return clean
+
+
+def check_exercise(exercise: Any) -> None:
+    """Validate one workout exercise; raises ValueError with the reason."""
+    if not isinstance(exercise, dict):
+        raise ValueError("must be an object")
+    exercise_name = exercise.get("exercise_name")
+    if exercise_name is not None and not isinstance(exercise_name, str):
+        raise ValueError("exercise_name must be a string")
+    if not exercise_name or not exercise_name.strip():
+        raise ValueError("exercise_name is required")
+    sets_value = exercise.get("sets")
+    if sets_value is None or (isinstance(sets_value, (int, float)) and sets_value <= 0):
+        raise ValueError("sets is required and must be greater than 0")
+    reps_value = exercise.get("reps")
+    if reps_value is None or (isinstance(reps_value, (int, float)) and reps_value <= 0):
+        raise ValueError("reps is required and must be greater than 0")
+    if exercise.get("order_index") is None:
+        raise ValueError("order_index is required")
@@ -0,0 +1,27 @@
+from app.db import db_helper
+from typing import Dict, Iterable
+
+
+# Resources with their own per-user version (see init_db.VERSIONED_TABLES)
+CALORIES = "calories"
+FOOD_FEED = "food_feed"
+WORKOUTS = "workouts"
+TDEE = "tdee"
+
+
+class VersionService:
+    @staticmethod
+    def get_versions(user_id: int, resources: Iterable[str]) -> Dict[str, int]:
+        """
+        Current version of each resource for a user, read with one query on
+        the primary key. Resources never written yet are at version 0.
+        """
+        resources = list(resources)
+        placeholders = ",".join("?" * len(resources))
+        rows = db_helper.fetch_all(
+            f"SELECT resource, version FROM resource_versions WHERE user_id = ? AND resource IN ({placeholders})",
+            (user_id, *resources)
+        )
+        versions = dict.fromkeys(resources, 0)
+        versions.update(dict(rows))
+        return versions
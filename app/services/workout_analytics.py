@@ -0,0 +1,239 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.db import db_helper
+
+
+FORMULAS = ("epley", "brzycki", "average")
+
+# Brzycki's denominator reaches zero at 37 reps; past this Epley is used
+BRZYCKI_MAX_REPS = 36
+
+
+def estimate_1rm(weight_kg: np.ndarray, reps: np.ndarray, formula: str = "epley") -> np.ndarray:
+    """
+    Estimated one-rep max for arrays of weight and reps.
+
+    A single rep is its own 1RM; zero reps give 0.
+    """
+    weight_kg = np.asarray(weight_kg, dtype=np.float64)
+    reps = np.asarray(reps, dtype=np.float64)
+
+    epley = weight_kg * (1.0 + reps / 30.0)
+    safe_reps = np.minimum(reps, BRZYCKI_MAX_REPS)
+    brzycki = np.where(reps <= BRZYCKI_MAX_REPS, weight_kg * 36.0 / (37.0 - safe_reps), epley)
+
+    if formula == "brzycki":
+        estimate = brzycki
+    elif formula == "average":
+        estimate = (epley + brzycki) / 2.0
+    else:
+        estimate = epley
+
+    estimate = np.where(reps == 1, weight_kg, estimate)
+    return np.where(reps <= 0, 0.0, estimate)
+
+
+def _group_cummax(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Running maximum of values restarting at each group; rows sorted by group."""
+    if values.size == 0:
+        return values
+    span = float(values.max() - values.min()) + 1.0
+    shifted = values - values.min() + groups * span
+    return np.maximum.accumulate(shifted) - groups * span + values.min()
+
+
+def _iso(days: np.ndarray) -> List[str]:
+    return np.datetime_as_string(days.astype("datetime64[D]")).tolist()
+
+
+class WorkoutAnalytics:
+    @staticmethod
+    def load_history(
+        user_id: int,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        exercise_id: Optional[int] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Load a user's exercise history as column arrays, oldest first.
+        Missing sets, reps or weight read as 0, so such rows add no tonnage
+        and never set a max or an estimated 1RM.
+
+        Returns:
+            Dictionary with 'exercise_id', 'day' (days since epoch), 'sets',
+            'reps' and 'weight_kg' arrays plus 'names' (exercise_id -> name)
+        """
+        filters = ""
+        params: List[Any] = [user_id]
+        if start_date:
+            filters += " AND date(w.date) >= date(?)"
+            params.append(start_date)
+        if end_date:
+            filters += " AND date(w.date) <= date(?)"
+            params.append(end_date)
+        if exercise_id:
+            filters += " AND we.exercise_id = ?"
+            params.append(exercise_id)
+
+        rows = db_helper.fetch_all(
+            f"""
+            SELECT we.exercise_id, e.name, date(w.date),
+                   COALESCE(we.sets, 0), COALESCE(we.reps, 0), COALESCE(we.weight_kg, 0)
+            FROM workout_exercises we
+            JOIN workouts w ON w.id = we.workout_id
+            JOIN exercises e ON e.id = we.exercise_id
+            WHERE w.user_id = ? AND date(w.date) IS NOT NULL {filters}
+            ORDER BY date(w.date) ASC, w.id ASC, we.order_index ASC
+            """,
+            tuple(params)
+        )
+
+        if not rows:
+            columns = ([], [], [], [], [], [])
+        else:
+            columns = tuple(zip(*rows))
+        return {
+            "exercise_id": np.array(columns[0], dtype=np.int64),
+            "names": dict(zip(columns[0], columns[1])),
+            "day": np.array(columns[2], dtype="datetime64[D]").astype(np.int64),
+            "sets": np.array(columns[3], dtype=np.float64),
+            "reps": np.array(columns[4], dtype=np.float64),
+            "weight_kg": np.array(columns[5], dtype=np.float64),
+        }
+
+    @staticmethod
+    def weekly_tonnage(day: np.ndarray, tonnage: np.ndarray, sets: np.ndarray) -> List[Dict[str, Any]]:
+        """Total sets x reps x weight per ISO week (weeks start on Monday)."""
+        if day.size == 0:
+            return []
+        # 1970-01-01 was a Thursday
+        week_start = day - (day + 3) % 7
+        weeks, week_idx = np.unique(week_start, return_inverse=True)
+        totals = np.bincount(week_idx, weights=tonnage)
+        set_counts = np.bincount(week_idx, weights=sets)
+        return [
+            {"week_start": start, "tonnage_kg": round(float(total), 2), "sets": int(count)}
+            for start, total, count in zip(_iso(weeks), totals, set_counts)
+        ]
+
+    @staticmethod
+    def get_analytics(
+        user_id: int,
+        formula: str = "epley",
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        exercise_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Estimated 1RM, weekly tonnage, PR timeline and trend per exercise.
+
+        Args:
+            user_id: The ID of the user
+            formula: 'epley', 'brzycki' or 'average' of the two
+            start_date: Optional ISO date to start from
+            end_date: Optional ISO date to stop at
+            exercise_id: Optional catalog id to restrict to one exercise
+
+        Returns:
+            Dictionary with 'formula', 'weekly_tonnage' and 'exercises'. Each
+            exercise has its best lift, totals, a 'pr_timeline' of sessions
+            that raised the best estimated 1RM and a 'trend' (least-squares
+            slope of session-best 1RM in kg per week).
+        """
+        if formula not in FORMULAS:
+            raise ValueError(f"formula must be one of: {', '.join(FORMULAS)}")
+
+        history = WorkoutAnalytics.load_history(user_id, start_date, end_date, exercise_id)
+        day = history["day"]
+        sets = history["sets"]
+        reps = history["reps"]
+        weight = history["weight_kg"]
+
+        e1rm = estimate_1rm(weight, reps, formula)
+        tonnage = sets * reps * weight
+
+        result: Dict[str, Any] = {
+            "formula": formula,
+            "weekly_tonnage": WorkoutAnalytics.weekly_tonnage(day, tonnage, sets),
+            "exercises": [],
+        }
+        if day.size == 0:
+            return result
+
+        exercise_ids, ex_idx = np.unique(history["exercise_id"], return_inverse=True)
+        n_exercises = exercise_ids.size
+
+        # Per-exercise totals
+        total_tonnage = np.bincount(ex_idx, weights=tonnage, minlength=n_exercises)
+        total_sets = np.bincount(ex_idx, weights=sets, minlength=n_exercises)
+        max_weight = np.zeros(n_exercises)
+        np.maximum.at(max_weight, ex_idx, weight)
+
+        # Collapse to one session per (exercise, day), keeping its best set
+        day_offset = day - day.min()
+        session_key = ex_idx.astype(np.int64) * (int(day_offset.max()) + 1) + day_offset
+        order = np.lexsort((-e1rm, session_key))
+        session_key_sorted = session_key[order]
+        first = np.ones(order.size, dtype=bool)
+        first[1:] = session_key_sorted[1:] != session_key_sorted[:-1]
+        best = order[first]
+
+        s_ex = ex_idx[best]
+        s_day = day[best]
+        s_e1rm = e1rm[best]
+        s_weight = weight[best]
+        s_reps = reps[best]
+        sessions = np.bincount(s_ex, minlength=n_exercises)
+
+        # A session is a PR when its best beats every earlier session
+        running = _group_cummax(s_e1rm, s_ex)
+        is_pr = np.ones(s_ex.size, dtype=bool)
+        same_group = s_ex[1:] == s_ex[:-1]
+        is_pr[1:] = ~same_group | (s_e1rm[1:] > running[:-1] + 1e-9)
+        is_pr &= s_e1rm > 0
+
+        # Least-squares slope of session-best 1RM over time, per exercise,
+        # over the sessions that have one (not only unweighted sets)
+        lifted = (s_e1rm > 0).astype(np.float64)
+        x = (s_day - s_day.min()).astype(np.float64) / 7.0
+        n = np.bincount(s_ex, weights=lifted, minlength=n_exercises)
+        sum_x = np.bincount(s_ex, weights=x * lifted, minlength=n_exercises)
+        sum_y = np.bincount(s_ex, weights=s_e1rm, minlength=n_exercises)
+        sum_xy = np.bincount(s_ex, weights=x * s_e1rm, minlength=n_exercises)
+        sum_xx = np.bincount(s_ex, weights=x * x * lifted, minlength=n_exercises)
+        denom = n * sum_xx - sum_x ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(denom > 0, (n * sum_xy - sum_x * sum_y) / denom, np.nan)
+
+        pr_positions = np.flatnonzero(is_pr)
+        pr_dates = _iso(s_day[pr_positions])
+        timelines: List[List[Dict[str, Any]]] = [[] for _ in range(n_exercises)]
+        for pos, pr_date in zip(pr_positions, pr_dates):
+            timelines[s_ex[pos]].append({
+                "date": pr_date,
+                "estimated_1rm": round(float(s_e1rm[pos]), 2),
+                "weight_kg": float(s_weight[pos]),
+                "reps": int(s_reps[pos]),
+            })
+
+        names = history["names"]
+        for idx, ex_id in enumerate(exercise_ids.tolist()):
+            timeline = timelines[idx]
+            best_lift = timeline[-1] if timeline else None
+            result["exercises"].append({
+                "exercise_id": ex_id,
+                "exercise_name": names[ex_id],
+                "sessions": int(sessions[idx]),
+                "total_sets": int(total_sets[idx]),
+                "total_tonnage_kg": round(float(total_tonnage[idx]), 2),
+                "max_weight_kg": float(max_weight[idx]),
+                "best_estimated_1rm": best_lift["estimated_1rm"] if best_lift else 0.0,
+                "best_estimated_1rm_date": best_lift["date"] if best_lift else None,
+                "trend_kg_per_week": None if np.isnan(slope[idx]) else round(float(slope[idx]), 3),
+                "pr_timeline": timeline,
+            })
+
+        result["exercises"].sort(key=lambda item: item["total_tonnage_kg"], reverse=True)
+        return result
@@ -3,9 +3,24 @@ from datetime import datetime
 from app.db import db_helper
 from app.models.workout import Workout
 from app.models.workout_exercise import WorkoutExercise
+from app.services.autocomplete_service import autocomplete, EXERCISES
+from app.services.exercise_catalog import ExerciseCatalog, normalize_exercise_name
+from app.services.personal_records_service import PersonalRecordsService
+from app.services.event_hub import events, WORKOUT_SAVED, WORKOUT_DELETED
 
 
 class WorkoutService:
+    # workout_exercises rows with their catalog name, in WorkoutExercise.from_row order
+    EXERCISE_SELECT = """
+            SELECT we.id, we.workout_id, e.name, we.sets, we.reps, we.weight_kg,
+                   we.previous_weight, we.order_index, we.notes, we.exercise_id
+            FROM workout_exercises we
+            JOIN exercises e ON e.id = we.exercise_id
+            """
+
+    # Editable workout_exercises columns after exercise_id, in the order _apply_exercise_diff compares them
+    DIFF_FIELDS = ("sets", "reps", "weight_kg", "previous_weight", "order_index", "notes")
+
     @staticmethod
     def create_workout_for_users(
         user_id: int,
@@ -37,99 +52,286 @@ class WorkoutService:
         
         Raises:
             RuntimeError: If the workout creation fails
-        """
-        # Generate created_at timestamp
-        created_at = Workout.now_iso()
-        
-        # Insert workout into database
-        # Note: Table column is 'date', but method parameter is 'log_date' for clarity
-        db_helper.execute_query(
-            """
-            INSERT INTO workouts (user_id, workout_name, date, notes, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (user_id, workout_name, log_date, notes, created_at)
-        )
-        
-        # Fetch the inserted workout row
-        workout_row = db_helper.fetch_one(
-            """
-            SELECT * FROM workouts
-            WHERE user_id = ? AND workout_name = ? AND date = ?
-            ORDER BY id DESC
-            LIMIT 1
-            """,
-            (user_id, workout_name, log_date)
-        )
-        
-        if not workout_row:
-            raise RuntimeError("Failed to create workout - workout was not inserted or could not be retrieved")
-        
-        # Convert row to Workout model
-        workout = Workout.from_row(workout_row)
         
-        # Insert all exercises into workout_exercises
+        previous_weight is filled in from the user's most recent earlier
+        session of each exercise; the client value is only kept when there
+        is no history for that exercise.
+        """
+        # Validate every exercise before anything is written
         for idx, exercise_dict in enumerate(exercises_data):
             exercise_name = exercise_dict.get("exercise_name")
-            sets = exercise_dict.get("sets")
-            reps = exercise_dict.get("reps")
-            weight_kg = exercise_dict.get("weight_kg", 0.0)
-            previous_weight = exercise_dict.get("previous_weight", 0.0)
-            order_index = exercise_dict.get("order_index")
-            exercise_notes = exercise_dict.get("notes")
-            
-            # Validate required fields before inserting
-            if not exercise_name:
+            if not isinstance(exercise_name, str) or not exercise_name.strip():
                 raise ValueError(f"Exercise {idx + 1}: exercise_name is required")
-            if sets is None:
+            if exercise_dict.get("sets") is None:
                 raise ValueError(f"Exercise {idx + 1}: sets is required")
-            if reps is None:
+            if exercise_dict.get("reps") is None:
                 raise ValueError(f"Exercise {idx + 1}: reps is required")
-            if order_index is None:
+            if exercise_dict.get("order_index") is None:
                 raise ValueError(f"Exercise {idx + 1}: order_index is required")
-            
-            try:
-                db_helper.execute_query(
-                    """
-                    INSERT INTO workout_exercises (
-                        workout_id, exercise_name, sets, reps, weight_kg,
-                        previous_weight, order_index, notes
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        workout.id,
-                        exercise_name,
-                        sets,
-                        reps,
-                        weight_kg,
-                        previous_weight,
-                        order_index,
-                        exercise_notes,
-                    )
-                )
-            except Exception as e:
-                raise RuntimeError(f"Failed to insert exercise {idx + 1} ({exercise_name}): {str(e)}")
         
-        # Fetch all exercises back for this workout
-        exercise_rows = db_helper.fetch_all(
-            """
-            SELECT * FROM workout_exercises
-            WHERE workout_id = ?
-            ORDER BY order_index ASC
-            """,
-            (workout.id,)
+        exercise_names = [exercise_dict["exercise_name"] for exercise_dict in exercises_data]
+        
+        # Look up last performances before this workout exists
+        last_performance = WorkoutService.get_last_performance(
+            user_id,
+            exercise_names,
+            on_or_before=log_date
         )
         
+        # Workout, exercises and personal records are written in one transaction
+        with db_helper.transaction():
+            # Resolve names to catalog ids (adding new exercises to the catalog)
+            exercise_ids = ExerciseCatalog.resolve_ids(exercise_names)
+            
+            # Generate created_at timestamp
+            created_at = Workout.now_iso()
+            
+            # Insert workout into database
+            # Note: Table column is 'date', but method parameter is 'log_date' for clarity
+            db_helper.execute_query(
+                """
+                INSERT INTO workouts (user_id, workout_name, date, notes, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (user_id, workout_name, log_date, notes, created_at)
+            )
+            
+            # Fetch the inserted workout row
+            workout_row = db_helper.fetch_one(
+                """
+                SELECT * FROM workouts
+                WHERE user_id = ? AND workout_name = ? AND date = ?
+                ORDER BY id DESC
+                LIMIT 1
+                """,
+                (user_id, workout_name, log_date)
+            )
+            
+            if not workout_row:
+                raise RuntimeError("Failed to create workout - workout was not inserted or could not be retrieved")
+            
+            # Convert row to Workout model
+            workout = Workout.from_row(workout_row)
+            
+            # Insert all exercises into workout_exercises
+            for idx, exercise_dict in enumerate(exercises_data):
+                exercise_name = exercise_dict.get("exercise_name")
+                sets = exercise_dict.get("sets")
+                reps = exercise_dict.get("reps")
+                weight_kg = exercise_dict.get("weight_kg", 0.0)
+                previous_weight = exercise_dict.get("previous_weight", 0.0)
+                order_index = exercise_dict.get("order_index")
+                exercise_notes = exercise_dict.get("notes")
+            
+                last = last_performance.get(WorkoutService.exercise_key(exercise_name))
+                if last is not None:
+                    previous_weight = last["weight_kg"]
+            
+                try:
+                    db_helper.execute_query(
+                        """
+                        INSERT INTO workout_exercises (
+                            workout_id, exercise_id, sets, reps, weight_kg,
+                            previous_weight, order_index, notes
+                        )
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (
+                            workout.id,
+                            exercise_ids[WorkoutService.exercise_key(exercise_name)],
+                            sets,
+                            reps,
+                            weight_kg,
+                            previous_weight,
+                            order_index,
+                            exercise_notes,
+                        )
+                    )
+                except Exception as e:
+                    raise RuntimeError(f"Failed to insert exercise {idx + 1} ({exercise_name}): {str(e)}")
+            
+            # Fold the new lifts into the user's personal records
+            PersonalRecordsService.record_workout(user_id, workout.id)
+            
+            # Fetch all exercises back for this workout
+            exercise_rows = db_helper.fetch_all(
+                WorkoutService.EXERCISE_SELECT + """
+                WHERE we.workout_id = ?
+                ORDER BY we.order_index ASC
+                """,
+                (workout.id,)
+            )
+        
         # Convert each row to WorkoutExercise model
         exercises = [WorkoutExercise.from_row(row) for row in exercise_rows]
         
+        # Make the exercise names available to autocomplete
+        for ex in exercises:
+            db_helper.after_commit(
+                lambda name=ex.exercise_name: autocomplete.record(EXERCISES, user_id, name, log_date)
+            )
+        events.publish(user_id, WORKOUT_SAVED, {"workout": workout.to_dict()})
+        
         # Return clean dict suitable for JSON response
         return {
             "workout": workout.to_dict(),
             "exercises": [ex.to_dict() for ex in exercises]
         }
 
+    @staticmethod
+    def clone_workout(
+        workout_id: int,
+        user_id: int,
+        log_date: Optional[str] = None,
+        workout_name: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Repeat a workout: copy it and its exercises to a new date with
+        INSERT ... SELECT, in one transaction.
+        
+        Args:
+            workout_id: The ID of the workout to copy
+            user_id: The ID of the user (must own the workout)
+            log_date: Date for the copy (defaults to today)
+            workout_name: Optional name for the copy (defaults to the original's)
+        
+        Returns:
+            Dictionary with 'workout' and 'exercises' keys like
+            create_workout_for_users, or None if not found/unauthorized.
+            Each copied exercise has previous_weight set to the weight
+            lifted in the original.
+        """
+        if log_date is None:
+            log_date = datetime.now().date().isoformat()
+        
+        with db_helper.transaction():
+            workout_row = db_helper.execute_returning(
+                """
+                INSERT INTO workouts (user_id, workout_name, date, notes, created_at)
+                SELECT user_id, COALESCE(?, workout_name), ?, notes, ?
+                FROM workouts
+                WHERE id = ? AND user_id = ?
+                RETURNING *
+                """,
+                (workout_name, log_date, Workout.now_iso(), workout_id, user_id)
+            )
+            if not workout_row:
+                return None
+            workout = Workout.from_row(workout_row)
+            
+            db_helper.execute_query(
+                """
+                INSERT INTO workout_exercises (
+                    workout_id, exercise_id, sets, reps, weight_kg,
+                    previous_weight, order_index, notes
+                )
+                SELECT ?, exercise_id, sets, reps, weight_kg,
+                       weight_kg, order_index, notes
+                FROM workout_exercises
+                WHERE workout_id = ?
+                ORDER BY order_index ASC, id ASC
+                """,
+                (workout.id, workout_id)
+            )
+            
+            PersonalRecordsService.record_workout(user_id, workout.id)
+            
+            exercise_rows = db_helper.fetch_all(
+                WorkoutService.EXERCISE_SELECT + """
+                WHERE we.workout_id = ?
+                ORDER BY we.order_index ASC
+                """,
+                (workout.id,)
+            )
+        
+        exercises = [WorkoutExercise.from_row(row) for row in exercise_rows]
+        for ex in exercises:
+            db_helper.after_commit(
+                lambda name=ex.exercise_name: autocomplete.record(EXERCISES, user_id, name, log_date)
+            )
+        events.publish(user_id, WORKOUT_SAVED, {"workout": workout.to_dict()})
+        
+        return {
+            "workout": workout.to_dict(),
+            "exercises": [ex.to_dict() for ex in exercises]
+        }
+
+    @staticmethod
+    def exercise_key(exercise_name: str) -> str:
+        """Catalog key used to match exercise names (see normalize_exercise_name)."""
+        return normalize_exercise_name(exercise_name)
+
+    @staticmethod
+    def get_last_performance(
+        user_id: int,
+        exercise_names: List[str],
+        on_or_before: Optional[str] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Most recent sets, reps and weight for each exercise, in one query.
+        
+        Args:
+            user_id: The ID of the user
+            exercise_names: Exercise names to look up (matched case-insensitively)
+            on_or_before: Optional ISO date; only workouts on or before it count
+        
+        Returns:
+            Dictionary keyed by exercise_key(name) with 'exercise_id',
+            'exercise_name', 'sets', 'reps', 'weight_kg', 'date' and
+            'workout_id'. Exercises with no history are left out.
+        """
+        exercise_ids = ExerciseCatalog.resolve_ids(exercise_names, create=False)
+        if not exercise_ids:
+            return {}
+        
+        ids = sorted(set(exercise_ids.values()))
+        placeholders = ",".join("?" * len(ids))
+        params: List[Any] = [user_id] + ids
+        date_filter = ""
+        if on_or_before:
+            date_filter = "AND w.date <= ?"
+            params.append(on_or_before)
+        
+        rows = db_helper.fetch_all(
+            f"""
+            SELECT p.exercise_id, e.name, p.sets, p.reps, p.weight_kg, p.date, p.workout_id
+            FROM (
+                SELECT we.exercise_id, we.sets, we.reps, we.weight_kg,
+                       w.date, w.id AS workout_id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY we.exercise_id
+                           ORDER BY w.date DESC, w.id DESC, we.weight_kg DESC
+                       ) AS rn
+                FROM workout_exercises we
+                JOIN workouts w ON w.id = we.workout_id
+                WHERE w.user_id = ?
+                  AND we.exercise_id IN ({placeholders})
+                  {date_filter}
+            ) p
+            JOIN exercises e ON e.id = p.exercise_id
+            WHERE p.rn = 1
+            """,
+            tuple(params)
+        )
+        
+        by_id = {
+            row[0]: {
+                "exercise_id": row[0],
+                "exercise_name": row[1],
+                "sets": row[2],
+                "reps": row[3],
+                "weight_kg": row[4],
+                "date": row[5],
+                "workout_id": row[6],
+            }
+            for row in rows
+        }
+        return {
+            key: by_id[exercise_id]
+            for key, exercise_id in exercise_ids.items()
+            if exercise_id in by_id
+        }
+
     @staticmethod
     def get_workout_detail(workout_id: int, user_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -161,10 +363,9 @@ class WorkoutService:
         
         # Fetch all exercises belonging to this workout
         exercise_rows = db_helper.fetch_all(
-            """
-            SELECT * FROM workout_exercises
-            WHERE workout_id = ?
-            ORDER BY order_index ASC
+            WorkoutService.EXERCISE_SELECT + """
+            WHERE we.workout_id = ?
+            ORDER BY we.order_index ASC
             """,
             (workout_id,)
         )
@@ -209,10 +410,9 @@ class WorkoutService:
             
             # Get exercises for this workout
             exercise_rows = db_helper.fetch_all(
-                """
-                SELECT * FROM workout_exercises
-                WHERE workout_id = ?
-                ORDER BY order_index ASC
+                WorkoutService.EXERCISE_SELECT + """
+                WHERE we.workout_id = ?
+                ORDER BY we.order_index ASC
                 """,
                 (workout.id,)
             )
@@ -252,14 +452,21 @@ class WorkoutService:
         if not workout_row:
             return False
         
-        # Delete the workout (ON DELETE CASCADE will automatically delete related workout_exercises)
-        db_helper.execute_query(
-            """
-            DELETE FROM workouts
-            WHERE id = ?
-            """,
-            (workout_id,)
-        )
+        with db_helper.transaction():
+            held_records = PersonalRecordsService.exercises_held_by(user_id, workout_id)
+            
+            # Delete the workout (ON DELETE CASCADE will automatically delete related workout_exercises)
+            db_helper.execute_query(
+                """
+                DELETE FROM workouts
+                WHERE id = ?
+                """,
+                (workout_id,)
+            )
+            
+            # Records that came from this workout fall back to the next best
+            PersonalRecordsService.recompute(user_id, held_records)
+        events.publish(user_id, WORKOUT_DELETED, {"id": workout_id})
         
         # Return True if deletion happened
         return True
@@ -324,14 +531,19 @@ class WorkoutService:
         
         # Build and execute the UPDATE statement
         set_clause = ", ".join(fields_to_update)
-        db_helper.execute_query(
-            f"""
-            UPDATE workouts
-            SET {set_clause}
-            WHERE id = ? AND user_id = ?
-            """,
-            tuple(params)
-        )
+        with db_helper.transaction():
+            db_helper.execute_query(
+                f"""
+                UPDATE workouts
+                SET {set_clause}
+                WHERE id = ? AND user_id = ?
+                """,
+                tuple(params)
+            )
+            
+            # Record dates (and date tie-breaks) follow the workout's date
+            if log_date is not None:
+                PersonalRecordsService.refresh_workout(user_id, workout_id)
         
         # Fetch the updated workout row
         updated_workout_row = db_helper.fetch_one(
@@ -344,10 +556,115 @@ class WorkoutService:
         
         # Convert it using Workout.from_row
         workout = Workout.from_row(updated_workout_row)
+        events.publish(user_id, WORKOUT_SAVED, {"workout": workout.to_dict()})
         
         # Return dict representation
         return workout.to_dict()
 
+    @staticmethod
+    def _diff_key(values: tuple) -> tuple:
+        """Exercise values as compared for changes: empty notes count as no notes."""
+        return values[:-1] + (values[-1] or None,)
+
+    @staticmethod
+    def _apply_exercise_diff(
+        workout_id: int,
+        user_id: int,
+        workout_date: str,
+        exercises: List[Dict[str, Any]],
+        catalog_ids: Dict[str, int],
+    ) -> bool:
+        """
+        Make the workout's exercises match the given list with as few writes
+        as possible: unchanged rows are skipped, changed rows are updated (only
+        the fields the client sent; the rest keep their stored values) and
+        new rows inserted with one executemany each, and rows missing from the
+        list are removed with a single DELETE.
+        
+        Must run inside db_helper.transaction(). Returns True if anything changed.
+        """
+        existing_rows = db_helper.fetch_all(
+            """
+            SELECT id, exercise_id, sets, reps, weight_kg, previous_weight, order_index, notes
+            FROM workout_exercises
+            WHERE workout_id = ?
+            """,
+            (workout_id,)
+        )
+        existing = {row[0]: tuple(row[1:]) for row in existing_rows}
+        
+        inserts = []
+        updates = []
+        kept_ids = set()
+        for idx, exercise_dict in enumerate(exercises):
+            exercise_id = exercise_dict.get("id")
+            exercise_name = (exercise_dict.get("exercise_name") or "").strip()
+            
+            if not exercise_name:
+                continue  # Skip exercises without names
+            
+            catalog_id = catalog_ids[WorkoutService.exercise_key(exercise_name)]
+            
+            if exercise_id and exercise_id in existing:
+                kept_ids.add(exercise_id)
+                # Fields the client left out keep their stored value
+                stored = existing[exercise_id]
+                values = (catalog_id,) + tuple(
+                    exercise_dict[field] if field in exercise_dict else stored[position]
+                    for position, field in enumerate(WorkoutService.DIFF_FIELDS, start=1)
+                )
+                if WorkoutService._diff_key(values) != WorkoutService._diff_key(stored):
+                    updates.append(values + (exercise_id, workout_id))
+            else:
+                values = (
+                    catalog_id,
+                    exercise_dict.get("sets", 0),
+                    exercise_dict.get("reps", 0),
+                    exercise_dict.get("weight_kg", 0.0),
+                    exercise_dict.get("previous_weight", 0.0),
+                    exercise_dict.get("order_index", idx),
+                    exercise_dict.get("notes", ""),
+                )
+                inserts.append((workout_id,) + values)
+                db_helper.after_commit(
+                    lambda name=exercise_name: autocomplete.record(EXERCISES, user_id, name, workout_date)
+                )
+        
+        removed_ids = sorted(set(existing) - kept_ids)
+        
+        if removed_ids:
+            placeholders = ",".join("?" * len(removed_ids))
+            db_helper.execute_query(
+                f"""
+                DELETE FROM workout_exercises
+                WHERE workout_id = ? AND id IN ({placeholders})
+                """,
+                (workout_id, *removed_ids)
+            )
+        if updates:
+            db_helper.execute_many(
+                """
+                UPDATE workout_exercises
+                SET exercise_id = ?, sets = ?, reps = ?, weight_kg = ?,
+                    previous_weight = ?, order_index = ?, notes = ?
+                WHERE id = ? AND workout_id = ?
+                """,
+                updates
+            )
+        if inserts:
+            db_helper.execute_many(
+                """
+                INSERT INTO workout_exercises (
+                    workout_id, exercise_id, sets, reps, weight_kg,
+                    previous_weight, order_index, notes
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                inserts
+            )
+        
+        return bool(removed_ids or updates or inserts)
+
     @staticmethod
     def update_workout_with_exercises(
         workout_id: int,
@@ -383,125 +700,72 @@ class WorkoutService:
         if not workout_row:
             return None
         
-        # Update workout fields if provided
-        if workout_name is not None or notes is not None:
-            fields_to_update = []
-            params = []
-            
-            if workout_name is not None:
-                fields_to_update.append("workout_name = ?")
-                params.append(workout_name)
-            
-            if notes is not None:
-                fields_to_update.append("notes = ?")
-                params.append(notes)
-            
-            if fields_to_update:
-                params.extend([workout_id, user_id])
-                set_clause = ", ".join(fields_to_update)
-                db_helper.execute_query(
-                    f"""
-                    UPDATE workouts
-                    SET {set_clause}
-                    WHERE id = ? AND user_id = ?
-                    """,
-                    tuple(params)
-                )
-        
-        # Update exercises if provided
+        # Resolve every name to its catalog id before writing anything
         if exercises is not None:
-            # Get existing exercise IDs for this workout
-            existing_exercise_rows = db_helper.fetch_all(
-                """
-                SELECT id FROM workout_exercises
-                WHERE workout_id = ?
-                """,
-                (workout_id,)
+            catalog_ids = ExerciseCatalog.resolve_ids(
+                [exercise_dict.get("exercise_name", "") for exercise_dict in exercises]
             )
-            existing_exercise_ids = {row[0] for row in existing_exercise_rows}
-            
-            # Process each exercise in the provided list
-            provided_exercise_ids = set()
-            for idx, exercise_dict in enumerate(exercises):
-                exercise_id = exercise_dict.get("id")
-                exercise_name = exercise_dict.get("exercise_name", "").strip()
+        
+        # Workout fields, exercises and personal records change in one transaction
+        with db_helper.transaction():
+            # Update workout fields if provided
+            if workout_name is not None or notes is not None:
+                fields_to_update = []
+                params = []
                 
-                if not exercise_name:
-                    continue  # Skip exercises without names
+                if workout_name is not None:
+                    fields_to_update.append("workout_name = ?")
+                    params.append(workout_name)
                 
-                sets = exercise_dict.get("sets", 0)
-                reps = exercise_dict.get("reps", 0)
-                weight_kg = exercise_dict.get("weight_kg", 0.0)
-                previous_weight = exercise_dict.get("previous_weight", 0.0)
-                exercise_notes = exercise_dict.get("notes", "")
-                order_index = exercise_dict.get("order_index", idx)
+                if notes is not None:
+                    fields_to_update.append("notes = ?")
+                    params.append(notes)
                 
-                if exercise_id and exercise_id in existing_exercise_ids:
-                    # Update existing exercise
-                    provided_exercise_ids.add(exercise_id)
+                if fields_to_update:
+                    params.extend([workout_id, user_id])
+                    set_clause = ", ".join(fields_to_update)
                     db_helper.execute_query(
-                        """
-                        UPDATE workout_exercises
-                        SET exercise_name = ?, sets = ?, reps = ?, weight_kg = ?,
-                            previous_weight = ?, order_index = ?, notes = ?
-                        WHERE id = ? AND workout_id = ?
+                        f"""
+                        UPDATE workouts
+                        SET {set_clause}
+                        WHERE id = ? AND user_id = ?
                         """,
-                        (
-                            exercise_name, sets, reps, weight_kg,
-                            previous_weight, order_index, exercise_notes,
-                            exercise_id, workout_id
-                        )
-                    )
-                else:
-                    # Insert new exercise
-                    db_helper.execute_query(
-                        """
-                        INSERT INTO workout_exercises (
-                            workout_id, exercise_name, sets, reps, weight_kg,
-                            previous_weight, order_index, notes
-                        )
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            workout_id, exercise_name, sets, reps, weight_kg,
-                            previous_weight, order_index, exercise_notes,
-                        )
+                        tuple(params)
                     )
             
-            # Delete exercises that were not in the provided list
-            exercises_to_delete = existing_exercise_ids - provided_exercise_ids
-            if exercises_to_delete:
-                placeholders = ",".join("?" * len(exercises_to_delete))
-                db_helper.execute_query(
-                    f"""
-                    DELETE FROM workout_exercises
-                    WHERE id IN ({placeholders}) AND workout_id = ?
+            # Update exercises if provided
+            exercises_changed = False
+            if exercises is not None:
+                exercises_changed = WorkoutService._apply_exercise_diff(
+                    workout_id, user_id, workout_row[3], exercises, catalog_ids
+                )
+            
+            # Records this workout held may have dropped; new lifts may be records
+            if exercises_changed:
+                PersonalRecordsService.refresh_workout(user_id, workout_id)
+            
+            # Fetch the updated workout (on the same connection)
+            if workout_name is not None or notes is not None:
+                workout_row = db_helper.fetch_one(
+                    """
+                    SELECT * FROM workouts
+                    WHERE id = ? AND user_id = ?
                     """,
-                    tuple(exercises_to_delete) + (workout_id,)
+                    (workout_id, user_id)
                 )
+            
+            # Fetch all exercises for this workout
+            exercise_rows = db_helper.fetch_all(
+                WorkoutService.EXERCISE_SELECT + """
+                WHERE we.workout_id = ?
+                ORDER BY we.order_index ASC
+                """,
+                (workout_id,)
+            )
         
-        # Fetch the updated workout
-        updated_workout_row = db_helper.fetch_one(
-            """
-            SELECT * FROM workouts
-            WHERE id = ? AND user_id = ?
-            """,
-            (workout_id, user_id)
-        )
-        
-        workout = Workout.from_row(updated_workout_row)
-        
-        # Fetch all exercises for this workout
-        exercise_rows = db_helper.fetch_all(
-            """
-            SELECT * FROM workout_exercises
-            WHERE workout_id = ?
-            ORDER BY order_index ASC
-            """,
-            (workout_id,)
-        )
-        
+        workout = Workout.from_row(workout_row)
         exercises = [WorkoutExercise.from_row(row) for row in exercise_rows]
+        events.publish(user_id, WORKOUT_SAVED, {"workout": workout.to_dict()})
         
         # Return clean dictionary
         return {
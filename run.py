@@ -1,9 +1,19 @@
+import os
 from flask import Flask, render_template
 from app.api.auth_routes import register_auth_routes
 from app.api.tdee_routes import register_tdee_routes
 from app.api.food_feed_routes import register_food_feed_routes
 from app.api.calories_routes import register_calories_routes
 from app.api.workout_routes import register_workout_routes
+from app.api.autocomplete_routes import register_autocomplete_routes
+from app.api.dashboard_routes import register_dashboard_routes
+from app.api.batch_routes import register_batch_routes
+from app.api.sync_routes import register_sync_routes
+from app.api.events_routes import register_events_routes
+from app.api.export_routes import register_export_routes
+from app.api.import_routes import register_import_routes
+from app.api.settings_routes import register_settings_routes
+from app.services.account_deletion_service import AccountDeletionService
 
 
 app = Flask(__name__, template_folder="app/templates", static_folder="app/static")
@@ -53,8 +63,20 @@ register_tdee_routes(app)
 register_food_feed_routes(app)
 register_calories_routes(app)
 register_workout_routes(app)
+register_autocomplete_routes(app)
+register_dashboard_routes(app)
+register_batch_routes(app)
+register_sync_routes(app)
+register_events_routes(app)
+register_export_routes(app)
+register_import_routes(app)
+register_settings_routes(app)
 
 
 
 if __name__ == "__main__":
+    # Finish account deletions a previous run left unfinished; the debug
+    # reloader runs this file twice, so only its serving child does this
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        AccountDeletionService.resume_pending()
     app.run(debug=True)
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from app.db import db_helper, init_db
+from app.services.autocomplete_service import autocomplete
+from app.services.exercise_catalog import ExerciseCatalog
+from app.services.food_similarity_cache import similarity_index
+from app.services.recent_foods import recent_foods
+
+# The chat clients need a key when imported; no test calls the model
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+
+def _insert_user(db, username: str) -> int:
+    user_id = db.execute_returning(
+        """
+        INSERT INTO users (username, email, password_hash, created_at, age, gender, height, weight)
+        VALUES (?, ?, 'x', '2025-01-01T00:00:00', 30, 'male', 180, 80)
+        RETURNING id
+        """,
+        (username, f"{username}@example.com")
+    )[0]
+    # Ids repeat from one test database to the next; drop what an earlier test cached
+    recent_foods.forget_user(user_id)
+    similarity_index.forget_user(user_id)
+    autocomplete.forget_user(user_id)
+    return user_id
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh database file for one test."""
+    path = str(tmp_path / "athleticore.db")
+    monkeypatch.setattr(init_db, "DB_PATH", path)
+    monkeypatch.setattr(db_helper, "DB_PATH", path)
+    monkeypatch.setattr(ExerciseCatalog, "_name_to_id", {})
+    init_db.init_db()
+    return db_helper
+
+
+@pytest.fixture
+def user_id(db):
+    return _insert_user(db, "lifter")
+
+
+@pytest.fixture
+def other_user_id(db):
+    return _insert_user(db, "runner")
+
+
+@pytest.fixture
+def client(db):
+    """Flask test client over the test database."""
+    import run
+    return run.app.test_client()
@@ -0,0 +1,44 @@
+def log_request(description):
+    return {
+        "method": "POST",
+        "path": "/api/calories/log",
+        "body": {"username": "lifter", "description": description, "calories": 100},
+    }
+
+
+def test_failed_sub_request_rolls_back_a_transactional_batch(db, client, user_id):
+    # Loads the user's recent foods into memory, where a write would add to them
+    assert client.get(f"/api/calories/recent/{user_id}").get_json()["foods"] == []
+
+    response = client.post("/api/batch", json={
+        "transaction": True,
+        "requests": [log_request("oatmeal"), {"method": "GET", "path": "/api/no-such-route"}],
+    })
+
+    assert response.status_code == 404
+    assert response.get_json()["failed_index"] == 1
+    assert db.fetch_one("SELECT COUNT(*) FROM calorie_logs")[0] == 0
+    # The cache updates registered by the rolled-back write never ran
+    assert client.get(f"/api/calories/recent/{user_id}").get_json()["foods"] == []
+
+
+def test_batch_without_transaction_keeps_earlier_writes(db, client, user_id):
+    response = client.post("/api/batch", json={
+        "requests": [log_request("oatmeal"), {"method": "GET", "path": "/api/no-such-route"}],
+    })
+
+    assert response.status_code == 200
+    assert [sub["status"] for sub in response.get_json()["responses"]] == [201, 404]
+    assert db.fetch_one("SELECT COUNT(*) FROM calorie_logs")[0] == 1
+
+
+def test_rejected_paths(client, user_id):
+    def status(sub_request, transaction=False):
+        return client.post("/api/batch", json={"transaction": transaction, "requests": [sub_request]}).status_code
+
+    assert status({"method": "GET", "path": f"/api/export/{user_id}"}) == 400
+    assert status({"method": "POST", "path": "/api/import"}) == 400
+    assert status({"method": "GET", "path": f"/api/events/{user_id}"}) == 400
+    # Chat calls would hold the write lock while the model answers
+    assert status({"method": "POST", "path": "/api/calories/chat", "body": {}}, transaction=True) == 400
+    assert status({"method": "GET", "path": f"/api/tdee/chat/history/{user_id}"}, transaction=True) == 200
@@ -0,0 +1,56 @@
+from app.services.calorie_tracker import Calorie_manager
+
+
+def test_unchanged_resource_answers_304(client, user_id):
+    Calorie_manager.add_log(user_id, "oatmeal", 300, 10, 50, 6)
+
+    first = client.get(f"/api/calories/logs/{user_id}")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "no-cache"
+    etag = first.headers["ETag"]
+
+    again = client.get(f"/api/calories/logs/{user_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == etag
+
+
+def test_write_changes_the_etag(client, user_id):
+    etag = client.get(f"/api/calories/logs/{user_id}").headers["ETag"]
+
+    log = Calorie_manager.add_log(user_id, "oatmeal", 300, 10, 50, 6)
+    after_add = client.get(f"/api/calories/logs/{user_id}", headers={"If-None-Match": etag})
+    assert after_add.status_code == 200
+    assert after_add.headers["ETag"] != etag
+    assert [entry["id"] for entry in after_add.get_json()["logs"]] == [log.id]
+
+    Calorie_manager.delete_log(log.id, user_id)
+    after_delete = client.get(f"/api/calories/logs/{user_id}", headers={"If-None-Match": after_add.headers["ETag"]})
+    assert after_delete.status_code == 200
+    assert after_delete.get_json()["logs"] == []
+
+
+def test_etag_is_per_user_and_per_query(client, user_id, other_user_id):
+    etag = client.get(f"/api/calories/logs/{user_id}").headers["ETag"]
+
+    # Another user's writes leave this user's copy valid
+    Calorie_manager.add_log(other_user_id, "oatmeal", 300, 10, 50, 6)
+    assert client.get(f"/api/calories/logs/{user_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    # The same versions under a different query string are a different representation
+    filtered = client.get(f"/api/calories/logs/{user_id}?date=2025-03-01", headers={"If-None-Match": etag})
+    assert filtered.status_code == 200
+    assert filtered.headers["ETag"] != etag
+
+
+def test_other_resources_do_not_invalidate(client, user_id):
+    etag = client.get(f"/api/calories/logs/{user_id}").headers["ETag"]
+
+    created = client.post("/api/workouts", json={
+        "user_id": user_id, "workout_name": "Push", "log_date": "2025-03-01",
+        "exercises": [{"exercise_name": "Bench Press", "sets": 3, "reps": 5, "order_index": 0}],
+    })
+    assert created.status_code == 201
+
+    assert client.get(f"/api/calories/logs/{user_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(f"/api/workouts?user_id={user_id}", headers={"If-None-Match": etag}).status_code == 200
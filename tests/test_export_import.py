@@ -0,0 +1,120 @@
+import gzip
+import io
+import json
+
+from app.services.calorie_tracker import Calorie_manager
+from app.services.export_service import ExportService
+from app.services.import_service import ImportService, read_records
+from app.services.workout_service import WorkoutService
+
+
+def seed_history(user_id):
+    Calorie_manager.add_log(user_id, "oatmeal", 300, 10, 50, 6, entry_date="2025-03-01")
+    Calorie_manager.add_log(user_id, "chicken rice", 650, 45, 70, 15, entry_date="2025-03-01")
+    deleted = Calorie_manager.add_log(user_id, "cake", 400, 4, 50, 20, entry_date="2025-03-02")
+    Calorie_manager.delete_log(deleted.id, user_id)
+    WorkoutService.create_workout_for_users(
+        user_id, "Push", "2025-03-01", "felt strong",
+        [
+            {"exercise_name": "Bench Press", "sets": 3, "reps": 5, "weight_kg": 100.0, "order_index": 0},
+            {"exercise_name": "Overhead Press", "sets": 3, "reps": 8, "weight_kg": 50.0, "order_index": 1},
+        ]
+    )
+    WorkoutService.create_workout_for_users(
+        user_id, "Legs", "2025-03-03", None,
+        [{"exercise_name": "Squat", "sets": 5, "reps": 5, "weight_kg": 140.0, "order_index": 0}]
+    )
+
+
+def history(db, user_id):
+    """A user's logs and workouts without ids or timestamps, for comparing two users."""
+    logs = db.fetch_all(
+        """
+        SELECT entry_date, description, calories, protein_g, carbs_g, fat_g FROM calorie_logs
+        WHERE user_id = ? AND is_deleted = 0 ORDER BY entry_date, description
+        """,
+        (user_id,)
+    )
+    exercises = db.fetch_all(
+        """
+        SELECT w.date, w.workout_name, w.notes, e.name, we.sets, we.reps, we.weight_kg, we.order_index
+        FROM workouts w
+        JOIN workout_exercises we ON we.workout_id = w.id
+        JOIN exercises e ON e.id = we.exercise_id
+        WHERE w.user_id = ?
+        ORDER BY w.date, we.order_index
+        """,
+        (user_id,)
+    )
+    return logs, exercises
+
+
+def test_export_then_import_recreates_history(db, user_id, other_user_id):
+    seed_history(user_id)
+    export = b"".join(ExportService.iter_ndjson(user_id))
+
+    stats = ImportService.import_records(other_user_id, read_records(io.BytesIO(export), "ndjson"))
+
+    assert stats["skipped"] == 0 and stats["errors"] == []
+    assert (stats["calorie_logs"], stats["workouts"], stats["exercises"]) == (2, 2, 3)
+    # The deleted log is exported but not brought back
+    assert stats["ignored"] >= 1
+    assert history(db, other_user_id) == history(db, user_id)
+
+
+def test_gzipped_export_route_round_trips(db, client, user_id, other_user_id):
+    seed_history(user_id)
+
+    response = client.get(f"/api/export/{user_id}?gzip=1")
+    assert response.status_code == 200
+    records = [json.loads(line) for line in gzip.decompress(response.data).splitlines()]
+    assert {record["type"] for record in records} >= {"user", "calorie_log", "workout", "workout_exercise"}
+    assert all(record.get("user_id", user_id) == user_id for record in records)
+
+    response = client.post(
+        "/api/import",
+        data={"user_id": str(other_user_id), "file": (io.BytesIO(response.data), "export.ndjson.gz")},
+    )
+    assert response.status_code == 200
+    assert history(db, other_user_id) == history(db, user_id)
+
+
+def test_small_chunks_extend_workouts_from_earlier_chunks(db, user_id, other_user_id):
+    seed_history(user_id)
+    export = b"".join(ExportService.iter_ndjson(user_id))
+
+    ImportService.import_records(other_user_id, read_records(io.BytesIO(export), "ndjson"), chunk_size=2)
+
+    assert history(db, other_user_id) == history(db, user_id)
+
+
+def test_invalid_rows_are_reported_and_skipped(db, user_id):
+    lines = [
+        {"type": "workout", "date": "2025-03-01", "workout_name": "No id"},
+        {"type": "workout", "id": [1], "date": "2025-03-01", "workout_name": "List id"},
+        {"type": "workout_exercise", "workout_id": {"id": 1}, "exercise_name": "Squat", "sets": 3, "reps": 5},
+        {"type": "workout_exercise", "log_date": "2025-03-01", "workout_name": "Legs",
+         "exercise_name": 123, "sets": 3, "reps": 5},
+        {"type": "workout_exercise", "log_date": "2025-03-01", "workout_name": "Legs",
+         "exercise_name": "Squat", "sets": 3, "reps": 5},
+    ]
+    upload = io.BytesIO(("\n".join(json.dumps(line) for line in lines) + "\nnot json\n").encode())
+
+    stats = ImportService.import_records(user_id, read_records(upload, "ndjson"))
+
+    assert stats["skipped"] == 5
+    assert [error["line"] for error in stats["errors"]] == [1, 2, 3, 4, 6]
+    assert (stats["workouts"], stats["exercises"]) == (1, 1)
+
+
+def test_csv_import(db, user_id):
+    upload = io.BytesIO(
+        b"entry_date,description,calories,protein_g,carbs_g,fat_g\n"
+        b"2025-03-01,banana,105,1.3,27,0.4\n"
+        b"2025-03-01,,100,,,\n"
+    )
+
+    stats = ImportService.import_records(user_id, read_records(upload, "csv"))
+
+    assert (stats["calorie_logs"], stats["skipped"]) == (1, 1)
+    assert stats["errors"] == [{"line": 3, "error": "description is required"}]
@@ -0,0 +1,75 @@
+from app.services.calorie_tracker import Calorie_manager
+from app.services.food_feed_service import FoodFeedService
+from app.services.workout_service import WorkoutService
+
+
+def sync(client, user_id, since=0, limit=500):
+    response = client.get(f"/api/sync?user_id={user_id}&since={since}&limit={limit}")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_pages_cover_every_change_once(client, user_id, other_user_id):
+    ids = [Calorie_manager.add_log(user_id, f"meal {n}", 100 + n, 1, 1, 1).id for n in range(5)]
+    Calorie_manager.add_log(other_user_id, "not mine", 100, 1, 1, 1)
+
+    seen, token, pages = [], 0, 0
+    while True:
+        page = sync(client, user_id, since=token, limit=2)
+        seen += [log["id"] for log in page["changes"]["calorie_logs"]]
+        token, pages = page["next_token"], pages + 1
+        if not page["has_more"]:
+            break
+
+    assert seen == ids
+    assert pages == 3
+    # Nothing new: the same token comes back with no changes
+    page = sync(client, user_id, since=token)
+    assert page["next_token"] == token
+    assert page["changes"]["calorie_logs"] == [] and not page["has_more"]
+
+
+def test_entity_comes_back_once_in_the_order_of_its_latest_change(client, user_id):
+    first = Calorie_manager.add_log(user_id, "oatmeal", 300, 10, 50, 6)
+    second = Calorie_manager.add_log(user_id, "banana", 105, 1, 27, 0)
+    Calorie_manager.update_log(first.id, user_id, calories=320)
+
+    logs = sync(client, user_id)["changes"]["calorie_logs"]
+
+    assert [(log["id"], log["calories"]) for log in logs] == [(second.id, 105), (first.id, 320)]
+
+
+def test_changes_after_a_token_only(client, user_id):
+    Calorie_manager.add_log(user_id, "oatmeal", 300, 10, 50, 6)
+    token = sync(client, user_id)["next_token"]
+
+    banana = Calorie_manager.add_log(user_id, "banana", 105, 1, 27, 0)
+    page = sync(client, user_id, since=token)
+
+    assert [log["id"] for log in page["changes"]["calorie_logs"]] == [banana.id]
+    assert page["next_token"] > token
+
+
+def test_deletions(client, user_id):
+    log = Calorie_manager.add_log(user_id, "cake", 400, 4, 50, 20)
+    feed = FoodFeedService.add_food_entry(user_id, "a slice of cake")
+    workout = WorkoutService.create_workout_for_users(
+        user_id, "Push", "2025-03-01", None,
+        [{"exercise_name": "Bench Press", "sets": 3, "reps": 5, "order_index": 0}]
+    )["workout"]
+    token = sync(client, user_id)["next_token"]
+
+    Calorie_manager.delete_log(log.id, user_id)
+    FoodFeedService.delete_feed_entry(feed.id, user_id)
+    WorkoutService.delete_workout(workout["id"], user_id)
+    page = sync(client, user_id, since=token)
+
+    # Soft-deleted logs come back flagged; hard-deleted rows are listed by id
+    assert [(entry["id"], entry["is_deleted"]) for entry in page["changes"]["calorie_logs"]] == [(log.id, 1)]
+    assert page["deleted"]["food_feed"] == [feed.id]
+    assert page["deleted"]["workouts"] == [workout["id"]]
+
+
+def test_invalid_requests(client, user_id):
+    assert client.get("/api/sync").status_code == 400
+    assert client.get(f"/api/sync?user_id={user_id}&since=-1").status_code == 400
@@ -0,0 +1,50 @@
+import json
+
+from app.services.exercise_catalog import ExerciseCatalog
+from app.services.workout_analytics import WorkoutAnalytics
+
+
+def add_workout(db, user_id, date, exercises):
+    workout_id = db.execute_returning(
+        "INSERT INTO workouts (user_id, workout_name, date, created_at) VALUES (?, 'Push', ?, ?) RETURNING id",
+        (user_id, date, date)
+    )[0]
+    for order_index, (name, sets, reps, weight_kg) in enumerate(exercises):
+        db.execute_query(
+            """
+            INSERT INTO workout_exercises (workout_id, exercise_id, sets, reps, weight_kg, order_index)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (workout_id, ExerciseCatalog.resolve_id(name), sets, reps, weight_kg, order_index)
+        )
+
+
+def test_missing_values_do_not_produce_nan(db, user_id):
+    add_workout(db, user_id, "2025-03-03", [("Bench Press", 3, 5, None)])
+
+    result = WorkoutAnalytics.get_analytics(user_id)
+
+    # jsonify would write NaN, which is not valid JSON
+    json.dumps(result, allow_nan=False)
+    bench = result["exercises"][0]
+    assert bench["max_weight_kg"] == 0.0
+    assert bench["total_tonnage_kg"] == 0.0
+    assert bench["best_estimated_1rm"] == 0.0
+    assert bench["pr_timeline"] == []
+    assert result["weekly_tonnage"] == [{"week_start": "2025-03-03", "tonnage_kg": 0.0, "sets": 3}]
+
+
+def test_missing_values_are_left_out_of_maxes_and_1rm(db, user_id):
+    add_workout(db, user_id, "2025-03-03", [("Bench Press", 3, 5, 100.0)])
+    add_workout(db, user_id, "2025-03-10", [("Bench Press", None, None, 120.0), ("Bench Press", 2, 5, None)])
+    add_workout(db, user_id, "2025-03-17", [("Bench Press", 3, 5, 105.0)])
+
+    result = WorkoutAnalytics.get_analytics(user_id)
+
+    json.dumps(result, allow_nan=False)
+    bench = result["exercises"][0]
+    assert bench["max_weight_kg"] == 120.0
+    assert bench["total_tonnage_kg"] == 3 * 5 * 100.0 + 3 * 5 * 105.0
+    assert [pr["date"] for pr in bench["pr_timeline"]] == ["2025-03-03", "2025-03-17"]
+    assert bench["best_estimated_1rm"] == 122.5
+    assert bench["trend_kg_per_week"] == 2.917